@@ -7,7 +7,10 @@ from django.contrib import messages
 from django.db.models import Q
 
 from django.db.models import Sum
+from core.utils import paginar
 from inventario.models import Producto, Categoria, NombreProducto
+from inventario.busqueda import buscar_productos
+from inventario.estadisticas import obtener_estadisticas
 from ventas.models import Cliente
 from .forms import ClienteForm, ProductoCatalogForm, CategoriaCatalogForm, NombreProductoForm
 
@@ -37,25 +40,26 @@ def lista_productos(request):
     """
     Lista de productos (catálogo).
     """
-    productos = Producto.objects.filter(activo=True).order_by('nombre_producto__nombre')
+    productos = Producto.objects.filter(activo=True).select_related(
+        'nombre_producto', 'categoria'
+    ).order_by('nombre_producto__nombre')
     
     query = request.GET.get('q', '')
     categoria_id = request.GET.get('categoria', '')
     
     if query:
-        productos = productos.filter(
-            Q(nombre_producto__nombre__icontains=query) |
-            Q(codigo__icontains=query) |
-            Q(descripcion__icontains=query)
-        )
+        productos = buscar_productos(productos, query)
     
     if categoria_id:
         productos = productos.filter(categoria_id=categoria_id)
     
     categorias = Categoria.objects.filter(activa=True)
+    pagina, parametros = paginar(request, productos)
     
     context = {
-        'productos': productos,
+        'productos': pagina,
+        'pagina': pagina,
+        'parametros': parametros,
         'categorias': categorias,
         'query': query,
         'categoria_selected': categoria_id,
@@ -120,6 +124,7 @@ def producto_detalle(request, producto_id):
     
     context = {
         'producto': producto,
+        'estadisticas': obtener_estadisticas(producto),
     }
     
     return render(request, 'catalogos/producto_detalle.html', context)
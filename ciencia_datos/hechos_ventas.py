@@ -0,0 +1,296 @@
+"""
+Exportación columnar de los hechos de venta (DetalleFactura ⨝ Factura).
+
+Cada columna se guarda como un archivo .npy de tipo fijo, que el código de
+análisis abre con np.load(..., mmap_mode='r') sin pasar por la base de datos ni
+por el ORM:
+
+- Ids enteros (int64; -1 cuando no hay cliente).
+- Montos en centavos (int64), sin pérdida de precisión.
+- Fechas como segundos desde 1970-01-01 UTC (fecha_venta) y días desde
+  1970-01-01 en hora local (dia), más la hora local (0-23).
+- Textos repetidos (categoría, vendedor, tipo de cliente) como códigos int32
+  con su diccionario en diccionarios.json; los códigos nunca cambian.
+
+Las exportaciones son incrementales: manifiesto.json guarda la marca de agua
+(último id de DetalleFactura exportado) y cada ejecución agrega al final de
+cada columna solo los detalles nuevos, reescribiendo el encabezado .npy. El
+manifiesto se escribe al final; si una ejecución se interrumpe, la siguiente
+recorta las columnas a las filas del manifiesto antes de seguir.
+
+Las facturas que se anulan después de exportadas no se borran de las columnas:
+anuladas.npy (reescrito en cada ejecución) lista sus ids para excluirlas con
+np.isin(factura_id, anuladas, invert=True).
+"""
+import json
+import os
+from datetime import date, timedelta
+
+import numpy as np
+from numpy.lib import format as formato_npy
+
+VERSION_FORMATO = 1
+
+# Filas que se leen de la base de datos y se agregan a las columnas por bloque
+FILAS_POR_BLOQUE = 50000
+
+# Horas que una factura pendiente puede detener la exportación; pasado ese
+# plazo se da por olvidada y sus detalles se exportan como los demás
+HORAS_ESPERA_PENDIENTES = 24
+
+COLUMNAS = [
+    ('detalle_id', np.int64),
+    ('factura_id', np.int64),
+    ('fecha_venta', np.int64),
+    ('dia', np.int32),
+    ('hora', np.int8),
+    ('producto_id', np.int64),
+    ('categoria', np.int32),
+    ('cliente_id', np.int64),
+    ('tipo_cliente', np.int32),
+    ('vendedor', np.int32),
+    ('cantidad', np.int32),
+    ('precio_unitario', np.int64),
+    ('subtotal', np.int64),
+    ('costo_unitario', np.int64),
+]
+
+# Columnas codificadas con diccionario
+COLUMNAS_TEXTO = ['categoria', 'tipo_cliente', 'vendedor']
+
+MANIFIESTO = 'manifiesto.json'
+DICCIONARIOS = 'diccionarios.json'
+ANULADAS = 'anuladas.npy'
+
+_EPOCA = date(1970, 1, 1)
+
+
+def _ruta(directorio, nombre):
+    return os.path.join(directorio, nombre)
+
+
+def _leer_json(ruta, por_defecto):
+    if not os.path.exists(ruta):
+        return por_defecto
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+
+def _escribir_json(ruta, datos):
+    """Escribe el JSON en un archivo temporal y lo reemplaza de forma atómica."""
+    temporal = f'{ruta}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, ensure_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+
+
+def _leer_encabezado(archivo):
+    """Retorna (versión, forma, dtype, desplazamiento de los datos) de un .npy abierto."""
+    archivo.seek(0)
+    version = formato_npy.read_magic(archivo)
+    if version == (1, 0):
+        forma, _, dtype = formato_npy.read_array_header_1_0(archivo)
+    else:
+        forma, _, dtype = formato_npy.read_array_header_2_0(archivo)
+    return version, forma, dtype, archivo.tell()
+
+
+def _escribir_encabezado(archivo, version, dtype, filas, desplazamiento):
+    """Reescribe el encabezado con la nueva cantidad de filas, sin mover los datos."""
+    encabezado = {'descr': formato_npy.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (filas,)}
+    archivo.seek(0)
+    if version == (1, 0):
+        formato_npy.write_array_header_1_0(archivo, encabezado)
+    else:
+        formato_npy.write_array_header_2_0(archivo, encabezado)
+    if archivo.tell() != desplazamiento:
+        raise ValueError(f'El encabezado de {archivo.name} cambió de tamaño; ejecute una exportación completa.')
+
+
+def _crear_columna(ruta, dtype):
+    np.save(ruta, np.zeros(0, dtype=dtype))
+
+
+def _ajustar_columna(ruta, filas):
+    """Recorta la columna a `filas` (restos de una exportación interrumpida)."""
+    with open(ruta, 'r+b') as archivo:
+        version, forma, dtype, desplazamiento = _leer_encabezado(archivo)
+        if forma[0] != filas:
+            _escribir_encabezado(archivo, version, dtype, filas, desplazamiento)
+            archivo.truncate(desplazamiento + filas * dtype.itemsize)
+
+
+def _agregar_columna(ruta, valores):
+    """Agrega `valores` al final de la columna y actualiza su encabezado."""
+    with open(ruta, 'r+b') as archivo:
+        version, forma, dtype, desplazamiento = _leer_encabezado(archivo)
+        archivo.seek(desplazamiento + forma[0] * dtype.itemsize)
+        archivo.write(np.ascontiguousarray(valores, dtype=dtype).tobytes())
+        _escribir_encabezado(archivo, version, dtype, forma[0] + len(valores), desplazamiento)
+
+
+class _Diccionario:
+    """Asigna códigos estables (0, 1, 2, ...) a los textos en orden de aparición."""
+
+    def __init__(self, valores):
+        self.valores = list(valores)
+        self.codigos = {valor: codigo for codigo, valor in enumerate(self.valores)}
+
+    def codigo(self, valor):
+        valor = valor or ''
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = self.codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+
+def _centavos(valor):
+    return int((valor or 0) * 100)
+
+
+def _filas(consulta, diccionarios):
+    for (
+        detalle_id, factura_id, fecha_venta, fecha_local, hora_local, producto_id, categoria,
+        cliente_id, tipo_cliente, vendedor, cantidad, precio_unitario, subtotal, costo_unitario
+    ) in consulta.iterator(chunk_size=10000):
+        yield (
+            detalle_id,
+            factura_id,
+            int(fecha_venta.timestamp()),
+            (fecha_local - _EPOCA).days,
+            hora_local,
+            producto_id,
+            diccionarios['categoria'].codigo(categoria),
+            -1 if cliente_id is None else cliente_id,
+            diccionarios['tipo_cliente'].codigo(tipo_cliente),
+            diccionarios['vendedor'].codigo(vendedor),
+            cantidad,
+            _centavos(precio_unitario),
+            _centavos(subtotal),
+            _centavos(costo_unitario),
+        )
+
+
+def _bloques(filas, tamano):
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) == tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def exportar_hechos_ventas(directorio, completo=False):
+    """
+    Agrega a las columnas de `directorio` los detalles de factura posteriores a
+    la marca de agua (todos si `completo` o si aún no hay exportación).
+    Retorna el manifiesto actualizado, con las filas agregadas en 'agregadas'.
+
+    Solo se exporta el tramo de ids anterior al primer detalle de una factura
+    pendiente, para que ese detalle no quede saltado por la marca de agua; la
+    factura que detiene la exportación queda en 'factura_pendiente'. Las
+    pendientes de hace más de HORAS_ESPERA_PENDIENTES no detienen la
+    exportación; sus ids quedan en 'pendientes_exportadas'.
+    """
+    from django.db.models import Max
+    from django.utils import timezone
+    from ventas.models import DetalleFactura, Factura
+
+    os.makedirs(directorio, exist_ok=True)
+    manifiesto = None if completo else _leer_json(_ruta(directorio, MANIFIESTO), None)
+    if manifiesto is not None and manifiesto.get('version') != VERSION_FORMATO:
+        manifiesto = None
+
+    if manifiesto is None:
+        # Sin manifiesto, una exportación completa interrumpida vuelve a empezar
+        if os.path.exists(_ruta(directorio, MANIFIESTO)):
+            os.remove(_ruta(directorio, MANIFIESTO))
+        manifiesto = {'version': VERSION_FORMATO, 'marca_de_agua': 0, 'filas': 0}
+        diccionarios = {columna: _Diccionario([]) for columna in COLUMNAS_TEXTO}
+        for columna, dtype in COLUMNAS:
+            _crear_columna(_ruta(directorio, f'{columna}.npy'), dtype)
+    else:
+        guardados = _leer_json(_ruta(directorio, DICCIONARIOS), {})
+        diccionarios = {columna: _Diccionario(guardados.get(columna, [])) for columna in COLUMNAS_TEXTO}
+        for columna, _ in COLUMNAS:
+            _ajustar_columna(_ruta(directorio, f'{columna}.npy'), manifiesto['filas'])
+
+    limite = DetalleFactura.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+    pendientes = DetalleFactura.objects.filter(
+        factura__estado='PENDIENTE', id__gt=manifiesto['marca_de_agua']
+    )
+    olvidadas = pendientes.filter(
+        factura__fecha_venta__lt=timezone.now() - timedelta(hours=HORAS_ESPERA_PENDIENTES)
+    )
+    pendiente = pendientes.exclude(
+        factura_id__in=olvidadas.values('factura_id')
+    ).order_by('id').values_list('id', 'factura_id').first()
+    manifiesto['factura_pendiente'] = None
+    if pendiente is not None:
+        limite = pendiente[0] - 1
+        manifiesto['factura_pendiente'] = pendiente[1]
+    manifiesto['pendientes_exportadas'] = sorted(set(
+        olvidadas.filter(id__lte=limite).values_list('factura_id', flat=True)
+    ))
+
+    consulta = DetalleFactura.objects.filter(
+        id__gt=manifiesto['marca_de_agua'], id__lte=limite
+    ).values_list(
+        'id', 'factura_id', 'factura__fecha_venta', 'factura__fecha_local', 'factura__hora_local',
+        'producto_id', 'producto__categoria__nombre', 'factura__cliente_id',
+        'factura__cliente__tipo_cliente', 'factura__vendedor__username',
+        'cantidad', 'precio_unitario', 'subtotal', 'costo_unitario'
+    ).order_by('id')
+
+    agregadas = 0
+    for bloque in _bloques(_filas(consulta, diccionarios), FILAS_POR_BLOQUE):
+        datos = np.array(bloque, dtype=COLUMNAS)
+        for columna, _ in COLUMNAS:
+            _agregar_columna(_ruta(directorio, f'{columna}.npy'), datos[columna])
+        agregadas += len(bloque)
+        manifiesto['marca_de_agua'] = int(datos['detalle_id'][-1])
+
+    anuladas = np.fromiter(
+        Factura.objects.filter(estado='ANULADA').values_list('id', flat=True).order_by('id').iterator(),
+        dtype=np.int64
+    )
+    np.save(_ruta(directorio, ANULADAS), anuladas)
+
+    if limite > manifiesto['marca_de_agua']:
+        manifiesto['marca_de_agua'] = limite
+    manifiesto['filas'] += agregadas
+    manifiesto['agregadas'] = agregadas
+    manifiesto['columnas'] = {columna: np.dtype(dtype).str for columna, dtype in COLUMNAS}
+    manifiesto['fecha_exportacion'] = timezone.now().isoformat()
+    _escribir_json(
+        _ruta(directorio, DICCIONARIOS),
+        {columna: diccionario.valores for columna, diccionario in diccionarios.items()}
+    )
+    _escribir_json(_ruta(directorio, MANIFIESTO), manifiesto)
+    return manifiesto
+
+
+def cargar_hechos_ventas(directorio, incluir_anuladas=False):
+    """
+    Abre las columnas exportadas con memoria mapeada (no usa la base de datos).
+    Retorna (columnas, diccionarios): un diccionario nombre -> arreglo y los
+    textos de cada columna codificada. Sin `incluir_anuladas`, las filas de
+    facturas anuladas se excluyen (esto sí copia las columnas a memoria).
+    """
+    manifiesto = _leer_json(_ruta(directorio, MANIFIESTO), None)
+    if manifiesto is None:
+        raise FileNotFoundError(f'No hay una exportación de hechos de venta en {directorio}.')
+
+    columnas = {
+        columna: np.load(_ruta(directorio, f'{columna}.npy'), mmap_mode='r')[:manifiesto['filas']]
+        for columna in manifiesto['columnas']
+    }
+    if not incluir_anuladas:
+        anuladas = np.load(_ruta(directorio, ANULADAS))
+        if len(anuladas):
+            vigentes = ~np.isin(columnas['factura_id'], anuladas)
+            columnas = {columna: valores[vigentes] for columna, valores in columnas.items()}
+    return columnas, _leer_json(_ruta(directorio, DICCIONARIOS), {})
@@ -0,0 +1,45 @@
+"""
+Comando de gestión para exportar los hechos de venta a columnas NumPy (.npy).
+Pensado para ejecutarse cada noche (cron / programador de tareas).
+Uso: python manage.py exportar_hechos_ventas [--directorio <ruta>] [--completo]
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ciencia_datos.hechos_ventas import HORAS_ESPERA_PENDIENTES, exportar_hechos_ventas
+
+
+class Command(BaseCommand):
+    help = 'Agrega los detalles de factura nuevos a la exportación columnar de hechos de venta'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directorio', default=settings.HECHOS_VENTAS_DIR,
+                            help='Directorio de la exportación (por defecto HECHOS_VENTAS_DIR)')
+        parser.add_argument('--completo', action='store_true',
+                            help='Descarta la exportación existente y exporta todo de nuevo')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        manifiesto = exportar_hechos_ventas(options['directorio'], completo=options['completo'])
+
+        if manifiesto['pendientes_exportadas']:
+            self.stdout.write(self.style.WARNING(
+                f"Se exportaron detalles de {len(manifiesto['pendientes_exportadas'])} factura(s) pendientes "
+                f"de hace más de {HORAS_ESPERA_PENDIENTES} horas (ids "
+                f"{', '.join(str(factura_id) for factura_id in manifiesto['pendientes_exportadas'][:10])}"
+                f"{', ...' if len(manifiesto['pendientes_exportadas']) > 10 else ''}); "
+                f"complételas o anúlelas en el admin."
+            ))
+        if manifiesto['factura_pendiente']:
+            self.stdout.write(self.style.WARNING(
+                f"La factura pendiente #{manifiesto['factura_pendiente']} detiene la exportación; "
+                f"los detalles posteriores se agregarán cuando se complete o anule."
+            ))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ {manifiesto['agregadas']} filas agregadas ({manifiesto['filas']} en total, "
+                f"marca de agua {manifiesto['marca_de_agua']}) en {time.perf_counter() - inicio:.2f}s: "
+                f"{options['directorio']}"
+            )
+        )
@@ -0,0 +1,19 @@
+"""
+Utilidades compartidas por las vistas del sistema.
+"""
+from django.core.paginator import Paginator
+
+
+def paginar(request, queryset, por_pagina=50):
+    """
+    Pagina un queryset según el parámetro GET 'pagina'.
+    Retorna la página solicitada y los demás parámetros GET codificados,
+    para conservar los filtros en los enlaces de paginación.
+    """
+    paginator = Paginator(queryset, por_pagina)
+    pagina = paginator.get_page(request.GET.get('pagina'))
+    
+    parametros = request.GET.copy()
+    parametros.pop('pagina', None)
+    
+    return pagina, parametros.urlencode()
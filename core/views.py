@@ -4,11 +4,12 @@ Vistas principales del sistema.
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.db.models import Sum, Count, Q, F
-from datetime import date
+from django.db.models import Sum, Count, Q
 
 from ventas.models import Factura, Cliente
 from inventario.models import Producto
+from reportes.models import VentaDiariaVendedor
+from reportes.rankings import limites_periodo, ranking
 
 
 @login_required
@@ -17,19 +18,17 @@ def dashboard(request):
     Vista del dashboard principal con resumen del sistema.
     """
     fecha_actual = timezone.now()
-    hoy = date.today()
+    hoy = timezone.localdate()
     
-    # Ventas del día
-    ventas_dia = Factura.objects.filter(
-        fecha_venta__date=hoy,
-        estado='COMPLETADA'
+    # Ventas del día (desde el resumen diario por vendedor)
+    ventas_dia = VentaDiariaVendedor.objects.filter(
+        fecha=hoy
     ).aggregate(total=Sum('total'))['total'] or 0
     
-    # Productos por agotarse (usando F para comparar campos)
+    # Productos por agotarse (indicador mantenido con índice parcial)
     productos_por_agotarse = Producto.objects.filter(
-        activo=True
-    ).filter(
-        stock_actual__lte=F('stock_minimo')
+        activo=True,
+        por_agotarse=True
     ).count()
     
     # Total de productos activos
@@ -43,6 +42,12 @@ def dashboard(request):
         estado='COMPLETADA'
     ).order_by('-fecha_venta')[:5]
     
+    # Más vendidos de hoy y de la semana (rankings mantenidos al facturar)
+    mas_vendidos = [
+        (titulo, ranking(periodo, hoy, limite=5), *limites_periodo(periodo, hoy))
+        for periodo, titulo in [('DIA', 'Más Vendidos Hoy'), ('SEMANA', 'Más Vendidos de la Semana')]
+    ]
+    
     context = {
         'fecha_actual': fecha_actual,
         'ventas_dia': ventas_dia,
@@ -50,6 +55,7 @@ def dashboard(request):
         'total_productos': total_productos,
         'total_clientes': total_clientes,
         'ultimas_facturas': ultimas_facturas,
+        'mas_vendidos': mas_vendidos,
     }
     
     return render(request, 'dashboard.html', context)
@@ -1,11 +1,18 @@
-from django.contrib import admin
-from .models import Categoria, NombreProducto, Producto, EntradaCompra, DetalleEntradaCompra, AjusteInventario
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.core.exceptions import ValidationError
+from django.template.response import TemplateResponse
+from .models import (
+    Categoria, NombreProducto, Producto, Proveedor, EntradaCompra, DetalleEntradaCompra,
+    AjusteInventario, RecalculoStockMinimo, HistorialPrecio, EstadisticaProducto
+)
+from .precios import vista_previa_repreciado, aplicar_repreciado
 
 
 @admin.register(Categoria)
 class CategoriaAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'activa', 'fecha_creacion']
-    list_filter = ['activa']
+    list_display = ['nombre', 'activa', 'dias_entrega', 'factor_seguridad', 'stock_minimo_manual', 'fecha_creacion']
+    list_filter = ['activa', 'stock_minimo_manual']
     search_fields = ['nombre', 'descripcion']
     readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
 
@@ -30,6 +37,14 @@ class NombreProductoAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(Proveedor)
+class ProveedorAdmin(admin.ModelAdmin):
+    list_display = ['nombre', 'activo', 'fecha_creacion']
+    list_filter = ['activo']
+    search_fields = ['nombre', 'clave']
+    readonly_fields = ['clave', 'fecha_creacion', 'fecha_actualizacion']
+
+
 class DetalleEntradaCompraInline(admin.TabularInline):
     model = DetalleEntradaCompra
     extra = 1
@@ -39,9 +54,11 @@ class DetalleEntradaCompraInline(admin.TabularInline):
 
 @admin.register(EntradaCompra)
 class EntradaCompraAdmin(admin.ModelAdmin):
-    list_display = ['id', 'numero_factura', 'proveedor', 'fecha_compra', 'total', 'usuario_registro']
-    list_filter = ['fecha_compra', 'usuario_registro']
-    search_fields = ['numero_factura', 'proveedor']
+    list_display = ['id', 'numero_factura', 'proveedor', 'fecha_compra', 'total', 'estado', 'usuario_registro']
+    list_filter = ['estado', 'fecha_compra', 'usuario_registro']
+    search_fields = ['numero_factura', 'proveedor__nombre']
+    list_select_related = ['proveedor', 'usuario_registro']
+    autocomplete_fields = ['proveedor']
     readonly_fields = ['fecha_creacion', 'fecha_actualizacion', 'total']
     inlines = [DetalleEntradaCompraInline]
     
@@ -51,12 +68,57 @@ class EntradaCompraAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.action(description='Recalcular precio de venta (costo + ganancia)')
+def repreciar_productos(modeladmin, request, queryset):
+    """
+    Acción que recalcula el precio de venta de los productos seleccionados en un
+    solo UPDATE. Muestra primero una vista previa con las diferencias y permite
+    indicar un nuevo porcentaje de ganancia.
+    """
+    porcentaje_texto = request.POST.get('porcentaje_ganancia', '').strip()
+    porcentaje = None
+    valido = True
+    if porcentaje_texto:
+        # Las mismas validaciones del campo: número finito, no negativo y que quepa en la columna
+        try:
+            porcentaje = Producto._meta.get_field('porcentaje_ganancia').clean(porcentaje_texto, None)
+        except ValidationError as error:
+            valido = False
+            modeladmin.message_user(
+                request, f"El porcentaje de ganancia no es válido: {' '.join(error.messages)}", messages.ERROR
+            )
+    
+    if 'aplicar' in request.POST and valido:
+        cambios = aplicar_repreciado(
+            queryset,
+            porcentaje_ganancia=porcentaje,
+            usuario=request.user,
+            motivo='Recálculo masivo desde el admin'
+        )
+        modeladmin.message_user(
+            request, f'Se actualizó el precio de venta de {len(cambios)} productos.', messages.SUCCESS
+        )
+        return None
+    
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        'title': 'Recalcular precio de venta',
+        'opts': modeladmin.model._meta,
+        'productos': queryset,
+        'cambios': vista_previa_repreciado(queryset, porcentaje),
+        'porcentaje_ganancia': porcentaje_texto,
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+    }
+    return TemplateResponse(request, 'admin/inventario/producto/repreciar.html', context)
+
+
 @admin.register(Producto)
 class ProductoAdmin(admin.ModelAdmin):
     list_display = ['codigo', 'nombre_producto', 'categoria', 'precio_venta', 'stock_actual', 'stock_minimo', 'activo']
-    list_filter = ['categoria', 'activo', 'nombre_producto']
+    list_filter = ['categoria', 'activo', 'por_agotarse', 'clase_abc_ingresos', 'clase_abc_unidades', 'nombre_producto']
     search_fields = ['codigo', 'nombre_producto__nombre', 'descripcion']
-    readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
+    actions = [repreciar_productos]
+    readonly_fields = ['por_agotarse', 'clase_abc_ingresos', 'clase_abc_unidades', 'fecha_creacion', 'fecha_actualizacion']
     fieldsets = (
         ('Información Básica', {
             'fields': ('codigo', 'nombre_producto', 'descripcion', 'categoria')
@@ -65,7 +127,7 @@ class ProductoAdmin(admin.ModelAdmin):
             'fields': ('precio_compra', 'costo_promedio', 'porcentaje_ganancia', 'precio_venta', 'actualizar_precio_automatico')
         }),
         ('Inventario', {
-            'fields': ('stock_actual', 'stock_minimo')
+            'fields': ('stock_actual', 'stock_minimo', 'por_agotarse')
         }),
         ('Estado', {
             'fields': ('activo',)
@@ -89,3 +151,41 @@ class AjusteInventarioAdmin(admin.ModelAdmin):
             obj.usuario_registro = request.user
         super().save_model(request, obj, form, change)
 
+
+@admin.register(RecalculoStockMinimo)
+class RecalculoStockMinimoAdmin(admin.ModelAdmin):
+    list_display = ['fecha_ejecucion', 'dry_run', 'dias_historial', 'dias_entrega', 'productos_analizados', 'productos_modificados', 'duracion_segundos']
+    list_filter = ['dry_run', 'fecha_ejecucion']
+    readonly_fields = [
+        'fecha_ejecucion', 'dry_run', 'dias_historial', 'dias_entrega',
+        'productos_analizados', 'productos_modificados', 'duracion_segundos', 'diferencias'
+    ]
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(HistorialPrecio)
+class HistorialPrecioAdmin(admin.ModelAdmin):
+    list_display = ['producto', 'precio_anterior', 'precio_nuevo', 'costo', 'porcentaje_ganancia', 'motivo', 'usuario', 'fecha']
+    list_filter = ['fecha', 'producto__categoria']
+    search_fields = ['producto__codigo', 'producto__nombre_producto__nombre', 'motivo']
+    date_hierarchy = 'fecha'
+    readonly_fields = ['producto', 'precio_anterior', 'precio_nuevo', 'costo', 'porcentaje_ganancia', 'motivo', 'usuario', 'fecha']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(EstadisticaProducto)
+class EstadisticaProductoAdmin(admin.ModelAdmin):
+    list_display = ['producto', 'unidades_7_dias', 'unidades_30_dias', 'unidades_90_dias', 'unidades_totales', 'ultima_venta', 'ultima_compra', 'fecha_calculo']
+    list_filter = ['producto__categoria']
+    search_fields = ['producto__codigo', 'producto__nombre_producto__nombre']
+    readonly_fields = [
+        'producto', 'unidades_7_dias', 'unidades_30_dias', 'unidades_90_dias', 'ingresos_30_dias',
+        'unidades_totales', 'ultima_venta', 'ultima_compra', 'fecha_calculo', 'fecha_actualizacion'
+    ]
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,110 @@
+"""
+Búsqueda de productos por texto completo.
+
+Cada producto mantiene la columna `texto_busqueda` (nombre, código y descripción
+en minúsculas y sin tildes), que se actualiza al guardar el producto o su
+NombreProducto. Sobre esa columna:
+
+- SQLite: tabla virtual FTS5 `inventario_producto_fts` (rowid = id del producto),
+  sincronizada desde los signals de Producto, con ranking bm25 y búsqueda por prefijo.
+- PostgreSQL: índice GIN de trigramas (pg_trgm), ranking por similitud.
+- Otros motores: filtro contains sobre la columna normalizada.
+"""
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+TABLA_FTS = 'inventario_producto_fts'
+
+
+def normalizar_texto(*partes):
+    """
+    Une las partes de texto, las pasa a minúsculas y elimina tildes y diéresis
+    ("Azúcar" -> "azucar") para permitir búsquedas insensibles a acentos.
+    """
+    texto = ' '.join(parte for parte in partes if parte)
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def usa_fts():
+    """Indica si la base de datos actual mantiene la tabla FTS5."""
+    return connection.vendor == 'sqlite'
+
+
+def indexar_productos(productos):
+    """
+    Actualiza la tabla FTS5 con el texto_busqueda de los productos indicados.
+    No hace nada en motores distintos de SQLite (el índice es la propia columna).
+    """
+    if not usa_fts():
+        return
+    filas = [(producto.id, producto.texto_busqueda) for producto in productos]
+    if not filas:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {TABLA_FTS} WHERE rowid = %s', [(fila[0],) for fila in filas])
+        cursor.executemany(f'INSERT INTO {TABLA_FTS}(rowid, texto_busqueda) VALUES (%s, %s)', filas)
+
+
+def desindexar_producto(producto_id):
+    """Elimina un producto de la tabla FTS5."""
+    if not usa_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLA_FTS} WHERE rowid = %s', [producto_id])
+
+
+def reconstruir_indice():
+    """Vuelve a llenar la tabla FTS5 a partir de la columna texto_busqueda."""
+    if not usa_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLA_FTS}')
+        cursor.execute(
+            f'INSERT INTO {TABLA_FTS}(rowid, texto_busqueda) '
+            f'SELECT id, texto_busqueda FROM inventario_producto'
+        )
+
+
+def terminos_busqueda(query):
+    """Divide la consulta normalizada en términos alfanuméricos."""
+    return re.findall(r'\w+', normalizar_texto(query))
+
+
+def buscar_productos(productos, query):
+    """
+    Filtra el queryset de productos por la consulta y lo ordena por relevancia.
+    Todos los términos deben aparecer (como prefijo de palabra en SQLite).
+    """
+    terminos = terminos_busqueda(query)
+    if not terminos:
+        return productos
+
+    if usa_fts():
+        consulta_fts = ' '.join(f'"{termino}"*' for termino in terminos)
+        return productos.filter(
+            id__in=RawSQL(
+                f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s',
+                [consulta_fts]
+            )
+        ).annotate(
+            relevancia=RawSQL(
+                f'SELECT bm25({TABLA_FTS}) FROM {TABLA_FTS} '
+                f'WHERE {TABLA_FTS} MATCH %s AND rowid = inventario_producto.id',
+                [consulta_fts]
+            )
+        ).order_by('relevancia', 'nombre_producto__nombre')
+
+    for termino in terminos:
+        productos = productos.filter(texto_busqueda__contains=termino)
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        return productos.annotate(
+            relevancia=TrigramWordSimilarity(' '.join(terminos), 'texto_busqueda')
+        ).order_by('-relevancia', 'nombre_producto__nombre')
+
+    return productos
@@ -0,0 +1,163 @@
+"""
+Clasificación ABC (Pareto) de los productos.
+
+Los ingresos y las unidades vendidas por producto se obtienen con una sola
+consulta agrupada sobre DetalleFactura; las participaciones acumuladas y los
+límites de cada clase se calculan con NumPy en una pasada vectorizada:
+
+- A: productos que acumulan el primer 80 % (ingresos o unidades)
+- B: los que acumulan hasta el 95 %
+- C: el resto, incluidos los productos sin ventas en el periodo
+
+La clase se guarda en Producto (clase_abc_ingresos, clase_abc_unidades, con
+índice) para filtrar la lista de productos y el reabastecimiento.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Producto
+
+CLASES = np.array(['A', 'B', 'C'])
+
+# Participación acumulada en la que termina cada clase (A y B)
+LIMITES_ABC = (0.80, 0.95)
+
+
+def cargar_ventas_por_producto(fecha_inicio, fecha_fin):
+    """
+    Ingresos y unidades vendidas por producto en el rango [fecha_inicio, fecha_fin]
+    (facturas completadas), como arreglo estructurado de NumPy.
+    """
+    from ventas.models import DetalleFactura
+
+    ventas = DetalleFactura.objects.filter(
+        factura__estado='COMPLETADA',
+        factura__fecha_local__gte=fecha_inicio,
+        factura__fecha_local__lte=fecha_fin
+    ).values('producto_id').annotate(
+        ingresos=Sum('subtotal'),
+        unidades=Sum('cantidad')
+    ).values_list('producto_id', 'ingresos', 'unidades').order_by()
+
+    return np.fromiter(
+        (
+            (producto_id, float(ingresos or 0), unidades or 0)
+            for producto_id, ingresos, unidades in ventas.iterator(chunk_size=10000)
+        ),
+        dtype=[('producto', np.int64), ('ingresos', np.float64), ('unidades', np.float64)]
+    )
+
+
+def clasificar_abc(valores, limites=LIMITES_ABC):
+    """
+    Asigna la clase A/B/C a cada valor y retorna (clases, participacion_acumulada).
+
+    Los valores se ordenan de mayor a menor; un producto pertenece a la clase en
+    la que comienza su aporte, de modo que el producto principal siempre es A.
+    Los valores en cero son siempre C.
+    """
+    n = len(valores)
+    orden = np.argsort(-valores, kind='stable')
+    total = valores.sum()
+    if total <= 0:
+        return np.full(n, 'C'), np.zeros(n)
+
+    acumulado = np.cumsum(valores[orden]) / total
+    inicio = acumulado - valores[orden] / total
+    indice_clase = np.searchsorted(np.asarray(limites), inicio, side='right')
+    indice_clase[valores[orden] <= 0] = len(CLASES) - 1
+
+    clases = np.empty(n, dtype='<U1')
+    clases[orden] = CLASES[indice_clase]
+    participacion = np.empty(n)
+    participacion[orden] = acumulado
+    return clases, participacion
+
+
+def calcular_clasificacion(dias_historial=90, fecha_fin=None):
+    """
+    Calcula la clasificación ABC de todos los productos activos.
+    Retorna un diccionario de arreglos alineados por producto.
+    """
+    fecha_fin = fecha_fin or timezone.localdate()
+    fecha_inicio = fecha_fin - timedelta(days=dias_historial - 1)
+
+    ids = np.fromiter(
+        Producto.objects.filter(activo=True).order_by('id').values_list('id', flat=True),
+        dtype=np.int64
+    )
+    n = len(ids)
+
+    ventas = cargar_ventas_por_producto(fecha_inicio, fecha_fin)
+    posiciones = np.searchsorted(ids, ventas['producto'])
+    validos = posiciones < n
+    validos[validos] = ids[posiciones[validos]] == ventas['producto'][validos]
+
+    ingresos = np.zeros(n)
+    unidades = np.zeros(n)
+    ingresos[posiciones[validos]] = ventas['ingresos'][validos]
+    unidades[posiciones[validos]] = ventas['unidades'][validos]
+
+    clase_ingresos, acumulado_ingresos = clasificar_abc(ingresos)
+    clase_unidades, acumulado_unidades = clasificar_abc(unidades)
+
+    return {
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'producto_id': ids,
+        'ingresos': ingresos,
+        'unidades': unidades,
+        'clase_ingresos': clase_ingresos,
+        'clase_unidades': clase_unidades,
+        'acumulado_ingresos': acumulado_ingresos,
+        'acumulado_unidades': acumulado_unidades,
+    }
+
+
+def resumen_por_clase(resultado, criterio='ingresos'):
+    """Cantidad de productos, total y participación de cada clase según el criterio."""
+    valores = resultado[criterio]
+    clases = resultado[f'clase_{criterio}']
+    total = valores.sum()
+    resumen = []
+    for clase in CLASES:
+        mascara = clases == clase
+        suma = float(valores[mascara].sum())
+        resumen.append({
+            'clase': str(clase),
+            'productos': int(mascara.sum()),
+            'total': suma,
+            'participacion': suma * 100 / total if total else 0,
+        })
+    return resumen
+
+
+def guardar_clasificacion(resultado):
+    """
+    Guarda en Producto las clases que cambiaron (un solo bulk_update).
+    Los productos inactivos pasan a clase C. Retorna la cantidad de productos modificados.
+    """
+    nuevas = {
+        int(producto_id): (str(ingresos), str(unidades))
+        for producto_id, ingresos, unidades in zip(
+            resultado['producto_id'], resultado['clase_ingresos'], resultado['clase_unidades']
+        )
+    }
+
+    modificados = []
+    for producto in Producto.objects.only('id', 'clase_abc_ingresos', 'clase_abc_unidades'):
+        clase_ingresos, clase_unidades = nuevas.get(producto.id, ('C', 'C'))
+        if (producto.clase_abc_ingresos, producto.clase_abc_unidades) != (clase_ingresos, clase_unidades):
+            producto.clase_abc_ingresos = clase_ingresos
+            producto.clase_abc_unidades = clase_unidades
+            modificados.append(producto)
+
+    with transaction.atomic():
+        Producto.objects.bulk_update(
+            modificados, ['clase_abc_ingresos', 'clase_abc_unidades'], batch_size=1000
+        )
+    return len(modificados)
@@ -0,0 +1,150 @@
+"""
+Estadísticas precalculadas por producto (EstadisticaProducto).
+
+- Al vender se suman las unidades con un UPDATE incremental (F()), sin recorrer
+  el historial de ventas.
+- Al anular una factura o eliminar un detalle se recalculan solo los productos
+  afectados.
+- Al registrar una compra se actualiza la fecha de la última compra.
+
+Las ventanas de 7/30/90 días se desplazan con el tiempo, por lo que el comando
+reconstruir_estadisticas_productos debe ejecutarse cada noche para recalcularlas.
+"""
+from datetime import datetime, timedelta
+
+from django.db.models import Case, F, Max, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import Producto, DetalleEntradaCompra, EstadisticaProducto
+
+VENTANAS = {
+    'unidades_7_dias': 7,
+    'unidades_30_dias': 30,
+    'unidades_90_dias': 90,
+}
+
+CAMPOS_CALCULADOS = [
+    'unidades_7_dias', 'unidades_30_dias', 'unidades_90_dias', 'ingresos_30_dias',
+    'unidades_totales', 'ultima_venta', 'ultima_compra', 'fecha_calculo', 'fecha_actualizacion',
+]
+
+
+def actualizar_estadisticas(producto_ids=None):
+    """
+    Recalcula por completo las estadísticas de los productos indicados (todos si
+    producto_ids es None) con dos consultas agrupadas y un upsert.
+    Retorna la cantidad de productos actualizados.
+    """
+    from ventas.models import DetalleFactura
+
+    ahora = timezone.now()
+    productos = Producto.objects.all()
+    ventas = DetalleFactura.objects.filter(factura__estado='COMPLETADA')
+    compras = DetalleEntradaCompra.objects.filter(entrada_compra__estado='REGISTRADA')
+    if producto_ids is not None:
+        productos = productos.filter(id__in=producto_ids)
+        ventas = ventas.filter(producto_id__in=producto_ids)
+        compras = compras.filter(producto_id__in=producto_ids)
+
+    agregados = {
+        campo: Sum('cantidad', filter=Q(factura__fecha_venta__gte=ahora - timedelta(days=dias)))
+        for campo, dias in VENTANAS.items()
+    }
+    ventas_por_producto = {
+        fila['producto_id']: fila
+        for fila in ventas.values('producto_id').annotate(
+            ingresos_30_dias=Sum('subtotal', filter=Q(factura__fecha_venta__gte=ahora - timedelta(days=30))),
+            unidades_totales=Sum('cantidad'),
+            ultima_venta=Max('factura__fecha_venta'),
+            **agregados
+        ).order_by()
+    }
+    ultima_compra = dict(
+        compras.values('producto_id').annotate(
+            ultima=Max('entrada_compra__fecha_compra')
+        ).values_list('producto_id', 'ultima').order_by()
+    )
+
+    estadisticas = []
+    for producto_id in productos.values_list('id', flat=True).order_by():
+        venta = ventas_por_producto.get(producto_id, {})
+        estadisticas.append(EstadisticaProducto(
+            producto_id=producto_id,
+            unidades_7_dias=venta.get('unidades_7_dias') or 0,
+            unidades_30_dias=venta.get('unidades_30_dias') or 0,
+            unidades_90_dias=venta.get('unidades_90_dias') or 0,
+            ingresos_30_dias=venta.get('ingresos_30_dias') or 0,
+            unidades_totales=venta.get('unidades_totales') or 0,
+            ultima_venta=venta.get('ultima_venta'),
+            ultima_compra=ultima_compra.get(producto_id),
+            fecha_calculo=ahora
+        ))
+
+    EstadisticaProducto.objects.bulk_create(
+        estadisticas,
+        update_conflicts=True,
+        unique_fields=['producto'],
+        update_fields=CAMPOS_CALCULADOS,
+        batch_size=1000
+    )
+    return len(estadisticas)
+
+
+def _fecha_mas_reciente(campo, fecha):
+    """Expresión que conserva el valor del campo si es posterior a `fecha`."""
+    campo_modelo = EstadisticaProducto._meta.get_field(campo)
+    return Case(
+        When(**{f'{campo}__gte': fecha}, then=F(campo)),
+        default=Value(fecha, output_field=campo_modelo),
+        output_field=campo_modelo
+    )
+
+
+def registrar_venta(detalle):
+    """
+    Suma un detalle de factura recién creado a las estadísticas de su producto.
+    Si el producto aún no tiene estadísticas, se calculan completas.
+    """
+    fecha = detalle.factura.fecha_venta
+    ahora = timezone.now()
+    campos = {
+        campo: F(campo) + detalle.cantidad
+        for campo, dias in VENTANAS.items()
+        if fecha >= ahora - timedelta(days=dias)
+    }
+    if fecha >= ahora - timedelta(days=30):
+        campos['ingresos_30_dias'] = F('ingresos_30_dias') + detalle.subtotal
+
+    actualizados = EstadisticaProducto.objects.filter(producto_id=detalle.producto_id).update(
+        unidades_totales=F('unidades_totales') + detalle.cantidad,
+        ultima_venta=_fecha_mas_reciente('ultima_venta', fecha),
+        fecha_actualizacion=ahora,
+        **campos
+    )
+    if not actualizados:
+        actualizar_estadisticas([detalle.producto_id])
+
+
+def registrar_compra(producto_id, fecha):
+    """Actualiza la fecha de la última compra del producto."""
+    if isinstance(fecha, datetime):
+        fecha = timezone.localdate(fecha)
+
+    actualizados = EstadisticaProducto.objects.filter(producto_id=producto_id).update(
+        ultima_compra=_fecha_mas_reciente('ultima_compra', fecha),
+        fecha_actualizacion=timezone.now()
+    )
+    if not actualizados:
+        actualizar_estadisticas([producto_id])
+
+
+def obtener_estadisticas(producto):
+    """
+    Lee las estadísticas del producto por clave primaria. Si todavía no existen
+    (producto nuevo o tabla sin reconstruir), se calculan en ese momento.
+    """
+    estadisticas = EstadisticaProducto.objects.filter(pk=producto.pk).first()
+    if estadisticas is None:
+        actualizar_estadisticas([producto.pk])
+        estadisticas = EstadisticaProducto.objects.filter(pk=producto.pk).first()
+    return estadisticas
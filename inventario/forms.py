@@ -109,12 +109,26 @@ class CategoriaForm(forms.ModelForm):
     """
     class Meta:
         model = Categoria
-        fields = ['nombre', 'descripcion', 'activa']
+        fields = ['nombre', 'descripcion', 'activa', 'dias_entrega', 'factor_seguridad', 'stock_minimo_manual']
         widgets = {
             'nombre': forms.TextInput(attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
                 'placeholder': 'Nombre de la categoría'
             }),
+            'dias_entrega': forms.NumberInput(attrs={
+                'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
+                'placeholder': 'Por defecto: 7',
+                'min': '0'
+            }),
+            'factor_seguridad': forms.NumberInput(attrs={
+                'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
+                'placeholder': 'Por defecto: 1.65',
+                'step': '0.01',
+                'min': '0'
+            }),
+            'stock_minimo_manual': forms.CheckboxInput(attrs={
+                'class': 'w-4 h-4 text-blue-600 border-gray-300 rounded focus:ring-blue-500'
+            }),
             'descripcion': forms.Textarea(attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
                 'rows': 3,
@@ -129,19 +143,28 @@ class CategoriaForm(forms.ModelForm):
 class EntradaCompraForm(forms.ModelForm):
     """
     Formulario para crear entradas de compra.
+    El proveedor se escribe por nombre (con autocompletado) y se resuelve a un
+    Proveedor existente o nuevo al registrar la entrada.
     """
+    proveedor = forms.CharField(
+        label='Proveedor',
+        max_length=200,
+        widget=forms.TextInput(attrs={
+            'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
+            'placeholder': 'Nombre del proveedor',
+            'list': 'listaProveedores',
+            'autocomplete': 'off'
+        })
+    )
+    
     class Meta:
         model = EntradaCompra
-        fields = ['numero_factura', 'proveedor', 'fecha_compra', 'observaciones']
+        fields = ['numero_factura', 'fecha_compra', 'observaciones']
         widgets = {
             'numero_factura': forms.TextInput(attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
                 'placeholder': 'Número de factura del proveedor'
             }),
-            'proveedor': forms.TextInput(attrs={
-                'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
-                'placeholder': 'Nombre del proveedor'
-            }),
             'fecha_compra': forms.DateInput(attrs={
                 'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
                 'type': 'date'
@@ -154,7 +177,6 @@ class EntradaCompraForm(forms.ModelForm):
         }
         labels = {
             'numero_factura': 'Número de Factura de Compra',
-            'proveedor': 'Proveedor',
             'fecha_compra': 'Fecha de Compra',
             'observaciones': 'Observaciones',
         }
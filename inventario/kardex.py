@@ -0,0 +1,171 @@
+"""
+Kardex (tarjeta de existencias) de un producto: cada movimiento con el saldo
+acumulado y el costo promedio ponderado acumulado.
+
+Se calcula en la base de datos con funciones de ventana sobre la vista
+MovimientoInventario (compras registradas + ajustes, que incluyen ventas y
+anulaciones). El costo promedio es la misma regla de
+Producto.actualizar_costo_promedio: Σ(cantidad × precio) / Σ(cantidad) de las
+compras hasta ese movimiento.
+
+La paginación es por conjunto de claves (keyset): cada página pide los
+movimientos posteriores a la clave (fecha, orden, linea_id) del último
+movimiento mostrado. Las ventanas solo suman las filas de la página, así que el
+cursor lleva los acumulados hasta ese punto (firmados, para que no se puedan
+alterar) y la página 1000 cuesta lo mismo que la primera.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core import signing
+from django.db.models import Case, DecimalField, F, IntegerField, Q, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
+from django.db.models.expressions import RowRange
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import MovimientoInventario
+
+ORDEN = ['fecha', 'orden', 'linea_id']
+
+SAL_CURSOR = 'inventario.kardex'
+
+_CERO = Decimal('0')
+
+
+def _inicio_del_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def _movimientos(producto_id, fecha_inicio=None, fecha_fin=None):
+    movimientos = MovimientoInventario.objects.filter(producto_id=producto_id)
+    if fecha_inicio:
+        movimientos = movimientos.filter(fecha__gte=_inicio_del_dia(fecha_inicio))
+    if fecha_fin:
+        movimientos = movimientos.filter(fecha__lt=_inicio_del_dia(fecha_fin + timedelta(days=1)))
+    return movimientos
+
+
+def _despues_de(movimientos, clave):
+    """Movimientos posteriores a la clave (fecha, orden, linea_id)."""
+    fecha, orden, linea_id = clave
+    return movimientos.filter(
+        Q(fecha__gt=fecha)
+        | Q(fecha=fecha, orden__gt=orden)
+        | Q(fecha=fecha, orden=orden, linea_id__gt=linea_id)
+    )
+
+
+def _unidades_compradas():
+    return Case(When(tipo='COMPRA', then=F('cantidad')), default=Value(0), output_field=IntegerField())
+
+
+def _valor_comprado():
+    return Case(
+        When(tipo='COMPRA', then=F('cantidad') * F('costo_unitario')),
+        default=Value(_CERO),
+        output_field=DecimalField(max_digits=18, decimal_places=2)
+    )
+
+
+def _con_acumulados(movimientos):
+    """Anota los acumulados de la ventana (desde la primera fila del queryset)."""
+    acumulado = {'order_by': [F(campo).asc() for campo in ORDEN], 'frame': RowRange(start=None, end=0)}
+    return movimientos.annotate(
+        saldo_parcial=Window(Sum('cantidad'), **acumulado),
+        unidades_parcial=Window(Sum(_unidades_compradas()), **acumulado),
+        valor_parcial=Window(Sum(_valor_comprado()), **acumulado),
+    ).order_by(*ORDEN)
+
+
+def saldos_iniciales(producto, fecha_inicio=None):
+    """
+    Saldo, unidades compradas y valor comprado antes del primer movimiento del
+    kardex (o antes de `fecha_inicio`). El saldo parte del stock actual menos los
+    movimientos posteriores, así incluye el stock cargado al crear el producto.
+    """
+    posteriores = _movimientos(producto.id, fecha_inicio).aggregate(
+        total=Coalesce(Sum('cantidad'), 0)
+    )['total']
+    iniciales = {'saldo': producto.stock_actual - posteriores, 'unidades': 0, 'valor': _CERO}
+    if fecha_inicio:
+        compras = MovimientoInventario.objects.filter(
+            producto_id=producto.id, tipo='COMPRA', fecha__lt=_inicio_del_dia(fecha_inicio)
+        ).aggregate(unidades=Sum('cantidad'), valor=Sum(_valor_comprado()))
+        iniciales['unidades'] = compras['unidades'] or 0
+        iniciales['valor'] = compras['valor'] or _CERO
+    return iniciales
+
+
+def _filas(movimientos, iniciales):
+    """Suma los acumulados iniciales a los de la ventana y calcula costo y valor."""
+    for movimiento in movimientos:
+        movimiento.saldo = iniciales['saldo'] + movimiento.saldo_parcial
+        unidades = iniciales['unidades'] + movimiento.unidades_parcial
+        valor = iniciales['valor'] + (movimiento.valor_parcial or _CERO)
+        movimiento.costo_promedio = (valor / unidades).quantize(Decimal('0.01')) if unidades else None
+        movimiento.valor_saldo = (
+            movimiento.costo_promedio * movimiento.saldo if movimiento.costo_promedio is not None else None
+        )
+        movimiento.acumulados = {'saldo': movimiento.saldo, 'unidades': unidades, 'valor': valor}
+        yield movimiento
+
+
+def _alcance(producto, fecha_inicio):
+    return [producto.id, fecha_inicio.isoformat() if fecha_inicio else None]
+
+
+def generar_cursor(producto, fecha_inicio, movimiento):
+    """Cursor firmado con la clave y los acumulados del movimiento (válido solo para ese kardex)."""
+    return signing.dumps({
+        'kardex': _alcance(producto, fecha_inicio),
+        'clave': [movimiento.fecha.isoformat(), movimiento.orden, movimiento.linea_id],
+        'saldo': movimiento.acumulados['saldo'],
+        'unidades': movimiento.acumulados['unidades'],
+        'valor': str(movimiento.acumulados['valor']),
+    }, salt=SAL_CURSOR, compress=True)
+
+
+def leer_cursor(producto, fecha_inicio, cursor):
+    """(clave, acumulados) del cursor, o None si no es válido para este kardex."""
+    try:
+        datos = signing.loads(cursor, salt=SAL_CURSOR)
+        if datos['kardex'] != _alcance(producto, fecha_inicio):
+            return None
+        fecha, orden, linea_id = datos['clave']
+        clave = (parse_datetime(fecha), int(orden), int(linea_id))
+        acumulados = {'saldo': int(datos['saldo']), 'unidades': int(datos['unidades']), 'valor': Decimal(datos['valor'])}
+    except (signing.BadSignature, KeyError, TypeError, ValueError, ArithmeticError):
+        return None
+    if clave[0] is None:
+        return None
+    return clave, acumulados
+
+
+def pagina_kardex(producto, fecha_inicio=None, fecha_fin=None, cursor=None, por_pagina=50):
+    """
+    Una página del kardex. Retorna (movimientos, saldo_inicial, siguiente_cursor):
+    el saldo inicial solo en la primera página (None en las siguientes) y el
+    cursor de la siguiente página (None al final). Un cursor inválido vuelve a
+    la primera página.
+    """
+    movimientos = _movimientos(producto.id, fecha_inicio, fecha_fin)
+    leido = leer_cursor(producto, fecha_inicio, cursor) if cursor else None
+    if leido:
+        clave, iniciales = leido
+        movimientos = _despues_de(movimientos, clave)
+        saldo_inicial = None
+    else:
+        iniciales = saldos_iniciales(producto, fecha_inicio)
+        saldo_inicial = iniciales['saldo']
+
+    filas = list(_filas(_con_acumulados(movimientos)[:por_pagina + 1], iniciales))
+    siguiente = generar_cursor(producto, fecha_inicio, filas[por_pagina - 1]) if len(filas) > por_pagina else None
+    return filas[:por_pagina], saldo_inicial, siguiente
+
+
+def kardex_completo(producto, fecha_inicio=None, fecha_fin=None):
+    """Todos los movimientos del rango con sus acumulados, leídos por bloques (para exportar)."""
+    iniciales = saldos_iniciales(producto, fecha_inicio)
+    movimientos = _con_acumulados(_movimientos(producto.id, fecha_inicio, fecha_fin))
+    return _filas(movimientos.iterator(chunk_size=2000), iniciales)
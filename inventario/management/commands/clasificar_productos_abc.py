@@ -0,0 +1,46 @@
+"""
+Comando de gestión para recalcular la clasificación ABC de los productos.
+Pensado para ejecutarse cada noche (cron / programador de tareas).
+Uso: python manage.py clasificar_productos_abc [--dias-historial 90] [--dry-run]
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from inventario.clasificacion import calcular_clasificacion, guardar_clasificacion, resumen_por_clase
+
+
+class Command(BaseCommand):
+    help = 'Clasifica los productos en A/B/C según sus ingresos y unidades vendidas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias-historial', type=int, default=90,
+                            help='Días de historial de ventas a considerar (por defecto 90)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo muestra el resumen, sin guardar las clases')
+
+    def handle(self, *args, **options):
+        if options['dias_historial'] < 1:
+            raise CommandError('--dias-historial debe ser mayor que cero.')
+
+        inicio = time.perf_counter()
+        resultado = calcular_clasificacion(dias_historial=options['dias_historial'])
+
+        for criterio in ('ingresos', 'unidades'):
+            self.stdout.write(f'\nPor {criterio}:')
+            for fila in resumen_por_clase(resultado, criterio):
+                self.stdout.write(
+                    f"  {fila['clase']}: {fila['productos']:>6} productos  "
+                    f"{fila['total']:>14,.2f}  ({fila['participacion']:.1f} %)"
+                )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('\nSimulación: no se guardó ninguna clase.'))
+            return
+
+        modificados = guardar_clasificacion(resultado)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✓ {len(resultado['producto_id'])} productos clasificados en "
+                f"{time.perf_counter() - inicio:.2f}s; {modificados} cambiaron de clase."
+            )
+        )
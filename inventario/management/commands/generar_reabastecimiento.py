@@ -0,0 +1,77 @@
+"""
+Comando de gestión para calcular las sugerencias de reabastecimiento.
+Uso: python manage.py generar_reabastecimiento [--clase A] [--crear-borradores --usuario admin]
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from usuarios.models import Usuario
+from inventario.reabastecimiento import (
+    calcular_reabastecimiento, sugerencias_de_compra, generar_borradores
+)
+
+
+class Command(BaseCommand):
+    help = 'Calcula puntos de reorden y cantidades a pedir; opcionalmente crea pedidos en borrador por proveedor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias-historial', type=int, default=90,
+                            help='Días de historial de ventas a considerar (por defecto 90)')
+        parser.add_argument('--dias-entrega', type=int, default=7,
+                            help='Tiempo de entrega del proveedor en días (por defecto 7)')
+        parser.add_argument('--dias-revision', type=int, default=14,
+                            help='Días entre pedidos que debe cubrir la reposición (por defecto 14)')
+        parser.add_argument('--z', type=float, default=1.65,
+                            help='Factor de nivel de servicio para el stock de seguridad (por defecto 1.65 ≈ 95%%)')
+        parser.add_argument('--clase', action='append', choices=['A', 'B', 'C'], dest='clases',
+                            help='Solo productos de la clase ABC indicada (puede repetirse)')
+        parser.add_argument('--crear-borradores', action='store_true',
+                            help='Crea las entradas de compra en estado BORRADOR agrupadas por proveedor')
+        parser.add_argument('--usuario',
+                            help='Usuario que registra los borradores (requerido con --crear-borradores)')
+
+    def handle(self, *args, **options):
+        if options['dias_historial'] < 1:
+            raise CommandError('--dias-historial debe ser mayor que cero.')
+
+        usuario = None
+        if options['crear_borradores']:
+            if not options['usuario']:
+                raise CommandError('Debe indicar --usuario para crear los borradores.')
+            try:
+                usuario = Usuario.objects.get(username=options['usuario'])
+            except Usuario.DoesNotExist:
+                raise CommandError(f"No existe el usuario '{options['usuario']}'.")
+
+        inicio = time.perf_counter()
+        resultado = calcular_reabastecimiento(
+            dias_historial=options['dias_historial'],
+            dias_entrega=options['dias_entrega'],
+            dias_revision=options['dias_revision'],
+            nivel_servicio_z=options['z'],
+            clases_abc=options['clases'],
+        )
+        duracion = time.perf_counter() - inicio
+
+        sugerencias = sugerencias_de_compra(resultado)
+        for item in sugerencias:
+            self.stdout.write(
+                f"{item['producto'].codigo:<15} {item['producto'].nombre[:30]:<30} "
+                f"stock={item['stock_actual']:<6} vel/día={item['velocidad']:.2f} "
+                f"cobertura={item['dias_cobertura']:.1f}d pedir={item['cantidad_pedir']} "
+                f"({item['proveedor']})"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✓ {len(resultado['producto_id'])} productos analizados en {duracion:.2f}s; "
+                f"{len(sugerencias)} requieren pedido."
+            )
+        )
+
+        if usuario:
+            borradores = generar_borradores(resultado, usuario)
+            for entrada in borradores:
+                self.stdout.write(
+                    self.style.SUCCESS(f'✓ Borrador creado: {entrada} - C$ {entrada.total:.2f}')
+                )
@@ -0,0 +1,54 @@
+"""
+Comando de gestión para recalcular el stock mínimo de los productos.
+Pensado para ejecutarse periódicamente (cron / programador de tareas).
+Uso: python manage.py recalcular_stock_minimo [--dry-run]
+"""
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+from inventario.recalibracion import recalcular_stock_minimo
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el stock mínimo de cada producto a partir del tiempo de entrega y la demanda reciente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias-historial', type=int, default=90,
+                            help='Días de historial de ventas a considerar (por defecto 90)')
+        parser.add_argument('--dias-entrega', type=int, default=7,
+                            help='Tiempo de entrega por defecto en días (la categoría puede sobrescribirlo)')
+        parser.add_argument('--z', type=float, default=1.65,
+                            help='Factor de seguridad por defecto (la categoría puede sobrescribirlo)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo muestra el reporte de diferencias, sin guardar cambios')
+
+    def handle(self, *args, **options):
+        if options['dias_historial'] < 1:
+            raise CommandError('--dias-historial debe ser mayor que cero.')
+        if options['dias_entrega'] < 1:
+            raise CommandError('--dias-entrega debe ser mayor que cero.')
+        if not math.isfinite(options['z']) or options['z'] < 0:
+            raise CommandError('--z debe ser un número mayor o igual que cero.')
+
+        recalculo = recalcular_stock_minimo(
+            dias_historial=options['dias_historial'],
+            dias_entrega=options['dias_entrega'],
+            nivel_servicio_z=options['z'],
+            dry_run=options['dry_run'],
+        )
+
+        for diferencia in recalculo.diferencias:
+            cambio = diferencia['nuevo'] - diferencia['anterior']
+            self.stdout.write(
+                f"{diferencia['codigo']:<15} {diferencia['nombre'][:30]:<30} "
+                f"{diferencia['anterior']:>6} → {diferencia['nuevo']:<6} ({cambio:+d})"
+            )
+
+        mensaje = (
+            f"\n✓ {recalculo.productos_analizados} productos analizados en "
+            f"{recalculo.duracion_segundos:.2f}s; {recalculo.productos_modificados} "
+        )
+        if recalculo.dry_run:
+            self.stdout.write(self.style.WARNING(mensaje + 'cambios propuestos (simulación, no se guardó nada).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(mensaje + 'productos actualizados.'))
@@ -0,0 +1,21 @@
+"""
+Comando de gestión para recalcular las estadísticas precalculadas de los productos.
+Pensado para ejecutarse cada noche (cron / programador de tareas), ya que las
+ventanas de 7/30/90 días se desplazan con el tiempo.
+Uso: python manage.py reconstruir_estadisticas_productos
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from inventario.estadisticas import actualizar_estadisticas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las estadísticas de venta y compra de todos los productos'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            cantidad = actualizar_estadisticas()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Estadísticas reconstruidas: {cantidad} productos.')
+        )
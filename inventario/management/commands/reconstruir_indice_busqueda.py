@@ -0,0 +1,25 @@
+"""
+Comando de gestión para regenerar el índice de búsqueda de productos.
+Uso: python manage.py reconstruir_indice_busqueda
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from inventario.models import Producto
+from inventario.busqueda import reconstruir_indice
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el texto de búsqueda de todos los productos y reconstruye el índice de texto completo'
+
+    def handle(self, *args, **options):
+        productos = list(Producto.objects.select_related('nombre_producto'))
+        for producto in productos:
+            producto.texto_busqueda = producto.generar_texto_busqueda()
+
+        with transaction.atomic():
+            Producto.objects.bulk_update(productos, ['texto_busqueda'], batch_size=1000)
+            reconstruir_indice()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Índice de búsqueda reconstruido: {len(productos)} productos.')
+        )
@@ -0,0 +1,65 @@
+"""
+Comando de gestión para recalcular el precio de venta de forma masiva.
+Uso: python manage.py repreciar_productos [--categoria Granos] [--porcentaje 35] [--dry-run]
+"""
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from inventario.models import Producto, Categoria
+from inventario.precios import vista_previa_repreciado, aplicar_repreciado
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el precio de venta desde el costo y el porcentaje de ganancia con un UPDATE por lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categoria',
+                            help='Nombre o ID de la categoría a recalcular (por defecto todas)')
+        parser.add_argument('--porcentaje',
+                            help='Nuevo porcentaje de ganancia; si se omite se usa el de cada producto')
+        parser.add_argument('--solo-automaticos', action='store_true',
+                            help='Solo productos con "Actualizar Precio Automáticamente" activo')
+        parser.add_argument('--incluir-inactivos', action='store_true',
+                            help='Incluir productos inactivos')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo muestra las diferencias, sin guardar cambios')
+
+    def handle(self, *args, **options):
+        productos = Producto.objects.all()
+
+        if options['categoria']:
+            filtro = {'id': options['categoria']} if options['categoria'].isdigit() else {'nombre__iexact': options['categoria']}
+            try:
+                categoria = Categoria.objects.get(**filtro)
+            except Categoria.DoesNotExist:
+                raise CommandError(f"No existe la categoría '{options['categoria']}'.")
+            productos = productos.filter(categoria=categoria)
+
+        if options['solo_automaticos']:
+            productos = productos.filter(actualizar_precio_automatico=True)
+        if not options['incluir_inactivos']:
+            productos = productos.filter(activo=True)
+
+        porcentaje = None
+        if options['porcentaje'] is not None:
+            # Las mismas validaciones del campo: número finito, no negativo y que quepa en la columna
+            try:
+                porcentaje = Producto._meta.get_field('porcentaje_ganancia').clean(options['porcentaje'], None)
+            except ValidationError as error:
+                raise CommandError(f"--porcentaje no es válido: {' '.join(error.messages)}")
+
+        if options['dry_run']:
+            cambios = vista_previa_repreciado(productos, porcentaje)
+        else:
+            cambios = aplicar_repreciado(productos, porcentaje, motivo='Recálculo masivo (comando)')
+
+        for cambio in cambios:
+            self.stdout.write(
+                f"{cambio['codigo']:<15} {cambio['nombre'][:30]:<30} "
+                f"costo C$ {cambio['costo']:>9} | {cambio['porcentaje_anterior']}% → {cambio['porcentaje_nuevo']}% | "
+                f"C$ {cambio['precio_anterior']:>9} → C$ {cambio['precio_nuevo']}"
+            )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'\n{len(cambios)} cambios propuestos (simulación, no se guardó nada).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'\n✓ {len(cambios)} precios actualizados y registrados en el historial.'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:09
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def calcular_por_agotarse(apps, schema_editor):
+    """
+    Migración de datos: marcar los productos existentes con stock_actual <= stock_minimo
+    """
+    Producto = apps.get_model('inventario', 'Producto')
+    Producto.objects.filter(stock_actual__lte=F('stock_minimo')).update(por_agotarse=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0003_crear_nombre_producto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='por_agotarse',
+            field=models.BooleanField(default=False, editable=False, help_text='Se mantiene automáticamente al guardar (stock_actual <= stock_minimo)', verbose_name='Por Agotarse'),
+        ),
+        migrations.RunPython(calcular_por_agotarse, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('activo', True), ('por_agotarse', True)), fields=['stock_actual'], name='inventario_prod_agotarse_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0004_producto_por_agotarse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entradacompra',
+            name='estado',
+            field=models.CharField(choices=[('BORRADOR', 'Borrador'), ('REGISTRADA', 'Registrada')], default='REGISTRADA', max_length=20, verbose_name='Estado'),
+        ),
+    ]
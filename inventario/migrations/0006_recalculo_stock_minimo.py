@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:12
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0005_entradacompra_estado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecalculoStockMinimo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_ejecucion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Ejecución')),
+                ('dry_run', models.BooleanField(default=False, help_text='Si está activo, solo se reportaron las diferencias sin guardarlas', verbose_name='Simulación')),
+                ('dias_historial', models.PositiveIntegerField(verbose_name='Días de Historial')),
+                ('dias_entrega', models.PositiveIntegerField(verbose_name='Días de Entrega por Defecto')),
+                ('productos_analizados', models.PositiveIntegerField(default=0, verbose_name='Productos Analizados')),
+                ('productos_modificados', models.PositiveIntegerField(default=0, verbose_name='Productos Modificados')),
+                ('duracion_segundos', models.FloatField(default=0, verbose_name='Duración (segundos)')),
+                ('diferencias', models.JSONField(blank=True, default=list, help_text='Lista de productos con stock mínimo anterior y nuevo', verbose_name='Diferencias')),
+            ],
+            options={
+                'verbose_name': 'Recálculo de Stock Mínimo',
+                'verbose_name_plural': 'Recálculos de Stock Mínimo',
+                'ordering': ['-fecha_ejecucion'],
+            },
+        ),
+        migrations.AddField(
+            model_name='categoria',
+            name='dias_entrega',
+            field=models.PositiveIntegerField(blank=True, help_text='Sobrescribe el tiempo de entrega por defecto al calcular stock mínimo y reabastecimiento', null=True, verbose_name='Días de Entrega del Proveedor'),
+        ),
+        migrations.AddField(
+            model_name='categoria',
+            name='factor_seguridad',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Sobrescribe el nivel de servicio por defecto (1.65 ≈ 95%)', max_digits=4, null=True, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Factor de Seguridad (z)'),
+        ),
+        migrations.AddField(
+            model_name='categoria',
+            name='stock_minimo_manual',
+            field=models.BooleanField(default=False, help_text='Si está activo, el recálculo automático no modifica el stock mínimo de sus productos', verbose_name='Stock Mínimo Manual'),
+        ),
+    ]
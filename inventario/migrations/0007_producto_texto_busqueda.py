@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:20
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalizar_texto(*partes):
+    texto = ' '.join(parte for parte in partes if parte)
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def llenar_texto_busqueda(apps, schema_editor):
+    """
+    Migración de datos: calcular texto_busqueda de los productos existentes
+    """
+    Producto = apps.get_model('inventario', 'Producto')
+    productos = list(Producto.objects.select_related('nombre_producto'))
+    for producto in productos:
+        producto.texto_busqueda = normalizar_texto(
+            producto.nombre_producto.nombre, producto.codigo, producto.descripcion
+        )
+    Producto.objects.bulk_update(productos, ['texto_busqueda'], batch_size=1000)
+
+
+def crear_indice_busqueda(apps, schema_editor):
+    """
+    Crea el índice de texto completo según el motor de base de datos:
+    FTS5 en SQLite, trigramas (pg_trgm) en PostgreSQL.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE inventario_producto_fts USING fts5("
+            "texto_busqueda, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO inventario_producto_fts(rowid, texto_busqueda) "
+            "SELECT id, texto_busqueda FROM inventario_producto"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            'CREATE INDEX inventario_producto_texto_trgm ON inventario_producto '
+            'USING gin (texto_busqueda gin_trgm_ops)'
+        )
+
+
+def eliminar_indice_busqueda(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS inventario_producto_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS inventario_producto_texto_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0006_recalculo_stock_minimo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Nombre, código y descripción normalizados (sin tildes) para la búsqueda de texto completo', verbose_name='Texto de Búsqueda'),
+        ),
+        migrations.RunPython(llenar_texto_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice_busqueda, eliminar_indice_busqueda),
+    ]
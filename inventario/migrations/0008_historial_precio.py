@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0007_producto_texto_busqueda'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistorialPrecio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precio_anterior', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Precio Anterior (C$)')),
+                ('precio_nuevo', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Precio Nuevo (C$)')),
+                ('costo', models.DecimalField(decimal_places=2, help_text='Costo usado para el cálculo (costo promedio o precio de compra)', max_digits=10, verbose_name='Costo Base (C$)')),
+                ('porcentaje_ganancia', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='Porcentaje de Ganancia (%)')),
+                ('motivo', models.CharField(blank=True, max_length=200, verbose_name='Motivo')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha del Cambio')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historial_precios', to='inventario.producto', verbose_name='Producto')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cambios_precio', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Historial de Precio',
+                'verbose_name_plural': 'Historial de Precios',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['producto', '-fecha'], name='inventario__product_22b3c9_idx')],
+            },
+        ),
+    ]
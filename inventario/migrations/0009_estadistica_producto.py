@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0008_historial_precio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaProducto',
+            fields=[
+                ('producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadisticas', serialize=False, to='inventario.producto', verbose_name='Producto')),
+                ('unidades_7_dias', models.IntegerField(default=0, verbose_name='Unidades Vendidas (7 días)')),
+                ('unidades_30_dias', models.IntegerField(default=0, verbose_name='Unidades Vendidas (30 días)')),
+                ('unidades_90_dias', models.IntegerField(default=0, verbose_name='Unidades Vendidas (90 días)')),
+                ('ingresos_30_dias', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ingresos (30 días) (C$)')),
+                ('unidades_totales', models.IntegerField(default=0, verbose_name='Unidades Vendidas (total)')),
+                ('ultima_venta', models.DateTimeField(blank=True, null=True, verbose_name='Última Venta')),
+                ('ultima_compra', models.DateField(blank=True, null=True, verbose_name='Última Compra')),
+                ('fecha_calculo', models.DateTimeField(default=django.utils.timezone.now, help_text='Última vez que las ventanas de 7/30/90 días se recalcularon completas', verbose_name='Fecha de Cálculo')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+            ],
+            options={
+                'verbose_name': 'Estadística de Producto',
+                'verbose_name_plural': 'Estadísticas de Productos',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0009_estadistica_producto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='clase_abc_ingresos',
+            field=models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C')], default='C', editable=False, help_text='Se recalcula cada noche con el comando clasificar_productos_abc', max_length=1, verbose_name='Clase ABC (Ingresos)'),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='clase_abc_unidades',
+            field=models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C')], default='C', editable=False, help_text='Se recalcula cada noche con el comando clasificar_productos_abc', max_length=1, verbose_name='Clase ABC (Unidades)'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['clase_abc_ingresos'], name='inventario__clase_a_687267_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['clase_abc_unidades'], name='inventario__clase_a_17f0da_idx'),
+        ),
+    ]
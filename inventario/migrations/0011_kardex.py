@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:51
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+VISTA_MOVIMIENTOS = """
+CREATE VIEW inventario_movimiento AS
+SELECT 'C' || d.id AS id,
+       d.producto_id AS producto_id,
+       COALESCE(e.fecha_ingreso, e.fecha_creacion) AS fecha,
+       0 AS orden,
+       d.id AS linea_id,
+       e.id AS documento_id,
+       'COMPRA' AS tipo,
+       d.cantidad AS cantidad,
+       CAST(d.precio_unitario AS NUMERIC(10, 2)) AS costo_unitario,
+       'Compra #' || e.numero_factura || ' - ' || e.proveedor AS referencia
+FROM inventario_detalleentradacompra d
+JOIN inventario_entradacompra e ON e.id = d.entrada_compra_id
+WHERE e.estado = 'REGISTRADA'
+UNION ALL
+SELECT 'A' || a.id,
+       a.producto_id,
+       a.fecha_ajuste,
+       1,
+       a.id,
+       a.id,
+       CASE
+           WHEN a.motivo LIKE 'Venta - %' THEN 'VENTA'
+           WHEN a.motivo LIKE 'Anulación%' THEN 'ANULACION'
+           ELSE 'AJUSTE'
+       END,
+       a.diferencia,
+       CAST(NULL AS NUMERIC(10, 2)),
+       a.motivo
+FROM inventario_ajusteinventario a
+"""
+
+
+def llenar_fecha_ingreso(apps, schema_editor):
+    """
+    Migración de datos: las entradas ya registradas ingresaron al crearse
+    """
+    EntradaCompra = apps.get_model('inventario', 'EntradaCompra')
+    EntradaCompra.objects.filter(estado='REGISTRADA').update(fecha_ingreso=F('fecha_creacion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0010_clase_abc_producto'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoInventario',
+            fields=[
+                ('id', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('fecha', models.DateTimeField(verbose_name='Fecha')),
+                ('orden', models.SmallIntegerField(verbose_name='Orden')),
+                ('linea_id', models.IntegerField(verbose_name='Línea')),
+                ('documento_id', models.IntegerField(verbose_name='Documento')),
+                ('tipo', models.CharField(choices=[('COMPRA', 'Compra'), ('VENTA', 'Venta'), ('ANULACION', 'Anulación'), ('AJUSTE', 'Ajuste')], max_length=20, verbose_name='Tipo')),
+                ('cantidad', models.IntegerField(help_text='Positiva para las entradas y negativa para las salidas', verbose_name='Cantidad')),
+                ('costo_unitario', models.DecimalField(decimal_places=2, help_text='Solo en las compras', max_digits=10, null=True, verbose_name='Costo Unitario (C$)')),
+                ('referencia', models.TextField(verbose_name='Referencia')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Inventario',
+                'verbose_name_plural': 'Movimientos de Inventario',
+                'db_table': 'inventario_movimiento',
+                'ordering': ['fecha', 'orden', 'linea_id'],
+                'managed': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='entradacompra',
+            name='fecha_ingreso',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Momento en que la entrada aumentó el stock (al registrarse o al confirmarse el borrador)', null=True, verbose_name='Fecha de Ingreso al Inventario'),
+        ),
+        migrations.AddIndex(
+            model_name='ajusteinventario',
+            index=models.Index(fields=['producto', 'fecha_ajuste', 'id'], name='inventario_ajuste_kardex_idx'),
+        ),
+        migrations.RunPython(llenar_fecha_ingreso, migrations.RunPython.noop),
+        migrations.RunSQL(VISTA_MOVIMIENTOS, 'DROP VIEW IF EXISTS inventario_movimiento'),
+    ]
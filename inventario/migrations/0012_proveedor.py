@@ -0,0 +1,152 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:57
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+# La vista del kardex lee el proveedor de la entrada: se elimina mientras
+# cambia la columna y se vuelve a crear con el nombre desde inventario_proveedor
+VISTA_MOVIMIENTOS = """
+CREATE VIEW inventario_movimiento AS
+SELECT 'C' || d.id AS id,
+       d.producto_id AS producto_id,
+       COALESCE(e.fecha_ingreso, e.fecha_creacion) AS fecha,
+       0 AS orden,
+       d.id AS linea_id,
+       e.id AS documento_id,
+       'COMPRA' AS tipo,
+       d.cantidad AS cantidad,
+       CAST(d.precio_unitario AS NUMERIC(10, 2)) AS costo_unitario,
+       'Compra #' || e.numero_factura || ' - ' || {proveedor} AS referencia
+FROM inventario_detalleentradacompra d
+JOIN inventario_entradacompra e ON e.id = d.entrada_compra_id
+{join_proveedor}WHERE e.estado = 'REGISTRADA'
+UNION ALL
+SELECT 'A' || a.id,
+       a.producto_id,
+       a.fecha_ajuste,
+       1,
+       a.id,
+       a.id,
+       CASE
+           WHEN a.motivo LIKE 'Venta - %' THEN 'VENTA'
+           WHEN a.motivo LIKE 'Anulación%' THEN 'ANULACION'
+           ELSE 'AJUSTE'
+       END,
+       a.diferencia,
+       CAST(NULL AS NUMERIC(10, 2)),
+       a.motivo
+FROM inventario_ajusteinventario a
+"""
+
+VISTA_ANTERIOR = VISTA_MOVIMIENTOS.format(proveedor='e.proveedor', join_proveedor='')
+
+VISTA_NUEVA = VISTA_MOVIMIENTOS.format(
+    proveedor='p.nombre',
+    join_proveedor='JOIN inventario_proveedor p ON p.id = e.proveedor_id\n'
+)
+
+SUFIJOS_RAZON_SOCIAL = {'sa', 'de', 'cv', 'ltda', 'srl', 'sas', 'cia', 'y'}
+
+
+def _clave(nombre):
+    """Copia de inventario.proveedores.clave_proveedor al momento de esta migración."""
+    texto = unicodedata.normalize('NFKD', nombre.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).replace('.', '')
+    palabras = re.findall(r'\w+', texto)
+    while len(palabras) > 1 and palabras[-1] in SUFIJOS_RAZON_SOCIAL:
+        palabras.pop()
+    return ' '.join(palabras)
+
+
+def crear_proveedores(apps, schema_editor):
+    """
+    Migración de datos: un Proveedor por cada grupo de nombres con la misma clave
+    (variantes de escritura). El nombre del proveedor es la variante más usada.
+    """
+    EntradaCompra = apps.get_model('inventario', 'EntradaCompra')
+    Proveedor = apps.get_model('inventario', 'Proveedor')
+
+    usos = EntradaCompra.objects.values('proveedor_nombre').annotate(
+        cantidad=Count('id')
+    ).values_list('proveedor_nombre', 'cantidad').order_by()
+
+    variantes = defaultdict(Counter)
+    originales = defaultdict(list)
+    for nombre, cantidad in usos:
+        clave = _clave(nombre)
+        variantes[clave][' '.join(nombre.split())] += cantidad
+        originales[clave].append(nombre)
+
+    for clave, nombres in variantes.items():
+        # La variante más usada; a igualdad, la primera en orden alfabético
+        nombre = min(nombres, key=lambda variante: (-nombres[variante], variante))
+        proveedor = Proveedor.objects.create(nombre=nombre, clave=clave)
+        EntradaCompra.objects.filter(proveedor_nombre__in=originales[clave]).update(proveedor=proveedor)
+
+
+def restaurar_nombres(apps, schema_editor):
+    """Reversa: copia el nombre del proveedor a la columna de texto."""
+    EntradaCompra = apps.get_model('inventario', 'EntradaCompra')
+    Proveedor = apps.get_model('inventario', 'Proveedor')
+    for proveedor in Proveedor.objects.all():
+        EntradaCompra.objects.filter(proveedor=proveedor).update(proveedor_nombre=proveedor.nombre)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0011_kardex'),
+    ]
+
+    operations = [
+        migrations.RunSQL('DROP VIEW IF EXISTS inventario_movimiento', VISTA_ANTERIOR),
+        migrations.CreateModel(
+            name='Proveedor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=200, verbose_name='Nombre')),
+                ('clave', models.CharField(editable=False, help_text='Nombre sin tildes, mayúsculas, signos ni sufijos de razón social', max_length=200, unique=True, verbose_name='Clave')),
+                ('activo', models.BooleanField(default=True, verbose_name='Activo')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+            ],
+            options={
+                'verbose_name': 'Proveedor',
+                'verbose_name_plural': 'Proveedores',
+                'ordering': ['nombre'],
+            },
+        ),
+        migrations.RenameField(
+            model_name='entradacompra',
+            old_name='proveedor',
+            new_name='proveedor_nombre',
+        ),
+        migrations.AddField(
+            model_name='entradacompra',
+            name='proveedor',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='entradas_compra', to='inventario.proveedor', verbose_name='Proveedor'),
+        ),
+        migrations.RunPython(crear_proveedores, restaurar_nombres),
+        # Con valor por defecto para poder volver a crear la columna al revertir
+        migrations.AlterField(
+            model_name='entradacompra',
+            name='proveedor_nombre',
+            field=models.CharField(default='', max_length=200, verbose_name='Proveedor'),
+        ),
+        migrations.RemoveField(
+            model_name='entradacompra',
+            name='proveedor_nombre',
+        ),
+        migrations.AlterField(
+            model_name='entradacompra',
+            name='proveedor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entradas_compra', to='inventario.proveedor', verbose_name='Proveedor'),
+        ),
+        migrations.RunSQL(VISTA_NUEVA, 'DROP VIEW IF EXISTS inventario_movimiento'),
+    ]
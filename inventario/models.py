@@ -2,10 +2,12 @@
 Modelos para la gestión de inventario del sistema.
 """
 from django.db import models
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from usuarios.models import Usuario
 from decimal import Decimal
+from .busqueda import normalizar_texto
 
 
 class Categoria(models.Model):
@@ -26,6 +28,26 @@ class Categoria(models.Model):
         default=True,
         verbose_name='Categoría Activa'
     )
+    dias_entrega = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name='Días de Entrega del Proveedor',
+        help_text='Sobrescribe el tiempo de entrega por defecto al calcular stock mínimo y reabastecimiento'
+    )
+    factor_seguridad = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        blank=True,
+        null=True,
+        validators=[MinValueValidator(0)],
+        verbose_name='Factor de Seguridad (z)',
+        help_text='Sobrescribe el nivel de servicio por defecto (1.65 ≈ 95%)'
+    )
+    stock_minimo_manual = models.BooleanField(
+        default=False,
+        verbose_name='Stock Mínimo Manual',
+        help_text='Si está activo, el recálculo automático no modifica el stock mínimo de sus productos'
+    )
     fecha_creacion = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Fecha de Creación'
@@ -107,6 +129,12 @@ class Producto(models.Model):
     Modelo para los productos del inventario.
     Cada producto tiene un código único y referencia a un NombreProducto.
     """
+    CLASE_ABC_CHOICES = [
+        ('A', 'A'),
+        ('B', 'B'),
+        ('C', 'C'),
+    ]
+    
     codigo = models.CharField(
         max_length=50,
         unique=True,
@@ -180,12 +208,41 @@ class Producto(models.Model):
         verbose_name='Stock Mínimo',
         help_text='Cantidad mínima antes de alertar'
     )
+    por_agotarse = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Por Agotarse',
+        help_text='Se mantiene automáticamente al guardar (stock_actual <= stock_minimo)'
+    )
     unidad_medida = models.CharField(
         max_length=20,
         default='unidad',
         verbose_name='Unidad de Medida',
         help_text='Ej: unidad, kg, litro, caja, etc.'
     )
+    clase_abc_ingresos = models.CharField(
+        max_length=1,
+        choices=CLASE_ABC_CHOICES,
+        default='C',
+        editable=False,
+        verbose_name='Clase ABC (Ingresos)',
+        help_text='Se recalcula cada noche con el comando clasificar_productos_abc'
+    )
+    clase_abc_unidades = models.CharField(
+        max_length=1,
+        choices=CLASE_ABC_CHOICES,
+        default='C',
+        editable=False,
+        verbose_name='Clase ABC (Unidades)',
+        help_text='Se recalcula cada noche con el comando clasificar_productos_abc'
+    )
+    texto_busqueda = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Texto de Búsqueda',
+        help_text='Nombre, código y descripción normalizados (sin tildes) para la búsqueda de texto completo'
+    )
     activo = models.BooleanField(
         default=True,
         verbose_name='Producto Activo'
@@ -207,11 +264,44 @@ class Producto(models.Model):
             models.Index(fields=['codigo']),
             models.Index(fields=['categoria']),
             models.Index(fields=['activo']),
+            models.Index(fields=['clase_abc_ingresos']),
+            models.Index(fields=['clase_abc_unidades']),
+            # Índice parcial: solo contiene los productos activos por agotarse
+            models.Index(
+                fields=['stock_actual'],
+                condition=models.Q(activo=True, por_agotarse=True),
+                name='inventario_prod_agotarse_idx'
+            ),
         ]
     
     def __str__(self):
         return f"{self.nombre_producto.nombre} ({self.codigo})"
     
+    def save(self, *args, **kwargs):
+        """
+        Mantiene sincronizados los campos derivados: el indicador por_agotarse
+        y el texto de búsqueda.
+        """
+        self.por_agotarse = self.esta_por_agotarse()
+        update_fields = kwargs.get('update_fields')
+        campos_texto = {'codigo', 'descripcion', 'nombre_producto'}
+        
+        if update_fields is None or campos_texto & set(update_fields):
+            self.texto_busqueda = self.generar_texto_busqueda()
+        
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'stock_actual', 'stock_minimo'} & update_fields:
+                update_fields.add('por_agotarse')
+            if campos_texto & update_fields:
+                update_fields.add('texto_busqueda')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+    
+    def generar_texto_busqueda(self):
+        """Genera el texto normalizado que alimenta el índice de búsqueda."""
+        return normalizar_texto(self.nombre_producto.nombre, self.codigo, self.descripcion)
+    
     @property
     def nombre(self):
         """Propiedad para compatibilidad con código existente."""
@@ -230,11 +320,13 @@ class Producto(models.Model):
         """Verifica si hay stock suficiente para la cantidad solicitada."""
         return self.stock_actual >= cantidad
     
+    def costo_actual(self):
+        """Costo unitario vigente: costo promedio si está disponible, sino precio de compra."""
+        return self.costo_promedio if self.costo_promedio > 0 else self.precio_compra
+    
     def calcular_valor_inventario(self):
         """Calcula el valor total del inventario de este producto."""
-        # Usar costo_promedio si está disponible, sino precio_compra
-        costo = self.costo_promedio if self.costo_promedio > 0 else self.precio_compra
-        return self.stock_actual * costo
+        return self.stock_actual * self.costo_actual()
     
     def diferencia_stock(self):
         """Calcula la diferencia entre stock actual y stock mínimo."""
@@ -256,8 +348,9 @@ class Producto(models.Model):
         """
         from decimal import Decimal
         
-        # Obtener todas las entradas de compra del producto (usando related_name)
-        detalles = self.entradas_compra.all()
+        # Obtener todas las entradas de compra del producto (usando related_name),
+        # sin contar los pedidos sugeridos que aún no se han confirmado
+        detalles = self.entradas_compra.exclude(entrada_compra__estado='BORRADOR')
         
         if not detalles.exists():
             # Si no hay entradas, usar el precio_compra inicial
@@ -291,17 +384,83 @@ class Producto(models.Model):
                 self.save(update_fields=['costo_promedio', 'precio_compra'])
 
 
+class Proveedor(models.Model):
+    """
+    Proveedor de las entradas de compra. La clave (nombre normalizado) es única,
+    así las variantes de escritura de un mismo proveedor no lo duplican.
+    """
+    nombre = models.CharField(
+        max_length=200,
+        verbose_name='Nombre'
+    )
+    clave = models.CharField(
+        max_length=200,
+        unique=True,
+        editable=False,
+        verbose_name='Clave',
+        help_text='Nombre sin tildes, mayúsculas, signos ni sufijos de razón social'
+    )
+    activo = models.BooleanField(
+        default=True,
+        verbose_name='Activo'
+    )
+    fecha_creacion = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Creación'
+    )
+    fecha_actualizacion = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de Actualización'
+    )
+    
+    class Meta:
+        verbose_name = 'Proveedor'
+        verbose_name_plural = 'Proveedores'
+        ordering = ['nombre']
+    
+    def __str__(self):
+        return self.nombre
+    
+    def clean(self):
+        """
+        Evita registrar una variante de escritura de un proveedor existente o
+        un nombre sin letras ni números (su clave quedaría vacía).
+        """
+        from .proveedores import clave_proveedor
+        clave = clave_proveedor(self.nombre)
+        if not clave:
+            raise ValidationError({'nombre': 'El nombre debe tener al menos una letra o un número.'})
+        if Proveedor.objects.filter(clave=clave).exclude(pk=self.pk).exists():
+            raise ValidationError({'nombre': 'Ya existe un proveedor con este nombre o una variante de él.'})
+    
+    def save(self, *args, **kwargs):
+        """Mantiene la clave sincronizada con el nombre."""
+        from .proveedores import clave_proveedor
+        self.nombre = ' '.join(self.nombre.split())
+        self.clave = clave_proveedor(self.nombre)
+        super().save(*args, **kwargs)
+
+
 class EntradaCompra(models.Model):
     """
     Modelo para registrar las entradas de productos al inventario (compras).
+    Las entradas en estado BORRADOR (pedidos sugeridos) no afectan el stock
+    hasta que se confirman.
     """
+    ESTADO_CHOICES = [
+        ('BORRADOR', 'Borrador'),
+        ('REGISTRADA', 'Registrada'),
+    ]
+    
     numero_factura = models.CharField(
         max_length=50,
         verbose_name='Número de Factura de Compra',
         help_text='Número de factura del proveedor'
     )
-    proveedor = models.CharField(
-        max_length=200,
+    proveedor = models.ForeignKey(
+        Proveedor,
+        on_delete=models.PROTECT,
+        related_name='entradas_compra',
         verbose_name='Proveedor'
     )
     fecha_compra = models.DateField(
@@ -315,11 +474,24 @@ class EntradaCompra(models.Model):
         verbose_name='Total (C$)',
         default=0
     )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='REGISTRADA',
+        verbose_name='Estado'
+    )
     observaciones = models.TextField(
         blank=True,
         null=True,
         verbose_name='Observaciones'
     )
+    fecha_ingreso = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Fecha de Ingreso al Inventario',
+        help_text='Momento en que la entrada aumentó el stock (al registrarse o al confirmarse el borrador)'
+    )
     usuario_registro = models.ForeignKey(
         Usuario,
         on_delete=models.PROTECT,
@@ -342,6 +514,34 @@ class EntradaCompra(models.Model):
     
     def __str__(self):
         return f"Compra #{self.id} - {self.proveedor} ({self.fecha_compra})"
+    
+    def save(self, *args, **kwargs):
+        """Registra la fecha de ingreso al inventario de las entradas registradas."""
+        if self.estado == 'REGISTRADA' and self.fecha_ingreso is None:
+            self.fecha_ingreso = timezone.now()
+        super().save(*args, **kwargs)
+    
+    def es_borrador(self):
+        """Verifica si la entrada es un pedido sugerido pendiente de confirmar."""
+        return self.estado == 'BORRADOR'
+    
+    def confirmar(self):
+        """
+        Confirma una entrada en borrador: cambia el estado a REGISTRADA y
+        aplica el stock y el costo promedio de todos sus detalles.
+        """
+        from django.db import transaction
+        
+        if not self.es_borrador():
+            return
+        
+        with transaction.atomic():
+            self.estado = 'REGISTRADA'
+            self.fecha_compra = timezone.now().date()
+            self.fecha_ingreso = timezone.now()
+            self.save(update_fields=['estado', 'fecha_compra', 'fecha_ingreso', 'fecha_actualizacion'])
+            for detalle in self.detalles.select_related('producto'):
+                detalle.aplicar_a_inventario()
 
 
 class DetalleEntradaCompra(models.Model):
@@ -389,6 +589,21 @@ class DetalleEntradaCompra(models.Model):
         """Calcula el subtotal automáticamente."""
         self.subtotal = self.cantidad * self.precio_unitario
         super().save(*args, **kwargs)
+    
+    def aplicar_a_inventario(self):
+        """Aumenta el stock del producto y recalcula su costo promedio."""
+        producto = self.producto
+        
+        # Aumentar el stock primero
+        producto.stock_actual += self.cantidad
+        producto.save(update_fields=['stock_actual'])
+        
+        # Calcular y actualizar costo promedio (esto también guarda el producto)
+        producto.actualizar_costo_promedio()
+        
+        # Registrar la compra en las estadísticas del producto
+        from .estadisticas import registrar_compra
+        registrar_compra(producto.id, self.entrada_compra.fecha_compra)
 
 
 class AjusteInventario(models.Model):
@@ -446,6 +661,9 @@ class AjusteInventario(models.Model):
         verbose_name = 'Ajuste de Inventario'
         verbose_name_plural = 'Ajustes de Inventario'
         ordering = ['-fecha_ajuste', '-fecha_creacion']
+        indexes = [
+            models.Index(fields=['producto', 'fecha_ajuste', 'id'], name='inventario_ajuste_kardex_idx'),
+        ]
     
     def __str__(self):
         return f"Ajuste {self.tipo_ajuste} - {self.producto.nombre} ({self.fecha_ajuste})"
@@ -455,3 +673,251 @@ class AjusteInventario(models.Model):
         self.diferencia = self.cantidad_nueva - self.cantidad_anterior
         super().save(*args, **kwargs)
 
+
+class MovimientoInventario(models.Model):
+    """
+    Vista de solo lectura (inventario_movimiento) que une todos los movimientos
+    de stock de un producto para el kardex: las entradas de compra registradas
+    y los ajustes de inventario (que incluyen las salidas por venta y las
+    devoluciones por anulación). La crea la migración 0011.
+
+    Los movimientos se ordenan por (fecha, orden, linea_id): en el mismo
+    instante, la compra va antes que los ajustes.
+    """
+    TIPO_CHOICES = [
+        ('COMPRA', 'Compra'),
+        ('VENTA', 'Venta'),
+        ('ANULACION', 'Anulación'),
+        ('AJUSTE', 'Ajuste'),
+    ]
+
+    id = models.CharField(
+        max_length=20,
+        primary_key=True
+    )
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        verbose_name='Producto'
+    )
+    fecha = models.DateTimeField(
+        verbose_name='Fecha'
+    )
+    orden = models.SmallIntegerField(
+        verbose_name='Orden'
+    )
+    linea_id = models.IntegerField(
+        verbose_name='Línea'
+    )
+    documento_id = models.IntegerField(
+        verbose_name='Documento'
+    )
+    tipo = models.CharField(
+        max_length=20,
+        choices=TIPO_CHOICES,
+        verbose_name='Tipo'
+    )
+    cantidad = models.IntegerField(
+        verbose_name='Cantidad',
+        help_text='Positiva para las entradas y negativa para las salidas'
+    )
+    costo_unitario = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        verbose_name='Costo Unitario (C$)',
+        help_text='Solo en las compras'
+    )
+    referencia = models.TextField(
+        verbose_name='Referencia'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'inventario_movimiento'
+        verbose_name = 'Movimiento de Inventario'
+        verbose_name_plural = 'Movimientos de Inventario'
+        ordering = ['fecha', 'orden', 'linea_id']
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.cantidad:+d} - {self.fecha:%d/%m/%Y %H:%M}"
+
+
+class HistorialPrecio(models.Model):
+    """
+    Modelo para registrar los cambios de precio de venta de los productos.
+    """
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name='historial_precios',
+        verbose_name='Producto'
+    )
+    precio_anterior = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Precio Anterior (C$)'
+    )
+    precio_nuevo = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Precio Nuevo (C$)'
+    )
+    costo = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Costo Base (C$)',
+        help_text='Costo usado para el cálculo (costo promedio o precio de compra)'
+    )
+    porcentaje_ganancia = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        verbose_name='Porcentaje de Ganancia (%)'
+    )
+    motivo = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='Motivo'
+    )
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='cambios_precio',
+        verbose_name='Usuario'
+    )
+    fecha = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha del Cambio'
+    )
+    
+    class Meta:
+        verbose_name = 'Historial de Precio'
+        verbose_name_plural = 'Historial de Precios'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['producto', '-fecha']),
+        ]
+    
+    def __str__(self):
+        return f"{self.producto.nombre}: C$ {self.precio_anterior} → C$ {self.precio_nuevo}"
+
+
+class RecalculoStockMinimo(models.Model):
+    """
+    Modelo para registrar cada ejecución del recálculo automático de stock mínimo
+    (parámetros, duración y diferencias aplicadas o propuestas).
+    """
+    fecha_ejecucion = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Ejecución'
+    )
+    dry_run = models.BooleanField(
+        default=False,
+        verbose_name='Simulación',
+        help_text='Si está activo, solo se reportaron las diferencias sin guardarlas'
+    )
+    dias_historial = models.PositiveIntegerField(
+        verbose_name='Días de Historial'
+    )
+    dias_entrega = models.PositiveIntegerField(
+        verbose_name='Días de Entrega por Defecto'
+    )
+    productos_analizados = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Productos Analizados'
+    )
+    productos_modificados = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Productos Modificados'
+    )
+    duracion_segundos = models.FloatField(
+        default=0,
+        verbose_name='Duración (segundos)'
+    )
+    diferencias = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Diferencias',
+        help_text='Lista de productos con stock mínimo anterior y nuevo'
+    )
+    
+    class Meta:
+        verbose_name = 'Recálculo de Stock Mínimo'
+        verbose_name_plural = 'Recálculos de Stock Mínimo'
+        ordering = ['-fecha_ejecucion']
+    
+    def __str__(self):
+        modo = 'Simulación' if self.dry_run else 'Aplicado'
+        return f"Recálculo {timezone.localtime(self.fecha_ejecucion):%d/%m/%Y %H:%M} - {modo} ({self.productos_modificados} cambios)"
+
+
+class EstadisticaProducto(models.Model):
+    """
+    Estadísticas de venta y compra precalculadas de cada producto.
+    Se mantienen al vender, anular y comprar (ver inventario.estadisticas) y se
+    reconstruyen con el comando reconstruir_estadisticas_productos.
+    """
+    producto = models.OneToOneField(
+        Producto,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='estadisticas',
+        verbose_name='Producto'
+    )
+    unidades_7_dias = models.IntegerField(
+        default=0,
+        verbose_name='Unidades Vendidas (7 días)'
+    )
+    unidades_30_dias = models.IntegerField(
+        default=0,
+        verbose_name='Unidades Vendidas (30 días)'
+    )
+    unidades_90_dias = models.IntegerField(
+        default=0,
+        verbose_name='Unidades Vendidas (90 días)'
+    )
+    ingresos_30_dias = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Ingresos (30 días) (C$)'
+    )
+    unidades_totales = models.IntegerField(
+        default=0,
+        verbose_name='Unidades Vendidas (total)'
+    )
+    ultima_venta = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Última Venta'
+    )
+    ultima_compra = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name='Última Compra'
+    )
+    fecha_calculo = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha de Cálculo',
+        help_text='Última vez que las ventanas de 7/30/90 días se recalcularon completas'
+    )
+    fecha_actualizacion = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de Actualización'
+    )
+    
+    class Meta:
+        verbose_name = 'Estadística de Producto'
+        verbose_name_plural = 'Estadísticas de Productos'
+    
+    def __str__(self):
+        return f"Estadísticas de {self.producto.nombre}"
+    
+    @property
+    def demanda_diaria(self):
+        """Unidades vendidas promedio por día en los últimos 90 días."""
+        return self.unidades_90_dias / 90
@@ -0,0 +1,133 @@
+"""
+Recálculo masivo de precios de venta.
+
+El precio se calcula con la misma regla que Producto.calcular_precio_venta_automatico
+(costo_promedio si es mayor que cero, si no precio_compra, más el porcentaje de
+ganancia), pero como una expresión de base de datos: un solo UPDATE por lote,
+sin cargar ni guardar los productos uno por uno.
+
+La misma regla de costo se usa para valorar el inventario en la base de datos
+(ver expresion_valor_inventario).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Q, Value, When
+from django.db.models.functions import Round
+
+from .models import HistorialPrecio
+
+# Productos con algún costo registrado (sin costo, el precio no se recalcula)
+CON_COSTO = Q(costo_promedio__gt=0) | Q(precio_compra__gt=0)
+
+
+def expresion_costo():
+    """Costo base de cada producto: costo_promedio si está disponible, sino precio_compra."""
+    return Case(
+        When(costo_promedio__gt=0, then=F('costo_promedio')),
+        default=F('precio_compra'),
+        output_field=DecimalField(max_digits=10, decimal_places=2)
+    )
+
+
+def expresion_valor_inventario():
+    """
+    Valor en inventario de cada producto (stock_actual × costo base), equivalente
+    a Producto.calcular_valor_inventario, para usar en annotate/aggregate.
+    """
+    return ExpressionWrapper(
+        F('stock_actual') * expresion_costo(),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+
+
+def expresion_precio_venta(porcentaje_ganancia=None):
+    """
+    Precio de venta calculado en la base de datos. Si no se indica un
+    porcentaje, se usa el porcentaje_ganancia de cada producto.
+    """
+    if porcentaje_ganancia is None:
+        porcentaje = F('porcentaje_ganancia')
+    else:
+        porcentaje = Value(Decimal(porcentaje_ganancia))
+    return Round(
+        ExpressionWrapper(
+            # Se multiplica por 0.01 en vez de dividir entre 100: SQLite guarda los
+            # decimales enteros como INTEGER y haría una división entera
+            expresion_costo() * (Value(Decimal('1')) + porcentaje * Value(Decimal('0.01'))),
+            output_field=DecimalField(max_digits=12, decimal_places=4)
+        ),
+        2,
+        output_field=DecimalField(max_digits=10, decimal_places=2)
+    )
+
+
+def vista_previa_repreciado(productos, porcentaje_ganancia=None):
+    """
+    Retorna la lista de cambios que produciría el recálculo, sin aplicarlo:
+    diccionarios con id, codigo, nombre, costo, precio_anterior y precio_nuevo.
+    Los productos sin costo o cuyo precio no cambia se omiten.
+    """
+    filas = productos.filter(
+        CON_COSTO
+    ).annotate(
+        costo_base=expresion_costo(),
+        precio_calculado=expresion_precio_venta(porcentaje_ganancia)
+    ).values_list(
+        'id', 'codigo', 'nombre_producto__nombre', 'costo_base',
+        'porcentaje_ganancia', 'precio_venta', 'precio_calculado'
+    ).order_by('nombre_producto__nombre', 'codigo')
+
+    cambios = []
+    for producto_id, codigo, nombre, costo, porcentaje, anterior, nuevo in filas:
+        nuevo = Decimal(nuevo).quantize(Decimal('0.01'))
+        if nuevo == anterior and porcentaje_ganancia in (None, porcentaje):
+            continue
+        cambios.append({
+            'id': producto_id,
+            'codigo': codigo,
+            'nombre': nombre,
+            'costo': Decimal(costo).quantize(Decimal('0.01')),
+            'porcentaje_anterior': porcentaje,
+            'porcentaje_nuevo': porcentaje if porcentaje_ganancia is None else Decimal(porcentaje_ganancia),
+            'precio_anterior': anterior,
+            'precio_nuevo': nuevo,
+        })
+    return cambios
+
+
+def aplicar_repreciado(productos, porcentaje_ganancia=None, usuario=None, motivo=''):
+    """
+    Recalcula el precio de venta (y opcionalmente el porcentaje de ganancia) de
+    los productos del queryset con un solo UPDATE y registra el historial de
+    precios de los productos modificados. Retorna la lista de cambios aplicados.
+    """
+    with transaction.atomic():
+        productos = productos.select_for_update()
+        cambios = vista_previa_repreciado(productos, porcentaje_ganancia)
+        if not cambios:
+            return cambios
+
+        campos = {'precio_venta': expresion_precio_venta(porcentaje_ganancia)}
+        if porcentaje_ganancia is not None:
+            campos['porcentaje_ganancia'] = Decimal(porcentaje_ganancia)
+        productos.filter(CON_COSTO).update(**campos)
+        # update() no envía signals: invalidar los reportes de inventario
+        from reportes.cache import programar_incremento
+        from reportes.models import VersionDatos
+        programar_incremento(VersionDatos.INVENTARIO)
+
+        HistorialPrecio.objects.bulk_create([
+            HistorialPrecio(
+                producto_id=cambio['id'],
+                precio_anterior=cambio['precio_anterior'],
+                precio_nuevo=cambio['precio_nuevo'],
+                costo=cambio['costo'],
+                porcentaje_ganancia=cambio['porcentaje_nuevo'],
+                motivo=motivo,
+                usuario=usuario
+            )
+            for cambio in cambios
+        ], batch_size=1000)
+
+    return cambios
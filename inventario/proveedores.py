@@ -0,0 +1,60 @@
+"""
+Proveedores de las entradas de compra.
+
+Cada nombre escrito al registrar una compra se resuelve a un Proveedor por su
+clave normalizada (ver clave_proveedor): "Distribuidora López, S.A." y
+"DISTRIBUIDORA LOPEZ" son el mismo proveedor, así los reportes de compras
+agrupan por proveedor_id en lugar de por texto libre.
+"""
+import re
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from .busqueda import normalizar_texto
+from .models import Proveedor
+
+# Sufijos de razón social que se ignoran al comparar nombres de proveedores
+SUFIJOS_RAZON_SOCIAL = {'sa', 'de', 'cv', 'ltda', 'srl', 'sas', 'cia', 'y'}
+
+
+def clave_proveedor(nombre):
+    """
+    Clave para reconocer un mismo proveedor escrito de distintas formas: sin
+    tildes, mayúsculas, signos ni sufijos de razón social
+    ("Distribuidora López, S.A." -> "distribuidora lopez").
+    """
+    palabras = re.findall(r'\w+', normalizar_texto(nombre).replace('.', ''))
+    while len(palabras) > 1 and palabras[-1] in SUFIJOS_RAZON_SOCIAL:
+        palabras.pop()
+    return ' '.join(palabras)
+
+
+def obtener_proveedor(nombre):
+    """
+    Proveedor con ese nombre o una variante de él; se crea si no existe.
+    Lanza ValidationError si el nombre no tiene letras ni números.
+    """
+    nombre = ' '.join(nombre.split())
+    clave = clave_proveedor(nombre)
+    if not clave:
+        raise ValidationError('El nombre del proveedor debe tener al menos una letra o un número.')
+    proveedor, _ = Proveedor.objects.get_or_create(
+        clave=clave,
+        defaults={'nombre': nombre}
+    )
+    return proveedor
+
+
+def buscar_proveedores(query, limite=10):
+    """
+    Proveedores activos cuyo nombre empieza con la consulta o tiene una palabra
+    que empieza con ella (sin distinguir tildes ni mayúsculas), para autocompletar.
+    """
+    clave = clave_proveedor(query)
+    if not clave:
+        return Proveedor.objects.none()
+    return Proveedor.objects.filter(
+        Q(clave__startswith=clave) | Q(clave__contains=f' {clave}'),
+        activo=True
+    ).order_by('nombre')[:limite]
@@ -0,0 +1,279 @@
+"""
+Motor de reabastecimiento del inventario.
+
+Carga el historial de ventas (DetalleFactura) una sola vez en arreglos de NumPy y
+calcula, para todos los productos activos en una sola pasada vectorizada:
+velocidad de venta, variabilidad de la demanda, días de cobertura, punto de
+reorden y cantidad sugerida a pedir. Con el resultado se generan pedidos en
+borrador (EntradaCompra en estado BORRADOR) agrupados por proveedor.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from .models import Producto, EntradaCompra, DetalleEntradaCompra
+from .proveedores import obtener_proveedor
+
+SIN_PROVEEDOR = 'Sin proveedor asignado'
+
+
+def cargar_ventas_diarias(fecha_inicio, fecha_fin):
+    """
+    Obtiene las unidades vendidas por producto y día en el rango [fecha_inicio, fecha_fin].
+    La agrupación la hace la base de datos; el resultado es un arreglo estructurado
+    con los campos 'producto' y 'cantidad' (una fila por producto y día con ventas).
+    """
+    from ventas.models import DetalleFactura
+
+    ventas_diarias = DetalleFactura.objects.filter(
+        factura__estado='COMPLETADA',
+        factura__fecha_local__gte=fecha_inicio,
+        factura__fecha_local__lte=fecha_fin
+    ).values(
+        'producto_id', 'factura__fecha_local'
+    ).annotate(
+        cantidad_dia=Sum('cantidad')
+    ).values_list(
+        'producto_id', 'cantidad_dia'
+    ).order_by()
+
+    return np.fromiter(
+        ventas_diarias.iterator(chunk_size=10000),
+        dtype=[('producto', np.int64), ('cantidad', np.float64)]
+    )
+
+
+def calcular_demanda(ids, fecha_inicio, fecha_fin):
+    """
+    Calcula velocidad (promedio diario) y desviación estándar de la demanda diaria
+    para los productos de `ids` (arreglo ordenado) en el rango de fechas dado.
+    Los días sin ventas cuentan como demanda cero.
+    """
+    n = len(ids)
+    dias = (fecha_fin - fecha_inicio).days + 1
+
+    # Acumular suma y suma de cuadrados por producto en una sola pasada
+    ventas = cargar_ventas_diarias(fecha_inicio, fecha_fin)
+    posiciones = np.searchsorted(ids, ventas['producto'])
+    validos = posiciones < n
+    validos[validos] = ids[posiciones[validos]] == ventas['producto'][validos]
+    posiciones = posiciones[validos]
+    cantidades = ventas['cantidad'][validos]
+
+    suma = np.bincount(posiciones, weights=cantidades, minlength=n)
+    suma_cuadrados = np.bincount(posiciones, weights=cantidades * cantidades, minlength=n)
+
+    velocidad = suma / dias
+    varianza = np.maximum(suma_cuadrados / dias - velocidad * velocidad, 0)
+    return velocidad, np.sqrt(varianza)
+
+
+def parametros_por_categoria(valores, por_defecto):
+    """
+    Convierte una secuencia de valores de override por categoría (None = sin
+    override) en un arreglo de floats, usando el valor por defecto donde falte.
+    """
+    return np.fromiter(
+        (por_defecto if valor is None else float(valor) for valor in valores),
+        dtype=np.float64,
+        count=len(valores)
+    )
+
+
+def calcular_reabastecimiento(dias_historial=90, dias_entrega=7, dias_revision=14,
+                              nivel_servicio_z=1.65, fecha_fin=None, clases_abc=None):
+    """
+    Calcula las métricas de reabastecimiento de todos los productos activos.
+
+    - velocidad: unidades vendidas promedio por día (incluye días sin ventas)
+    - desviacion: desviación estándar de la demanda diaria
+    - dias_cobertura: días que alcanza el stock actual a la velocidad actual
+    - punto_reorden: demanda esperada durante el tiempo de entrega + stock de seguridad
+    - stock_objetivo: nivel al que se repone (entrega + periodo de revisión)
+    - cantidad_pedir: unidades sugeridas para volver al stock objetivo
+
+    El stock mínimo de cada producto se respeta como piso del punto de reorden y
+    del stock objetivo. Los días de entrega y el factor de seguridad configurados
+    en la categoría sobrescriben los valores por defecto. Con `clases_abc` (p. ej.
+    ['A']) solo se analizan los productos de esas clases ABC por ingresos.
+
+    Retorna un diccionario de arreglos alineados por producto.
+    """
+    fecha_fin = fecha_fin or timezone.localdate()
+    fecha_inicio = fecha_fin - timedelta(days=dias_historial - 1)
+
+    ultimo_proveedor = DetalleEntradaCompra.objects.filter(
+        producto=OuterRef('pk'),
+        entrada_compra__estado='REGISTRADA'
+    ).order_by(
+        '-entrada_compra__fecha_compra', '-id'
+    ).values('entrada_compra__proveedor__nombre')[:1]
+
+    productos = Producto.objects.filter(activo=True)
+    if clases_abc:
+        productos = productos.filter(clase_abc_ingresos__in=clases_abc)
+
+    productos = list(
+        productos.annotate(
+            ultimo_proveedor=Subquery(ultimo_proveedor)
+        ).order_by('id').values_list(
+            'id', 'stock_actual', 'stock_minimo', 'costo_promedio', 'precio_compra', 'ultimo_proveedor',
+            'categoria__dias_entrega', 'categoria__factor_seguridad'
+        )
+    )
+
+    n = len(productos)
+    ids = np.fromiter((p[0] for p in productos), dtype=np.int64, count=n)
+    stock = np.fromiter((p[1] for p in productos), dtype=np.float64, count=n)
+    stock_minimo = np.fromiter((p[2] for p in productos), dtype=np.float64, count=n)
+    dias_entrega = parametros_por_categoria([p[6] for p in productos], dias_entrega)
+    nivel_servicio_z = parametros_por_categoria([p[7] for p in productos], nivel_servicio_z)
+
+    velocidad, desviacion = calcular_demanda(ids, fecha_inicio, fecha_fin)
+
+    dias_cobertura = np.divide(
+        stock, velocidad, out=np.full(n, np.inf), where=velocidad > 0
+    )
+
+    horizonte = dias_entrega + dias_revision
+    punto_reorden = np.maximum(
+        velocidad * dias_entrega + nivel_servicio_z * desviacion * np.sqrt(dias_entrega),
+        stock_minimo
+    )
+    stock_objetivo = np.maximum(
+        velocidad * horizonte + nivel_servicio_z * desviacion * np.sqrt(horizonte),
+        stock_minimo
+    )
+    cantidad_pedir = np.where(
+        stock <= punto_reorden,
+        np.maximum(np.ceil(stock_objetivo - stock), 0),
+        0
+    ).astype(np.int64)
+
+    return {
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'producto_id': ids,
+        'stock_actual': stock.astype(np.int64),
+        'velocidad': velocidad,
+        'desviacion': desviacion,
+        'dias_cobertura': dias_cobertura,
+        'punto_reorden': punto_reorden,
+        'stock_objetivo': stock_objetivo,
+        'cantidad_pedir': cantidad_pedir,
+        'costo_unitario': [
+            p[3] if p[3] > 0 else p[4] for p in productos
+        ],
+        'proveedor': [p[5] or SIN_PROVEEDOR for p in productos],
+    }
+
+
+def sugerencias_de_compra(resultado, limite=None):
+    """
+    Convierte el resultado en una lista de diccionarios con los productos que
+    necesitan pedido, ordenados por días de cobertura (los más urgentes primero).
+    """
+    indices = np.flatnonzero(resultado['cantidad_pedir'] > 0)
+    indices = indices[np.argsort(resultado['dias_cobertura'][indices], kind='stable')]
+    if limite:
+        indices = indices[:limite]
+
+    productos = Producto.objects.select_related(
+        'nombre_producto', 'categoria'
+    ).in_bulk([int(resultado['producto_id'][i]) for i in indices])
+
+    sugerencias = []
+    for i in indices:
+        cantidad = int(resultado['cantidad_pedir'][i])
+        costo = resultado['costo_unitario'][i]
+        sugerencias.append({
+            'producto': productos[int(resultado['producto_id'][i])],
+            'proveedor': resultado['proveedor'][i],
+            'stock_actual': int(resultado['stock_actual'][i]),
+            'velocidad': float(resultado['velocidad'][i]),
+            'desviacion': float(resultado['desviacion'][i]),
+            'dias_cobertura': float(resultado['dias_cobertura'][i]),
+            'punto_reorden': float(resultado['punto_reorden'][i]),
+            'cantidad_pedir': cantidad,
+            'costo_unitario': costo,
+            'subtotal': costo * cantidad,
+        })
+    return sugerencias
+
+
+def generar_borradores(resultado, usuario):
+    """
+    Crea un pedido en borrador (EntradaCompra en estado BORRADOR) por proveedor
+    con los productos que necesitan reabastecerse. Los borradores no afectan el
+    stock hasta que se confirman.
+
+    Si ya se generaron sugerencias el mismo día, los productos que se vuelven a
+    sugerir se quitan de los borradores anteriores (se eliminan los que quedan
+    vacíos) para no pedirlos dos veces, y la numeración continúa después del
+    último número del día.
+    """
+    indices = np.flatnonzero(resultado['cantidad_pedir'] > 0)
+    por_proveedor = {}
+    for i in indices:
+        por_proveedor.setdefault(resultado['proveedor'][i], []).append(i)
+
+    fecha = timezone.localdate()
+    prefijo = f"SUG-{fecha.strftime('%Y%m%d')}-"
+    borradores = []
+    with transaction.atomic():
+        del_dia = EntradaCompra.objects.select_for_update().filter(numero_factura__startswith=prefijo)
+        ultimo = max(
+            (int(numero[len(prefijo):]) for numero in del_dia.values_list('numero_factura', flat=True)
+             if numero[len(prefijo):].isdigit()),
+            default=0
+        )
+        anteriores = del_dia.filter(estado='BORRADOR')
+        DetalleEntradaCompra.objects.filter(
+            entrada_compra__in=anteriores,
+            producto_id__in=[int(resultado['producto_id'][i]) for i in indices]
+        ).delete()
+        for anterior in anteriores.annotate(lineas=Count('detalles'), suma=Sum('detalles__subtotal')):
+            if not anterior.lineas:
+                anterior.delete()
+            elif anterior.total != anterior.suma:
+                anterior.total = anterior.suma
+                anterior.save(update_fields=['total'])
+
+        for numero, (proveedor, indices_proveedor) in enumerate(sorted(por_proveedor.items()), start=ultimo + 1):
+            entrada = EntradaCompra.objects.create(
+                numero_factura=f"{prefijo}{numero:03d}",
+                proveedor=obtener_proveedor(proveedor),
+                fecha_compra=fecha,
+                estado='BORRADOR',
+                observaciones=(
+                    f"Pedido sugerido por el motor de reabastecimiento "
+                    f"(historial {resultado['fecha_inicio']:%d/%m/%Y} - {resultado['fecha_fin']:%d/%m/%Y})."
+                ),
+                usuario_registro=usuario
+            )
+
+            detalles = []
+            total = Decimal('0.00')
+            for i in indices_proveedor:
+                cantidad = int(resultado['cantidad_pedir'][i])
+                precio_unitario = resultado['costo_unitario'][i]
+                subtotal = precio_unitario * cantidad
+                total += subtotal
+                detalles.append(DetalleEntradaCompra(
+                    entrada_compra=entrada,
+                    producto_id=int(resultado['producto_id'][i]),
+                    cantidad=cantidad,
+                    precio_unitario=precio_unitario,
+                    subtotal=subtotal
+                ))
+            DetalleEntradaCompra.objects.bulk_create(detalles)
+
+            entrada.total = total
+            entrada.save(update_fields=['total'])
+            borradores.append(entrada)
+
+    return borradores
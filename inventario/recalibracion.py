@@ -0,0 +1,87 @@
+"""
+Recálculo automático del stock mínimo de los productos.
+
+El stock mínimo se recalcula como el punto de reorden de cada producto:
+demanda esperada durante el tiempo de entrega más un stock de seguridad
+(z · σ · √tiempo_entrega). La demanda se obtiene en una sola pasada vectorizada
+(ver inventario.reabastecimiento) y los cambios se escriben con un único
+bulk_update. Cada ejecución queda registrada en RecalculoStockMinimo.
+"""
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Producto, RecalculoStockMinimo
+from .reabastecimiento import calcular_demanda, parametros_por_categoria
+
+
+def recalcular_stock_minimo(dias_historial=90, dias_entrega=7, nivel_servicio_z=1.65,
+                            dry_run=False, fecha_fin=None):
+    """
+    Recalcula el stock mínimo de todos los productos activos con ventas en el
+    periodo, excepto los de categorías marcadas con stock_minimo_manual.
+    Los productos sin ventas en el periodo conservan su valor actual.
+
+    Con dry_run=True solo se registra el reporte de diferencias, sin guardar.
+    Retorna la instancia de RecalculoStockMinimo creada.
+    """
+    inicio = time.perf_counter()
+    fecha_fin = fecha_fin or timezone.localdate()
+    fecha_inicio = fecha_fin - timedelta(days=dias_historial - 1)
+
+    productos = list(
+        Producto.objects.filter(
+            activo=True,
+            categoria__stock_minimo_manual=False
+        ).select_related('nombre_producto', 'categoria').order_by('id')
+    )
+
+    n = len(productos)
+    ids = np.fromiter((p.id for p in productos), dtype=np.int64, count=n)
+    anterior = np.fromiter((p.stock_minimo for p in productos), dtype=np.int64, count=n)
+    entrega = parametros_por_categoria([p.categoria.dias_entrega for p in productos], dias_entrega)
+    z = parametros_por_categoria([p.categoria.factor_seguridad for p in productos], nivel_servicio_z)
+
+    velocidad, desviacion = calcular_demanda(ids, fecha_inicio, fecha_fin)
+
+    nuevo = np.ceil(velocidad * entrega + z * desviacion * np.sqrt(entrega)).astype(np.int64)
+    cambios = np.flatnonzero((velocidad > 0) & (nuevo != anterior))
+
+    diferencias = []
+    modificados = []
+    for i in cambios:
+        producto = productos[i]
+        diferencias.append({
+            'producto_id': producto.id,
+            'codigo': producto.codigo,
+            'nombre': producto.nombre,
+            'anterior': int(anterior[i]),
+            'nuevo': int(nuevo[i]),
+            'velocidad': round(float(velocidad[i]), 4),
+        })
+        producto.stock_minimo = int(nuevo[i])
+        producto.por_agotarse = producto.esta_por_agotarse()
+        modificados.append(producto)
+
+    with transaction.atomic():
+        if not dry_run and modificados:
+            Producto.objects.bulk_update(
+                modificados, ['stock_minimo', 'por_agotarse'], batch_size=1000
+            )
+            # bulk_update no envía signals: invalidar los reportes de inventario
+            from reportes.cache import programar_incremento
+            from reportes.models import VersionDatos
+            programar_incremento(VersionDatos.INVENTARIO)
+
+        return RecalculoStockMinimo.objects.create(
+            dry_run=dry_run,
+            dias_historial=dias_historial,
+            dias_entrega=dias_entrega,
+            productos_analizados=n,
+            productos_modificados=len(modificados),
+            duracion_segundos=time.perf_counter() - inicio,
+            diferencias=diferencias
+        )
@@ -2,10 +2,11 @@
 Signals para el módulo de inventario.
 Maneja la lógica de actualización de stock en entradas de compra y ajustes.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.db import transaction
-from .models import DetalleEntradaCompra, AjusteInventario
+from .models import Producto, NombreProducto, DetalleEntradaCompra, AjusteInventario
+from .busqueda import indexar_productos, desindexar_producto
 
 
 @receiver(post_save, sender=DetalleEntradaCompra)
@@ -13,17 +14,11 @@ def aumentar_stock_al_comprar(sender, instance, created, **kwargs):
     """
     Signal que aumenta automáticamente el stock del producto cuando se registra una entrada de compra.
     También calcula el costo promedio y actualiza el precio de venta si está configurado.
+    Los borradores (pedidos sugeridos) se aplican al confirmarse, no al crearse.
     """
-    if created:
-        producto = instance.producto
-        
+    if created and not instance.entrada_compra.es_borrador():
         with transaction.atomic():
-            # Aumentar el stock primero
-            producto.stock_actual += instance.cantidad
-            producto.save(update_fields=['stock_actual'])
-            
-            # Calcular y actualizar costo promedio (esto también guarda el producto)
-            producto.actualizar_costo_promedio()
+            instance.aplicar_a_inventario()
 
 
 @receiver(post_save, sender=AjusteInventario)
@@ -42,3 +37,42 @@ def aplicar_ajuste_inventario(sender, instance, created, **kwargs):
                 # Actualizar el stock con la cantidad nueva del ajuste
                 producto.stock_actual = instance.cantidad_nueva
                 producto.save(update_fields=['stock_actual'])
+
+
+@receiver(post_save, sender=Producto)
+def indexar_producto_busqueda(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Signal que mantiene el índice de búsqueda de texto completo al guardar un producto.
+    Se omite en los guardados parciales que no tocan el texto (p. ej. cambios de stock).
+    """
+    if update_fields is None or 'texto_busqueda' in update_fields:
+        indexar_productos([instance])
+
+
+@receiver(post_delete, sender=Producto)
+def desindexar_producto_busqueda(sender, instance, **kwargs):
+    """
+    Signal que elimina el producto del índice de búsqueda.
+    """
+    desindexar_producto(instance.id)
+
+
+@receiver(post_save, sender=NombreProducto)
+def actualizar_busqueda_por_nombre(sender, instance, created, **kwargs):
+    """
+    Signal que regenera el texto de búsqueda de los productos cuando cambia su NombreProducto.
+    """
+    if created:
+        return
+    
+    modificados = []
+    for producto in instance.productos.all():
+        producto.nombre_producto = instance
+        texto = producto.generar_texto_busqueda()
+        if texto != producto.texto_busqueda:
+            producto.texto_busqueda = texto
+            modificados.append(producto)
+    
+    if modificados:
+        Producto.objects.bulk_update(modificados, ['texto_busqueda'])
+        indexar_productos(modificados)
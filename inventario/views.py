@@ -4,13 +4,17 @@ Vistas para el módulo de inventario.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, F, Sum
+from django.db.models import Sum
 from django.db import transaction
 from django.utils import timezone
 from django.http import JsonResponse
 import json
 
+from core.utils import paginar
 from inventario.models import Producto, Categoria, EntradaCompra, DetalleEntradaCompra, AjusteInventario
+from .busqueda import buscar_productos
+from .estadisticas import obtener_estadisticas
+from .proveedores import buscar_proveedores as buscar, clave_proveedor, obtener_proveedor
 from .forms import ProductoForm, CategoriaForm, EntradaCompraForm, AjusteInventarioForm
 
 
@@ -20,17 +24,12 @@ def index(request):
     Dashboard de inventario.
     """
     total_productos = Producto.objects.filter(activo=True).count()
-    productos_por_agotarse = Producto.objects.filter(
-        activo=True
-    ).filter(
-        stock_actual__lte=F('stock_minimo')
-    ).count()
-    
     productos_bajo_stock = Producto.objects.filter(
-        activo=True
-    ).filter(
-        stock_actual__lte=F('stock_minimo')
-    )[:10]
+        activo=True,
+        por_agotarse=True
+    )
+    productos_por_agotarse = productos_bajo_stock.count()
+    productos_bajo_stock = productos_bajo_stock.order_by('stock_actual')[:10]
     
     context = {
         'total_productos': total_productos,
@@ -46,18 +45,17 @@ def lista_productos(request):
     """
     Lista de productos.
     """
-    productos = Producto.objects.all().order_by('nombre_producto__nombre')
+    productos = Producto.objects.select_related(
+        'nombre_producto', 'categoria'
+    ).order_by('nombre_producto__nombre')
     
     query = request.GET.get('q', '')
     categoria_id = request.GET.get('categoria', '')
     estado = request.GET.get('estado', '')
+    clase_abc = request.GET.get('abc', '')
     
     if query:
-        productos = productos.filter(
-            Q(nombre_producto__nombre__icontains=query) |
-            Q(codigo__icontains=query) |
-            Q(descripcion__icontains=query)
-        )
+        productos = buscar_productos(productos, query)
     
     if categoria_id:
         productos = productos.filter(categoria_id=categoria_id)
@@ -67,16 +65,24 @@ def lista_productos(request):
     elif estado == 'inactivo':
         productos = productos.filter(activo=False)
     elif estado == 'por_agotarse':
-        productos = productos.filter(activo=True, stock_actual__lte=F('stock_minimo'))
+        productos = productos.filter(activo=True, por_agotarse=True)
+    
+    if clase_abc in dict(Producto.CLASE_ABC_CHOICES):
+        productos = productos.filter(clase_abc_ingresos=clase_abc)
     
     categorias = Categoria.objects.filter(activa=True)
+    pagina, parametros = paginar(request, productos)
     
     context = {
-        'productos': productos,
+        'productos': pagina,
+        'pagina': pagina,
+        'parametros': parametros,
         'categorias': categorias,
         'query': query,
         'categoria_selected': categoria_id,
         'estado_selected': estado,
+        'clases_abc': Producto.CLASE_ABC_CHOICES,
+        'clase_abc_selected': clase_abc,
     }
     
     return render(request, 'inventario/productos.html', context)
@@ -138,6 +144,7 @@ def detalle_producto(request, producto_id):
     
     context = {
         'producto': producto,
+        'estadisticas': obtener_estadisticas(producto),
     }
     
     return render(request, 'inventario/detalle_producto.html', context)
@@ -149,9 +156,8 @@ def productos_por_agotarse(request):
     Lista de productos por agotarse.
     """
     productos = Producto.objects.filter(
-        activo=True
-    ).filter(
-        stock_actual__lte=F('stock_minimo')
+        activo=True,
+        por_agotarse=True
     ).order_by('stock_actual')
     
     context = {
@@ -161,12 +167,61 @@ def productos_por_agotarse(request):
     return render(request, 'inventario/productos_por_agotarse.html', context)
 
 
+@login_required
+def reabastecimiento(request):
+    """
+    Sugerencias de compra calculadas por el motor de reabastecimiento.
+    POST: genera los pedidos en borrador agrupados por proveedor.
+    """
+    from .reabastecimiento import calcular_reabastecimiento, sugerencias_de_compra, generar_borradores
+    
+    try:
+        dias_historial = max(int(request.GET.get('dias_historial', 90)), 1)
+        dias_entrega = max(int(request.GET.get('dias_entrega', 7)), 0)
+    except (ValueError, TypeError):
+        dias_historial, dias_entrega = 90, 7
+    clase_abc = request.GET.get('abc', '')
+    if clase_abc not in dict(Producto.CLASE_ABC_CHOICES):
+        clase_abc = ''
+    
+    resultado = calcular_reabastecimiento(
+        dias_historial=dias_historial,
+        dias_entrega=dias_entrega,
+        clases_abc=[clase_abc] if clase_abc else None
+    )
+    
+    if request.method == 'POST':
+        borradores = generar_borradores(resultado, request.user)
+        if borradores:
+            messages.success(
+                request,
+                f'Se generaron {len(borradores)} pedidos en borrador. Revíselos y confírmelos al recibir la mercadería.'
+            )
+        else:
+            messages.info(request, 'No hay productos que necesiten reabastecimiento.')
+        return redirect('inventario:entradas')
+    
+    sugerencias = sugerencias_de_compra(resultado)
+    
+    context = {
+        'sugerencias': sugerencias,
+        'total_productos': len(resultado['producto_id']),
+        'total_estimado': sum(item['subtotal'] for item in sugerencias),
+        'dias_historial': dias_historial,
+        'dias_entrega': dias_entrega,
+        'clases_abc': Producto.CLASE_ABC_CHOICES,
+        'clase_abc_selected': clase_abc,
+    }
+    
+    return render(request, 'inventario/reabastecimiento.html', context)
+
+
 @login_required
 def lista_entradas(request):
     """
     Lista de entradas de compra.
     """
-    entradas = EntradaCompra.objects.all().order_by('-fecha_compra')[:50]
+    entradas = EntradaCompra.objects.select_related('proveedor').order_by('-fecha_compra')[:50]
     
     context = {
         'entradas': entradas,
@@ -200,11 +255,15 @@ def nueva_entrada(request):
                 messages.error(request, 'Debe completar el número de factura y el proveedor.')
                 return redirect('inventario:entrada_nueva')
             
+            if not clave_proveedor(proveedor):
+                messages.error(request, 'El nombre del proveedor debe tener al menos una letra o un número.')
+                return redirect('inventario:entrada_nueva')
+            
             # Crear entrada con transacción
             with transaction.atomic():
                 entrada = EntradaCompra.objects.create(
                     numero_factura=numero_factura,
-                    proveedor=proveedor,
+                    proveedor=obtener_proveedor(proveedor),
                     fecha_compra=fecha_compra or timezone.now().date(),
                     observaciones=observaciones,
                     usuario_registro=request.user
@@ -273,6 +332,23 @@ def detalle_entrada(request, entrada_id):
     return render(request, 'inventario/detalle_entrada.html', context)
 
 
+@login_required
+def confirmar_entrada(request, entrada_id):
+    """
+    Confirmar un pedido en borrador (aplica el stock de sus detalles).
+    """
+    entrada = get_object_or_404(EntradaCompra, id=entrada_id)
+    
+    if request.method == 'POST':
+        if entrada.es_borrador():
+            entrada.confirmar()
+            messages.success(request, f'Entrada de compra #{entrada.id} confirmada. El stock ha sido actualizado.')
+        else:
+            messages.warning(request, 'Esta entrada ya está registrada.')
+    
+    return redirect('inventario:detalle_entrada', entrada_id=entrada.id)
+
+
 @login_required
 def lista_ajustes(request):
     """
@@ -352,3 +428,15 @@ def obtener_producto_info(request, producto_id):
     except Producto.DoesNotExist:
         return JsonResponse({'error': 'Producto no encontrado'}, status=404)
 
+
+@login_required
+def buscar_proveedores(request):
+    """
+    API endpoint para autocompletar el proveedor de una entrada de compra (JSON).
+    """
+    proveedores = buscar(request.GET.get('q', ''))
+    return JsonResponse({
+        'proveedores': [
+            {'id': proveedor.id, 'nombre': proveedor.nombre} for proveedor in proveedores
+        ]
+    })
@@ -0,0 +1,29 @@
+from django.contrib import admin
+from .models import ValoracionInventario, TrabajoReporte
+
+
+@admin.register(ValoracionInventario)
+class ValoracionInventarioAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'nombre_categoria', 'cantidad_productos', 'unidades', 'valor_total']
+    list_filter = ['categoria']
+    date_hierarchy = 'fecha'
+    readonly_fields = [
+        'fecha', 'categoria', 'nombre_categoria', 'cantidad_productos',
+        'unidades', 'valor_total', 'fecha_registro'
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(TrabajoReporte)
+class TrabajoReporteAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tipo', 'estado', 'progreso', 'usuario', 'fecha_creacion', 'fecha_fin']
+    list_filter = ['tipo', 'estado']
+    readonly_fields = [
+        'tipo', 'parametros', 'version_datos', 'estado', 'progreso', 'cancelacion_solicitada', 'resultado',
+        'error', 'usuario', 'fecha_creacion', 'fecha_inicio', 'fecha_fin'
+    ]
+
+    def has_add_permission(self, request):
+        return False
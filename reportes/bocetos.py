@@ -0,0 +1,216 @@
+"""
+Bocetos (sketches) combinables para conteos distintos y cuantiles aproximados.
+
+- HyperLogLog: cantidad aproximada de valores distintos (clientes, productos).
+  Con 2**PRECISION_HLL registros el error estándar relativo es 1.04 / √m
+  (1.6 % con m = 4096); dos bocetos se combinan tomando el máximo de cada
+  registro, así que la unión de los días de un rango es exacta respecto a
+  contar el rango completo con un solo boceto.
+- DDSketch: cuantiles con error relativo garantizado (ERROR_CUANTILES). Cada
+  valor cae en un cubo logarítmico; combinar es sumar los conteos por cubo.
+
+BocetoDiario guarda los de cada día. Se recalculan completos para el día de la
+factura (al facturar, anular o eliminar detalles) porque una anulación no se
+puede restar de un HyperLogLog; un día son a lo sumo unos cientos de facturas.
+"""
+import math
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Sum
+
+from ventas.models import DetalleFactura, Factura
+from .models import BocetoDiario
+
+PRECISION_HLL = 12
+REGISTROS_HLL = 1 << PRECISION_HLL
+
+ERROR_CUANTILES = 0.01
+
+# Días que se leen juntos al reconstruir los bocetos
+DIAS_POR_BLOQUE = 31
+
+
+def _hash64(valores):
+    """splitmix64: dispersa enteros en 64 bits uniformes (determinista entre procesos)."""
+    z = np.asarray(valores, dtype=np.int64).astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _longitud_bits(valores):
+    """Cantidad de bits significativos de cada entero sin signo (0 para el cero)."""
+    valores = valores.copy()
+    longitud = np.zeros(len(valores), dtype=np.int64)
+    for desplazamiento in (32, 16, 8, 4, 2, 1):
+        grandes = valores >= np.uint64(1 << desplazamiento)
+        longitud[grandes] += desplazamiento
+        valores[grandes] >>= np.uint64(desplazamiento)
+    return longitud + (valores > 0)
+
+
+class HyperLogLog:
+    """Conteo aproximado de valores distintos (ids enteros)."""
+
+    error_estandar = 1.04 / math.sqrt(REGISTROS_HLL)
+
+    def __init__(self, registros=None):
+        if registros is None:
+            registros = np.zeros(REGISTROS_HLL, dtype=np.uint8)
+        self.registros = registros
+
+    def agregar(self, valores):
+        valores = np.asarray(valores)
+        if not len(valores):
+            return
+        hashes = _hash64(valores)
+        indices = (hashes >> np.uint64(64 - PRECISION_HLL)).astype(np.int64)
+        resto = hashes << np.uint64(PRECISION_HLL)
+        # Posición del primer bit en 1 en los 64 - p bits restantes
+        rangos = np.minimum(64 - _longitud_bits(resto) + 1, 64 - PRECISION_HLL + 1).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rangos)
+
+    def combinar(self, otro):
+        np.maximum(self.registros, otro.registros, out=self.registros)
+
+    def estimar(self):
+        m = REGISTROS_HLL
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimado = alfa * m * m / np.sum(np.exp2(-self.registros.astype(np.float64)))
+        vacios = int(np.count_nonzero(self.registros == 0))
+        if estimado <= 2.5 * m and vacios:
+            # Corrección para cardinalidades pequeñas (conteo lineal)
+            estimado = m * math.log(m / vacios)
+        return estimado
+
+    def a_bytes(self):
+        return zlib.compress(self.registros.tobytes())
+
+    @classmethod
+    def desde_bytes(cls, datos):
+        if not datos:
+            return cls()
+        return cls(np.frombuffer(zlib.decompress(bytes(datos)), dtype=np.uint8).copy())
+
+
+class DDSketch:
+    """Cuantiles aproximados con error relativo acotado (valores no negativos)."""
+
+    gamma = (1 + ERROR_CUANTILES) / (1 - ERROR_CUANTILES)
+
+    def __init__(self, cubos=None, ceros=0):
+        self.cubos = defaultdict(int, cubos or {})
+        self.ceros = ceros
+
+    def agregar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        positivos = valores[valores > 0]
+        self.ceros += len(valores) - len(positivos)
+        if len(positivos):
+            indices = np.ceil(np.log(positivos) / math.log(self.gamma)).astype(np.int64)
+            for indice, cantidad in zip(*np.unique(indices, return_counts=True)):
+                self.cubos[int(indice)] += int(cantidad)
+
+    def combinar(self, otro):
+        self.ceros += otro.ceros
+        for indice, cantidad in otro.cubos.items():
+            self.cubos[indice] += cantidad
+
+    @property
+    def cantidad(self):
+        return self.ceros + sum(self.cubos.values())
+
+    def cuantil(self, q):
+        """Valor del cuantil q (0 a 1); None si no hay valores."""
+        total = self.cantidad
+        if not total:
+            return None
+        posicion = q * (total - 1)
+        acumulado = self.ceros
+        if posicion < acumulado:
+            return 0.0
+        for indice in sorted(self.cubos):
+            acumulado += self.cubos[indice]
+            if posicion < acumulado:
+                return 2 * self.gamma ** indice / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.cubos) / (self.gamma + 1)
+
+    def a_dict(self):
+        return {'ceros': self.ceros, 'cubos': {str(indice): cantidad for indice, cantidad in self.cubos.items()}}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        datos = datos or {}
+        return cls({int(indice): cantidad for indice, cantidad in datos.get('cubos', {}).items()}, datos.get('ceros', 0))
+
+
+def _bocetos_del_bloque(fecha_inicio, fecha_fin):
+    """Arma los BocetoDiario (sin guardar) de los días con ventas del rango."""
+    facturas = Factura.objects.filter(
+        estado='COMPLETADA', fecha_local__gte=fecha_inicio, fecha_local__lte=fecha_fin
+    )
+    clientes = defaultdict(list)
+    totales = defaultdict(list)
+    for fecha, cliente_id, total in facturas.values_list('fecha_local', 'cliente_id', 'total').iterator():
+        totales[fecha].append(total)
+        if cliente_id is not None:
+            clientes[fecha].append(cliente_id)
+
+    detalles = DetalleFactura.objects.filter(factura__in=facturas)
+    unidades = defaultdict(list)
+    for fecha, cantidad in detalles.values('factura_id', 'factura__fecha_local').annotate(
+        unidades=Sum('cantidad')
+    ).values_list('factura__fecha_local', 'unidades').order_by():
+        unidades[fecha].append(cantidad)
+    productos = defaultdict(list)
+    for fecha, producto_id in detalles.values_list('factura__fecha_local', 'producto_id').distinct().order_by():
+        productos[fecha].append(producto_id)
+
+    bocetos = []
+    for fecha in sorted(totales):
+        hll_clientes, hll_productos = HyperLogLog(), HyperLogLog()
+        hll_clientes.agregar(clientes[fecha])
+        hll_productos.agregar(productos[fecha])
+        tickets, unidades_ticket = DDSketch(), DDSketch()
+        tickets.agregar([float(total) for total in totales[fecha]])
+        unidades_ticket.agregar(unidades[fecha])
+        bocetos.append(BocetoDiario(
+            fecha=fecha,
+            facturas=len(totales[fecha]),
+            clientes=hll_clientes.a_bytes(),
+            productos=hll_productos.a_bytes(),
+            tickets=tickets.a_dict(),
+            unidades_ticket=unidades_ticket.a_dict(),
+        ))
+    return bocetos
+
+
+def reconstruir_bocetos(fecha_inicio, fecha_fin):
+    """Recalcula los bocetos diarios del rango por bloques de días. Retorna los días escritos."""
+    escritos = 0
+    inicio = fecha_inicio
+    while inicio <= fecha_fin:
+        fin = min(inicio + timedelta(days=DIAS_POR_BLOQUE - 1), fecha_fin)
+        bocetos = _bocetos_del_bloque(inicio, fin)
+        BocetoDiario.objects.filter(fecha__gte=inicio, fecha__lte=fin).delete()
+        BocetoDiario.objects.bulk_create(bocetos)
+        escritos += len(bocetos)
+        inicio = fin + timedelta(days=1)
+    return escritos
+
+
+def combinar_bocetos(bocetos):
+    """Combina BocetoDiario en (facturas, hll_clientes, hll_productos, tickets, unidades_ticket)."""
+    facturas = 0
+    hll_clientes, hll_productos = HyperLogLog(), HyperLogLog()
+    tickets, unidades_ticket = DDSketch(), DDSketch()
+    for boceto in bocetos:
+        facturas += boceto.facturas
+        hll_clientes.combinar(HyperLogLog.desde_bytes(boceto.clientes))
+        hll_productos.combinar(HyperLogLog.desde_bytes(boceto.productos))
+        tickets.combinar(DDSketch.desde_dict(boceto.tickets))
+        unidades_ticket.combinar(DDSketch.desde_dict(boceto.unidades_ticket))
+    return facturas, hll_clientes, hll_productos, tickets, unidades_ticket
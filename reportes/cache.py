@@ -0,0 +1,158 @@
+"""
+Caché de resultados de reportes con invalidación por versión de datos.
+
+La clave de cada resultado incluye el reporte, sus parámetros y la versión de
+los datos que lee (VersionDatos). Las escrituras incrementan la versión, de modo
+que el siguiente acceso recalcula; los resultados viejos simplemente dejan de
+consultarse y expiran.
+
+- VENTAS cambia con cada factura (al facturar, anular o eliminar).
+- VENTAS_HISTORICAS cambia solo cuando la factura modificada es de un día ya
+  cerrado. Los rangos que terminan antes de hoy usan esta versión y se guardan
+  sin vencimiento: las ventas de hoy no los invalidan.
+- INVENTARIO cambia con cada modificación de productos (stock por ventas,
+  compras y ajustes, costos) y con las valoraciones nocturnas.
+
+Los aciertos y fallos se cuentan por reporte en la misma caché.
+"""
+import hashlib
+import json
+import threading
+import weakref
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import VersionDatos
+
+PREFIJO = 'reportes'
+
+# Segundos que se conservan los resultados de rangos que incluyen hoy
+TIEMPO_RESULTADOS_ABIERTOS = 60 * 60 * 24
+
+
+def obtener_versiones(claves):
+    """Versiones actuales de los grupos de datos indicados (0 si nunca cambiaron)."""
+    versiones = dict(
+        VersionDatos.objects.filter(clave__in=claves).values_list('clave', 'version')
+    )
+    return [versiones.get(clave, 0) for clave in claves]
+
+
+def incrementar_versiones(claves):
+    """Incrementa de inmediato las versiones indicadas."""
+    for clave in claves:
+        actualizados = VersionDatos.objects.filter(clave=clave).update(
+            version=F('version') + 1, fecha_actualizacion=timezone.now()
+        )
+        if not actualizados:
+            VersionDatos.objects.get_or_create(clave=clave, defaults={'version': 1})
+
+
+# Claves pendientes de incrementar al terminar la transacción en curso del
+# hilo y referencia débil a la función registrada con on_commit. Si la
+# transacción se revierte, Django descarta la función y la referencia muere:
+# la siguiente llamada registra otra (las claves que quedaron pendientes se
+# incrementan de más, nunca de menos).
+_pendientes = threading.local()
+
+
+class _IncrementoPendiente:
+    """Incrementa las versiones pendientes del hilo al confirmar la transacción."""
+
+    def __call__(self):
+        claves = getattr(_pendientes, 'claves', set())
+        _pendientes.claves = set()
+        _pendientes.funcion = None
+        if claves:
+            incrementar_versiones(sorted(claves))
+
+
+def programar_incremento(*claves):
+    """
+    Incrementa las versiones cuando termine la transacción en curso (de
+    inmediato si no hay una). Los incrementos de una misma transacción, p. ej.
+    un guardado de producto por cada detalle de factura, se agrupan en uno solo.
+    """
+    pendientes = getattr(_pendientes, 'claves', None)
+    if pendientes is None:
+        pendientes = _pendientes.claves = set()
+    pendientes.update(claves)
+
+    if not transaction.get_connection().in_atomic_block:
+        _IncrementoPendiente()()
+        return
+
+    registrada = getattr(_pendientes, 'funcion', None)
+    if registrada is None or registrada() is None:
+        funcion = _IncrementoPendiente()
+        _pendientes.funcion = weakref.ref(funcion)
+        transaction.on_commit(funcion)
+
+
+def _clave_metrica(reporte, tipo):
+    return f'{PREFIJO}:metricas:{reporte}:{tipo}'
+
+
+def _contar(reporte, tipo):
+    clave = _clave_metrica(reporte, tipo)
+    cache.add(clave, 0, None)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        # La entrada fue desalojada entre add() e incr()
+        cache.set(clave, 1, None)
+
+
+def resultado_en_cache(reporte, parametros, calcular, datos=(VersionDatos.VENTAS,), fecha_fin=None):
+    """
+    Retorna el resultado de `calcular()` para el reporte y sus parámetros,
+    desde la caché si la versión de `datos` no cambió.
+
+    Si `fecha_fin` es anterior a hoy, las ventas se consideran cerradas: se usa
+    la versión VENTAS_HISTORICAS y el resultado no vence.
+    """
+    cerrado = fecha_fin is not None and fecha_fin < timezone.localdate()
+    claves = [
+        VersionDatos.VENTAS_HISTORICAS if cerrado and clave == VersionDatos.VENTAS else clave
+        for clave in datos
+    ]
+    if VersionDatos.INVENTARIO in claves:
+        cerrado = False
+
+    firma = hashlib.sha1(
+        json.dumps(parametros, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+    versiones = '.'.join(str(version) for version in obtener_versiones(claves))
+    clave_cache = f'{PREFIJO}:{reporte}:{firma}:{versiones}'
+
+    resultado = cache.get(clave_cache)
+    if resultado is not None:
+        _contar(reporte, 'aciertos')
+        return resultado
+
+    _contar(reporte, 'fallos')
+    resultado = calcular()
+    cache.set(clave_cache, resultado, None if cerrado else TIEMPO_RESULTADOS_ABIERTOS)
+    return resultado
+
+
+def metricas(reportes):
+    """Aciertos, fallos y porcentaje de aciertos por reporte."""
+    valores = cache.get_many([
+        _clave_metrica(reporte, tipo) for reporte in reportes for tipo in ('aciertos', 'fallos')
+    ])
+    resultado = []
+    for reporte in reportes:
+        aciertos = valores.get(_clave_metrica(reporte, 'aciertos'), 0)
+        fallos = valores.get(_clave_metrica(reporte, 'fallos'), 0)
+        total = aciertos + fallos
+        resultado.append({
+            'reporte': reporte,
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'porcentaje': round(aciertos * 100 / total, 1) if total else None,
+        })
+    return resultado
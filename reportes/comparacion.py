@@ -0,0 +1,154 @@
+"""
+Comparación de un periodo contra otro (semana anterior, mismo mes del año
+anterior, etc.) a partir de los resúmenes diarios.
+
+Cada dimensión (categoría, vendedor) se calcula con una sola consulta que lee
+los dos periodos a la vez y separa sus sumas con agregados filtrados
+(Sum(..., filter=Q(fecha en el periodo))); las diferencias y los porcentajes de
+variación se calculan aquí y no en la plantilla.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+
+from .models import VentaDiariaProducto, VentaDiariaVendedor
+
+PERIODO_ANTERIOR = 'PERIODO_ANTERIOR'
+ANIO_ANTERIOR = 'ANIO_ANTERIOR'
+COMPARAR_CON_CHOICES = [
+    (PERIODO_ANTERIOR, 'Periodo anterior'),
+    (ANIO_ANTERIOR, 'Mismo periodo del año anterior'),
+]
+
+# Métricas de cada dimensión: (nombre, campo del resumen)
+METRICAS_CATEGORIA = [
+    ('ventas', 'ingresos'),
+    ('unidades', 'unidades'),
+    ('lineas', 'lineas'),
+]
+METRICAS_VENDEDOR = [
+    ('ventas', 'total'),
+    ('tickets', 'facturas'),
+]
+
+
+def _anio_anterior(fecha):
+    """La misma fecha un año antes (el 29 de febrero pasa al 28)."""
+    try:
+        return fecha.replace(year=fecha.year - 1)
+    except ValueError:
+        return fecha.replace(year=fecha.year - 1, day=28)
+
+
+def periodo_de_comparacion(fecha_inicio, fecha_fin, comparar_con=PERIODO_ANTERIOR):
+    """
+    Retorna (inicio, fin) del periodo contra el que se compara: el de la misma
+    cantidad de días justo antes, o el mismo rango un año antes.
+    """
+    if comparar_con == ANIO_ANTERIOR:
+        return _anio_anterior(fecha_inicio), _anio_anterior(fecha_fin)
+    dias = (fecha_fin - fecha_inicio).days + 1
+    return fecha_inicio - timedelta(days=dias), fecha_fin - timedelta(days=dias)
+
+
+def variacion(actual, anterior):
+    """Diferencia y porcentaje de variación (None si el periodo anterior es cero)."""
+    actual = actual or 0
+    anterior = anterior or 0
+    porcentaje = None
+    if anterior:
+        porcentaje = (Decimal(actual - anterior) * 100 / Decimal(anterior)).quantize(Decimal('0.1'))
+    return actual - anterior, porcentaje
+
+
+def _metrica(actual, anterior):
+    """Valores de una métrica en los dos periodos, con su diferencia y variación."""
+    diferencia, porcentaje = variacion(actual, anterior)
+    return {'actual': actual, 'anterior': anterior, 'diferencia': diferencia, 'variacion': porcentaje}
+
+
+def _comparar(resumenes, claves, metricas, actual, anterior):
+    """
+    Agrupa `resumenes` por `claves` sumando cada métrica por separado para los
+    dos periodos, en una sola consulta. Retorna (filas, totales).
+    """
+    (inicio, fin), (inicio_anterior, fin_anterior) = actual, anterior
+    en_actual = Q(fecha__gte=inicio, fecha__lte=fin)
+    en_anterior = Q(fecha__gte=inicio_anterior, fecha__lte=fin_anterior)
+
+    agregados = {}
+    for nombre, campo in metricas:
+        agregados[f'{nombre}_actual'] = Sum(campo, filter=en_actual)
+        agregados[f'{nombre}_anterior'] = Sum(campo, filter=en_anterior)
+
+    consulta = resumenes.filter(en_actual | en_anterior).values(*claves).annotate(**agregados).order_by()
+
+    filas = []
+    totales = {nombre: [0, 0] for nombre, _ in metricas}
+    for fila in consulta:
+        for nombre, _ in metricas:
+            valor_actual = fila.pop(f'{nombre}_actual') or 0
+            valor_anterior = fila.pop(f'{nombre}_anterior') or 0
+            fila[nombre] = _metrica(valor_actual, valor_anterior)
+            totales[nombre][0] += valor_actual
+            totales[nombre][1] += valor_anterior
+        filas.append(fila)
+
+    filas.sort(key=lambda fila: -fila['ventas']['actual'])
+    return filas, {nombre: _metrica(*valores) for nombre, valores in totales.items()}
+
+
+def comparar_por_categoria(actual, anterior):
+    """Ventas (subtotal), unidades y líneas vendidas por categoría en los dos periodos."""
+    filas, totales = _comparar(
+        VentaDiariaProducto.objects.all(),
+        ['producto__categoria__nombre'],
+        METRICAS_CATEGORIA, actual, anterior
+    )
+    for fila in filas:
+        fila['nombre'] = fila.pop('producto__categoria__nombre')
+    return filas, totales
+
+
+def _ticket_promedio(fila):
+    """Ticket promedio (ventas / tickets) de los dos periodos de una fila."""
+    promedios = [
+        (Decimal(fila['ventas'][periodo]) / fila['tickets'][periodo]).quantize(Decimal('0.01'))
+        if fila['tickets'][periodo] else Decimal('0')
+        for periodo in ('actual', 'anterior')
+    ]
+    return _metrica(*promedios)
+
+
+def comparar_por_vendedor(actual, anterior):
+    """Ventas (total), tickets y ticket promedio por vendedor en los dos periodos."""
+    filas, totales = _comparar(
+        VentaDiariaVendedor.objects.all(),
+        ['vendedor__username', 'vendedor__first_name', 'vendedor__last_name'],
+        METRICAS_VENDEDOR, actual, anterior
+    )
+    for fila in filas:
+        usuario = fila.pop('vendedor__username')
+        fila['nombre'] = (
+            f"{fila.pop('vendedor__first_name')} {fila.pop('vendedor__last_name')}".strip() or usuario
+        )
+        fila['ticket_promedio'] = _ticket_promedio(fila)
+    totales['ticket_promedio'] = _ticket_promedio(totales)
+    return filas, totales
+
+
+def comparar_periodos(fecha_inicio, fecha_fin, comparar_con=PERIODO_ANTERIOR):
+    """Comparación completa (por categoría y por vendedor) del periodo contra el de referencia."""
+    actual = (fecha_inicio, fecha_fin)
+    anterior = periodo_de_comparacion(fecha_inicio, fecha_fin, comparar_con)
+    categorias, totales_categorias = comparar_por_categoria(actual, anterior)
+    vendedores, totales_vendedores = comparar_por_vendedor(actual, anterior)
+    return {
+        'inicio_anterior': anterior[0],
+        'fin_anterior': anterior[1],
+        'categorias': categorias,
+        'totales_categorias': totales_categorias,
+        'vendedores': vendedores,
+        'totales_vendedores': totales_vendedores,
+    }
@@ -0,0 +1,200 @@
+"""
+Resumen mensual de compras por proveedor y producto (CompraMensualProveedor).
+
+Los reportes de compras leen esta tabla en lugar de agregar las entradas en cada
+petición: comparar proveedores o seguir el costo de un producto es una búsqueda
+por índice (proveedor, mes) o (producto, mes). Se mantiene desde los signals de
+compras (al registrar, confirmar un borrador o eliminar), recalculando solo las
+celdas mes × proveedor × producto de la entrada afectada. El comando
+reconstruir_resumenes_compras lo regenera (p. ej. después de corregir la fecha o
+el proveedor de una compra en el admin).
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+
+from inventario.models import DetalleEntradaCompra, EntradaCompra
+from .cache import incrementar_versiones
+from .models import CompraMensualProveedor, VersionDatos
+
+
+def inicio_de_mes(fecha):
+    return fecha.replace(day=1)
+
+
+def _mes_siguiente(mes):
+    return inicio_de_mes(mes + timedelta(days=32))
+
+
+def meses_atras(fecha, meses):
+    """Primer día del mes que está `meses` meses antes del de `fecha`."""
+    indice = fecha.year * 12 + fecha.month - 1 - meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def compras_por_mes(mes_inicio, mes_fin, proveedor_id=None, producto_ids=None):
+    """Agrega DetalleEntradaCompra registrados por mes, proveedor y producto."""
+    detalles = DetalleEntradaCompra.objects.filter(
+        entrada_compra__estado='REGISTRADA',
+        entrada_compra__fecha_compra__gte=mes_inicio,
+        entrada_compra__fecha_compra__lt=_mes_siguiente(mes_fin)
+    )
+    if proveedor_id is not None:
+        detalles = detalles.filter(entrada_compra__proveedor_id=proveedor_id)
+    if producto_ids is not None:
+        detalles = detalles.filter(producto_id__in=producto_ids)
+    return detalles.values(
+        'producto_id',
+        proveedor_id=F('entrada_compra__proveedor_id'),
+        mes=TruncMonth('entrada_compra__fecha_compra')
+    ).annotate(
+        unidades=Sum('cantidad'),
+        total=Sum('subtotal'),
+        compras=Count('id'),
+        costo_minimo=Min('precio_unitario'),
+        costo_maximo=Max('precio_unitario')
+    ).order_by()
+
+
+def _reemplazar(mes_inicio, mes_fin, proveedor_id=None, producto_ids=None):
+    """Borra las celdas del rango (y claves) y las vuelve a insertar."""
+    existentes = CompraMensualProveedor.objects.filter(mes__gte=mes_inicio, mes__lte=mes_fin)
+    if proveedor_id is not None:
+        existentes = existentes.filter(proveedor_id=proveedor_id)
+    if producto_ids is not None:
+        existentes = existentes.filter(producto_id__in=producto_ids)
+    existentes.delete()
+    filas = [
+        CompraMensualProveedor(**fila)
+        for fila in compras_por_mes(mes_inicio, mes_fin, proveedor_id, producto_ids)
+    ]
+    CompraMensualProveedor.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
+
+
+def reconstruir_compras_mensuales(fecha_inicio=None, fecha_fin=None):
+    """
+    Regenera el resumen de los meses que tocan el rango de fechas (por defecto,
+    desde la primera compra hasta la última). Retorna la cantidad de filas escritas.
+    """
+    rango = EntradaCompra.objects.aggregate(primera=Min('fecha_compra'), ultima=Max('fecha_compra'))
+    fecha_inicio = fecha_inicio or rango['primera']
+    fecha_fin = fecha_fin or rango['ultima']
+    if fecha_inicio is None or fecha_fin is None:
+        return 0
+
+    with transaction.atomic():
+        filas = _reemplazar(inicio_de_mes(fecha_inicio), inicio_de_mes(fecha_fin))
+        incrementar_versiones([VersionDatos.INVENTARIO])
+    return filas
+
+
+def actualizar_compras_entrada(entrada_id, celdas):
+    """
+    Recalcula las celdas {(mes, proveedor_id): producto_ids} de una entrada,
+    sumando los productos que la entrada tiene ahora.
+    """
+    actuales = set(
+        DetalleEntradaCompra.objects.filter(entrada_compra_id=entrada_id).values_list('producto_id', flat=True)
+    )
+    with transaction.atomic():
+        for (mes, proveedor_id), producto_ids in celdas.items():
+            producto_ids = producto_ids | actuales
+            if producto_ids:
+                _reemplazar(mes, mes, proveedor_id, list(producto_ids))
+        incrementar_versiones([VersionDatos.INVENTARIO])
+
+
+def programar_actualizacion(entrada, producto_ids=()):
+    """
+    Programa el recálculo de las celdas de la entrada (su mes y su proveedor,
+    para sus productos más `producto_ids`, p. ej. el de un detalle eliminado)
+    para cuando termine la transacción en curso. Los guardados repetidos de la
+    misma entrada (uno por detalle al registrarla) se agrupan en uno solo.
+    """
+    mes = inicio_de_mes(EntradaCompra._meta.get_field('fecha_compra').to_python(entrada.fecha_compra))
+    pendientes = entrada.__dict__.get('_celdas_compras')
+    if pendientes is not None:
+        pendientes.setdefault((mes, entrada.proveedor_id), set()).update(producto_ids)
+        return
+
+    entrada._celdas_compras = {(mes, entrada.proveedor_id): set(producto_ids)}
+
+    def actualizar():
+        actualizar_compras_entrada(entrada.pk, entrada.__dict__.pop('_celdas_compras', {}))
+
+    transaction.on_commit(actualizar)
+
+
+def _variacion(anterior, actual):
+    """Variación porcentual entre dos costos, o None sin costo anterior."""
+    if not anterior:
+        return None
+    return round(float((actual - anterior) / anterior * 100), 1)
+
+
+def _costo_promedio(total, unidades):
+    return (total / unidades).quantize(Decimal('0.01')) if unidades else Decimal('0.00')
+
+
+def gasto_por_proveedor(mes_inicio, mes_fin):
+    """Gasto, unidades y productos distintos por proveedor, de mayor a menor gasto."""
+    return CompraMensualProveedor.objects.filter(
+        mes__gte=mes_inicio, mes__lte=mes_fin
+    ).values(
+        'proveedor_id', 'proveedor__nombre'
+    ).annotate(
+        total=Sum('total'),
+        unidades=Sum('unidades'),
+        compras=Sum('compras'),
+        productos=Count('producto_id', distinct=True)
+    ).order_by('-total', 'proveedor__nombre')
+
+
+def gasto_por_mes(mes_inicio, mes_fin):
+    """Gasto total de cada mes del rango, en orden cronológico."""
+    return CompraMensualProveedor.objects.filter(
+        mes__gte=mes_inicio, mes__lte=mes_fin
+    ).values('mes').annotate(
+        total=Sum('total'),
+        proveedores=Count('proveedor_id', distinct=True)
+    ).order_by('mes')
+
+
+def costos_por_proveedor(producto_id, mes_inicio, mes_fin):
+    """
+    Costo unitario de un producto con cada proveedor, mes a mes, con la
+    variación contra el mes anterior con compras del mismo proveedor. Los
+    proveedores van del menor al mayor costo promedio del rango.
+    """
+    filas = CompraMensualProveedor.objects.filter(
+        producto_id=producto_id, mes__gte=mes_inicio, mes__lte=mes_fin
+    ).values(
+        'proveedor_id', 'proveedor__nombre', 'mes', 'unidades', 'total', 'costo_minimo', 'costo_maximo'
+    ).order_by('proveedor__nombre', 'proveedor_id', 'mes')
+
+    proveedores = []
+    for proveedor_id, meses in groupby(filas, key=lambda fila: fila['proveedor_id']):
+        meses = list(meses)
+        anterior = None
+        for mes in meses:
+            mes['costo_promedio'] = _costo_promedio(mes['total'], mes['unidades'])
+            mes['variacion'] = _variacion(anterior, mes['costo_promedio'])
+            anterior = mes['costo_promedio']
+        unidades = sum(mes['unidades'] for mes in meses)
+        total = sum((mes['total'] for mes in meses), Decimal('0.00'))
+        proveedores.append({
+            'proveedor_id': proveedor_id,
+            'proveedor': meses[0]['proveedor__nombre'],
+            'unidades': unidades,
+            'total': total,
+            'costo_promedio': _costo_promedio(total, unidades),
+            'variacion': _variacion(meses[0]['costo_promedio'], meses[-1]['costo_promedio']),
+            'meses': meses,
+        })
+    proveedores.sort(key=lambda proveedor: (proveedor['costo_promedio'], proveedor['proveedor']))
+    return proveedores
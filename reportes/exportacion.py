@@ -0,0 +1,200 @@
+"""
+Exportación de reportes a CSV y XLSX en streaming.
+
+Las filas se leen con iterator() por bloques y se escriben una por una en la
+respuesta (StreamingHttpResponse): la descarga empieza de inmediato y la memoria
+no crece con la cantidad de filas. El XLSX se genera sin dependencias externas,
+escribiendo la hoja como XML dentro de un ZIP que se va enviando por partes.
+"""
+import csv
+import math
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Filas que se acumulan antes de enviar un bloque al cliente
+FILAS_POR_BLOQUE = 500
+
+# Caracteres de control que no son válidos en XML
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def formato_exportacion(request):
+    """Retorna el formato pedido en el parámetro GET 'exportar' ('csv' o 'xlsx'), o None."""
+    formato = request.GET.get('exportar')
+    return formato if formato in FORMATOS else None
+
+
+def _texto(valor):
+    """Convierte un valor a texto para el CSV."""
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return timezone.localtime(valor).strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return str(valor)
+
+
+class _Eco:
+    """Pseudo archivo que devuelve lo escrito, para usar csv.writer en un generador."""
+
+    def write(self, valor):
+        return valor
+
+
+def filas_csv(encabezados, filas):
+    """Genera el CSV línea por línea (con BOM para que Excel reconozca UTF-8)."""
+    escritor = csv.writer(_Eco())
+    yield '\ufeff' + escritor.writerow(encabezados)
+    for fila in filas:
+        yield escritor.writerow([_texto(valor) for valor in fila])
+
+
+class _SalidaZip:
+    """
+    Destino no posicionable para zipfile: acumula lo escrito hasta que el
+    generador lo recoge. Al no tener seek(), zipfile escribe en modo streaming.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def _columna(indice):
+    """Letra de columna de Excel para un índice base 0 (0 -> A, 26 -> AA)."""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _celda(referencia, valor):
+    """
+    XML de una celda: numérica para números, texto en línea para lo demás. Los
+    números no finitos (inf, NaN) quedan vacíos: Excel no los acepta en <v>.
+    """
+    if valor is None or valor == '':
+        return ''
+    if isinstance(valor, bool):
+        valor = 'Sí' if valor else 'No'
+    elif isinstance(valor, Decimal):
+        return f'<c r="{referencia}"><v>{valor}</v></c>' if valor.is_finite() else ''
+    elif isinstance(valor, (int, float)):
+        return f'<c r="{referencia}"><v>{valor}</v></c>' if math.isfinite(valor) else ''
+    texto = escape(_CARACTERES_INVALIDOS.sub('', _texto(valor)))
+    return f'<c r="{referencia}" t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _fila_xml(numero, valores):
+    celdas = ''.join(_celda(f'{_columna(i)}{numero}', valor) for i, valor in enumerate(valores))
+    return f'<row r="{numero}">{celdas}</row>'.encode('utf-8')
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _workbook(nombre_hoja):
+    nombre = escape(nombre_hoja[:31])
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{nombre}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def filas_xlsx(encabezados, filas, nombre_hoja='Reporte'):
+    """Genera el archivo XLSX por bloques, escribiendo la hoja fila por fila."""
+    salida = _SalidaZip()
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as archivo:
+        archivo.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archivo.writestr('_rels/.rels', _RELS)
+        archivo.writestr('xl/workbook.xml', _workbook(nombre_hoja))
+        archivo.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        yield salida.vaciar()
+
+        with archivo.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as hoja:
+            hoja.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            hoja.write(_fila_xml(1, encabezados))
+            for numero, fila in enumerate(filas, start=2):
+                hoja.write(_fila_xml(numero, fila))
+                if numero % FILAS_POR_BLOQUE == 0:
+                    yield salida.vaciar()
+            hoja.write(b'</sheetData></worksheet>')
+    yield salida.vaciar()
+
+
+def respuesta_exportacion(formato, nombre_archivo, encabezados, filas):
+    """
+    Construye la respuesta en streaming para el formato indicado. `filas` debe
+    ser un iterable perezoso (p. ej. un generador sobre queryset.iterator()).
+    """
+    if formato == 'xlsx':
+        contenido = filas_xlsx(encabezados, filas)
+    else:
+        contenido = filas_csv(encabezados, filas)
+
+    respuesta = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre_archivo}.{formato}"'
+    return respuesta
@@ -4,6 +4,9 @@ Formularios para filtros de reportes.
 from django import forms
 from django.utils import timezone
 from datetime import date, timedelta
+from .comparacion import COMPARAR_CON_CHOICES, PERIODO_ANTERIOR
+from .compras import meses_atras
+from .rotacion import DIAS_SIN_VENTA
 
 
 class RangoFechasForm(forms.Form):
@@ -74,3 +77,117 @@ class ReporteVentasForm(RangoFechasForm):
             choices.append((vendedor.id, nombre))
         
         self.fields['vendedor'].choices = choices
+
+
+class ComparacionPeriodosForm(RangoFechasForm):
+    """
+    Formulario para comparar un periodo contra el anterior o contra el mismo
+    periodo del año anterior.
+    """
+    comparar_con = forms.ChoiceField(
+        label='Comparar con',
+        choices=COMPARAR_CON_CHOICES,
+        initial=PERIODO_ANTERIOR,
+        widget=forms.Select(attrs={
+            'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent'
+        })
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Valores por defecto: esta semana (lunes a hoy)
+        if not self.is_bound:
+            hoy = timezone.localdate()
+            self.fields['fecha_inicio'].initial = hoy - timedelta(days=hoy.weekday())
+            self.fields['fecha_fin'].initial = hoy
+
+
+class KardexForm(forms.Form):
+    """
+    Formulario del kardex: código del producto y rango de fechas opcional
+    (sin fechas se muestra desde el primer movimiento).
+    """
+    codigo = forms.CharField(
+        label='Código del Producto',
+        max_length=50,
+        widget=forms.TextInput(attrs={
+            'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
+            'placeholder': 'Ej. A001'
+        })
+    )
+    
+    fecha_inicio = forms.DateField(
+        label='Desde',
+        required=False,
+        widget=forms.DateInput(attrs={
+            'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
+            'type': 'date'
+        })
+    )
+    
+    fecha_fin = forms.DateField(
+        label='Hasta',
+        required=False,
+        widget=forms.DateInput(attrs={
+            'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
+            'type': 'date'
+        })
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        fecha_inicio = cleaned_data.get('fecha_inicio')
+        fecha_fin = cleaned_data.get('fecha_fin')
+        
+        if fecha_inicio and fecha_fin and fecha_inicio > fecha_fin:
+            raise forms.ValidationError('La fecha de inicio debe ser anterior a la fecha de fin.')
+        
+        return cleaned_data
+
+
+class RotacionInventarioForm(RangoFechasForm):
+    """
+    Formulario del reporte de rotación: periodo para la rotación y días sin
+    ventas a partir de los cuales un producto se considera sin movimiento.
+    """
+    dias_sin_venta = forms.IntegerField(
+        label='Días sin Venta',
+        min_value=1,
+        initial=DIAS_SIN_VENTA,
+        widget=forms.NumberInput(attrs={
+            'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent'
+        })
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Valores por defecto: últimos 90 días
+        if not self.is_bound:
+            hoy = timezone.localdate()
+            self.fields['fecha_inicio'].initial = hoy - timedelta(days=89)
+            self.fields['fecha_fin'].initial = hoy
+
+
+class ComprasProveedoresForm(RangoFechasForm):
+    """
+    Formulario del reporte de compras por proveedor: rango de fechas (se toman
+    los meses completos) y, opcionalmente, el código de un producto para
+    comparar su costo entre proveedores.
+    """
+    codigo = forms.CharField(
+        label='Código del Producto',
+        max_length=50,
+        required=False,
+        widget=forms.TextInput(attrs={
+            'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
+            'placeholder': 'Opcional: comparar costos'
+        })
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Valores por defecto: los últimos 12 meses
+        if not self.is_bound:
+            hoy = timezone.localdate()
+            self.fields['fecha_inicio'].initial = meses_atras(hoy, 11)
+            self.fields['fecha_fin'].initial = hoy
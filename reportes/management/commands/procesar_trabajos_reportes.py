@@ -0,0 +1,37 @@
+"""
+Comando de gestión que ejecuta los reportes solicitados en segundo plano.
+Debe correr como un proceso aparte de los workers web.
+Uso: python manage.py procesar_trabajos_reportes [--una-vez] [--intervalo SEGUNDOS]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from reportes.trabajos import ejecutar_trabajo, tomar_siguiente
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos de reportes pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa los trabajos pendientes y termina')
+        parser.add_argument('--intervalo', type=float, default=2,
+                            help='Segundos de espera cuando no hay trabajos (por defecto: 2)')
+
+    def handle(self, *args, **options):
+        while True:
+            trabajo = tomar_siguiente()
+            if trabajo is None:
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(f'Procesando {trabajo}...')
+            ejecutar_trabajo(trabajo)
+            if trabajo.estado == 'COMPLETADO':
+                self.stdout.write(self.style.SUCCESS(f'✓ {trabajo}'))
+            elif trabajo.estado == 'FALLIDO':
+                self.stdout.write(self.style.ERROR(f'✗ {trabajo}: {trabajo.error}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'{trabajo}'))
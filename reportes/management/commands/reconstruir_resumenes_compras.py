@@ -0,0 +1,37 @@
+"""
+Comando de gestión para regenerar el resumen mensual de compras por proveedor.
+Uso: python manage.py reconstruir_resumenes_compras [--desde AAAA-MM-DD] [--hasta AAAA-MM-DD]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from reportes.compras import reconstruir_compras_mensuales
+
+
+class Command(BaseCommand):
+    help = 'Regenera el resumen mensual de compras por proveedor y producto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=str,
+                            help='Fecha inicial; se regenera el mes completo (por defecto, la primera compra)')
+        parser.add_argument('--hasta', type=str,
+                            help='Fecha final; se regenera el mes completo (por defecto, la última compra)')
+
+    def _fecha(self, valor, opcion):
+        if not valor:
+            return None
+        try:
+            return date.fromisoformat(valor)
+        except ValueError:
+            raise CommandError(f'{opcion} debe tener el formato AAAA-MM-DD.')
+
+    def handle(self, *args, **options):
+        fecha_inicio = self._fecha(options['desde'], '--desde')
+        fecha_fin = self._fecha(options['hasta'], '--hasta')
+        if fecha_inicio and fecha_fin and fecha_inicio > fecha_fin:
+            raise CommandError('--desde no puede ser posterior a --hasta.')
+
+        filas = reconstruir_compras_mensuales(fecha_inicio, fecha_fin)
+
+        self.stdout.write(f'{"Compras mensuales por proveedor":<30} {filas:>8} filas')
+        self.stdout.write(self.style.SUCCESS('\n✓ Resumen mensual de compras reconstruido.'))
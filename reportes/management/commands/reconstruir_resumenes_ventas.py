@@ -0,0 +1,38 @@
+"""
+Comando de gestión para regenerar los resúmenes diarios de ventas.
+Uso: python manage.py reconstruir_resumenes_ventas [--desde AAAA-MM-DD] [--hasta AAAA-MM-DD]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from reportes.resumenes import reconstruir_resumenes
+
+
+class Command(BaseCommand):
+    help = 'Regenera los resúmenes diarios de ventas por producto, vendedor y cliente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=str,
+                            help='Fecha inicial (por defecto, la primera venta registrada)')
+        parser.add_argument('--hasta', type=str,
+                            help='Fecha final (por defecto, hoy)')
+
+    def _fecha(self, valor, opcion):
+        if not valor:
+            return None
+        try:
+            return date.fromisoformat(valor)
+        except ValueError:
+            raise CommandError(f'{opcion} debe tener el formato AAAA-MM-DD.')
+
+    def handle(self, *args, **options):
+        fecha_inicio = self._fecha(options['desde'], '--desde')
+        fecha_fin = self._fecha(options['hasta'], '--hasta')
+        if fecha_inicio and fecha_fin and fecha_inicio > fecha_fin:
+            raise CommandError('--desde no puede ser posterior a --hasta.')
+
+        filas = reconstruir_resumenes(fecha_inicio, fecha_fin)
+
+        for nombre, cantidad in filas.items():
+            self.stdout.write(f'{nombre:<30} {cantidad:>8} filas')
+        self.stdout.write(self.style.SUCCESS('\n✓ Resúmenes diarios de ventas reconstruidos.'))
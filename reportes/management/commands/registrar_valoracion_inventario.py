@@ -0,0 +1,38 @@
+"""
+Comando de gestión para guardar la valoración diaria del inventario por categoría.
+Pensado para ejecutarse cada noche (cron / programador de tareas).
+Uso: python manage.py registrar_valoracion_inventario [--fecha AAAA-MM-DD]
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from reportes.valoracion import registrar_valoracion
+
+
+class Command(BaseCommand):
+    help = 'Registra la valoración del inventario por categoría (una foto por día)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', type=str,
+                            help='Fecha a la que se asigna la foto (por defecto hoy, formato AAAA-MM-DD)')
+
+    def handle(self, *args, **options):
+        fecha = None
+        if options['fecha']:
+            try:
+                fecha = date.fromisoformat(options['fecha'])
+            except ValueError:
+                raise CommandError('--fecha debe tener el formato AAAA-MM-DD.')
+
+        registros = registrar_valoracion(fecha)
+
+        for registro in registros:
+            self.stdout.write(
+                f"{registro.nombre_categoria[:30]:<30} {registro.cantidad_productos:>6} productos "
+                f"C$ {registro.valor_total:>14,.2f}"
+            )
+
+        total = sum(registro.valor_total for registro in registros)
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ Valoración registrada: {len(registros)} categorías, valor total C$ {total:,.2f}"
+        ))
@@ -0,0 +1,80 @@
+"""
+Mapa de calor de ventas por día de la semana × hora (opcionalmente por categoría).
+
+Se lee de los resúmenes VentaHoraria y VentaHorariaCategoria, que ya traen el
+día de la semana: un rango de varios años agrupa a lo sumo 365 × 24 filas por
+año y categoría, sin recorrer Factura. Cada celda es el promedio por día (el
+total de la celda dividido entre las veces que ese día de la semana aparece en
+el rango), que es lo que sirve para planificar los turnos de caja.
+"""
+from django.db.models import Sum
+
+from .models import VentaHoraria, VentaHorariaCategoria
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+METRICAS = [
+    ('ventas', 'Ventas (C$)'),
+    ('facturas', 'Facturas'),
+    ('unidades', 'Unidades'),
+]
+
+
+def _origen(metrica, categoria_id):
+    """Resumen y campo a sumar para la métrica (con o sin filtro de categoría)."""
+    if categoria_id:
+        campos = {'ventas': 'ingresos', 'facturas': 'facturas', 'unidades': 'unidades'}
+        return VentaHorariaCategoria.objects.filter(categoria_id=categoria_id), campos[metrica]
+    if metrica == 'unidades':
+        return VentaHorariaCategoria.objects.all(), 'unidades'
+    return VentaHoraria.objects.all(), {'ventas': 'total', 'facturas': 'facturas'}[metrica]
+
+
+def dias_por_dia_semana(fecha_inicio, fecha_fin):
+    """Cantidad de lunes, martes, ..., domingos en el rango [fecha_inicio, fecha_fin]."""
+    dias = (fecha_fin - fecha_inicio).days + 1
+    return [
+        max(0, (dias - (dia_semana - fecha_inicio.isoweekday()) % 7 + 6) // 7)
+        for dia_semana in range(1, 8)
+    ]
+
+
+def calcular_mapa_calor(fecha_inicio, fecha_fin, metrica='ventas', categoria_id=None):
+    """
+    Matriz 7 × horas con el promedio por día de la métrica. Las horas van de la
+    primera a la última con ventas en el rango (de 0 a 23 si no hay ventas).
+    """
+    resumenes, campo = _origen(metrica, categoria_id)
+    celdas = {
+        (dia_semana, hora): valor or 0
+        for dia_semana, hora, valor in resumenes.filter(
+            fecha__gte=fecha_inicio, fecha__lte=fecha_fin
+        ).values('dia_semana', 'hora').annotate(
+            valor=Sum(campo)
+        ).values_list('dia_semana', 'hora', 'valor').order_by()
+    }
+
+    horas_con_ventas = [hora for _, hora in celdas]
+    horas = list(range(min(horas_con_ventas), max(horas_con_ventas) + 1)) if horas_con_ventas else list(range(24))
+    ocurrencias = dias_por_dia_semana(fecha_inicio, fecha_fin)
+
+    matriz = [
+        [
+            round(float(celdas.get((dia_semana, hora), 0)) / ocurrencias[dia_semana - 1], 2)
+            if ocurrencias[dia_semana - 1] else 0.0
+            for hora in horas
+        ]
+        for dia_semana in range(1, 8)
+    ]
+    return {
+        'metrica': metrica,
+        'categoria_id': categoria_id,
+        'fecha_inicio': fecha_inicio.isoformat(),
+        'fecha_fin': fecha_fin.isoformat(),
+        'dias': DIAS_SEMANA,
+        'horas': horas,
+        'dias_en_rango': ocurrencias,
+        'promedio_por_dia': matriz,
+        'total': float(sum(celdas.values())),
+        'maximo': max((valor for fila in matriz for valor in fila), default=0.0),
+    }
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventario', '0008_historial_precio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValoracionInventario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('nombre_categoria', models.CharField(help_text='Se conserva aunque la categoría se elimine o cambie de nombre', max_length=100, verbose_name='Nombre de la Categoría')),
+                ('cantidad_productos', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Productos')),
+                ('unidades', models.IntegerField(default=0, verbose_name='Unidades en Stock')),
+                ('valor_total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Valor Total (C$)')),
+                ('fecha_registro', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Registro')),
+                ('categoria', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='valoraciones', to='inventario.categoria', verbose_name='Categoría')),
+            ],
+            options={
+                'verbose_name': 'Valoración de Inventario',
+                'verbose_name_plural': 'Valoraciones de Inventario',
+                'ordering': ['-fecha', 'nombre_categoria'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'categoria'), name='reportes_valoracion_fecha_categoria_uniq')],
+            },
+        ),
+    ]
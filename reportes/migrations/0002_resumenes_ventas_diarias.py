@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0009_estadistica_producto'),
+        ('reportes', '0001_initial'),
+        ('ventas', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaDiariaCliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('facturas', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Facturas')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total (C$)')),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='ventas.cliente', verbose_name='Cliente')),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria por Cliente',
+                'verbose_name_plural': 'Ventas Diarias por Cliente',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['cliente', 'fecha'], name='reportes_ve_cliente_859e0b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'cliente'), name='reportes_ventadiariacliente_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VentaDiariaProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('unidades', models.IntegerField(default=0, verbose_name='Unidades Vendidas')),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ingresos (C$)')),
+                ('lineas', models.PositiveIntegerField(default=0, help_text='Cantidad de facturas en las que aparece el producto', verbose_name='Veces Vendido')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='inventario.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria por Producto',
+                'verbose_name_plural': 'Ventas Diarias por Producto',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['producto', 'fecha'], name='reportes_ve_product_275084_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'producto'), name='reportes_ventadiariaproducto_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VentaDiariaVendedor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('facturas', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Facturas')),
+                ('subtotal', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Subtotal (C$)')),
+                ('descuento', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Descuentos (C$)')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total (C$)')),
+                ('vendedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to=settings.AUTH_USER_MODEL, verbose_name='Vendedor')),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria por Vendedor',
+                'verbose_name_plural': 'Ventas Diarias por Vendedor',
+                'ordering': ['-fecha'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'vendedor'), name='reportes_ventadiariavendedor_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0003_trabajo_reporte'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionDatos',
+            fields=[
+                ('clave', models.CharField(choices=[('VENTAS', 'Ventas'), ('VENTAS_HISTORICAS', 'Ventas de días cerrados'), ('INVENTARIO', 'Inventario')], max_length=20, primary_key=True, serialize=False, verbose_name='Datos')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Versión')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Modificación')),
+            ],
+            options={
+                'verbose_name': 'Versión de Datos',
+                'verbose_name_plural': 'Versiones de Datos',
+                'ordering': ['clave'],
+            },
+        ),
+    ]
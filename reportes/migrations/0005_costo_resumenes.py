@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0004_version_datos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ventadiariaproducto',
+            name='costo',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Costo de lo vendido, con el costo unitario de cada venta', max_digits=14, verbose_name='Costo (C$)'),
+        ),
+        migrations.AddField(
+            model_name='ventadiariavendedor',
+            name='costo',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Costo de lo vendido, con el costo unitario de cada venta', max_digits=14, verbose_name='Costo (C$)'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0010_clase_abc_producto'),
+        ('reportes', '0005_costo_resumenes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaHoraria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('dia_semana', models.PositiveSmallIntegerField(help_text='1 = lunes ... 7 = domingo', verbose_name='Día de la Semana')),
+                ('hora', models.PositiveSmallIntegerField(verbose_name='Hora')),
+                ('facturas', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Facturas')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total (C$)')),
+            ],
+            options={
+                'verbose_name': 'Venta por Hora',
+                'verbose_name_plural': 'Ventas por Hora',
+                'ordering': ['-fecha', 'hora'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'hora'), name='reportes_ventahoraria_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VentaHorariaCategoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('dia_semana', models.PositiveSmallIntegerField(help_text='1 = lunes ... 7 = domingo', verbose_name='Día de la Semana')),
+                ('hora', models.PositiveSmallIntegerField(verbose_name='Hora')),
+                ('unidades', models.IntegerField(default=0, verbose_name='Unidades Vendidas')),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ingresos (C$)')),
+                ('facturas', models.PositiveIntegerField(default=0, help_text='Facturas con al menos un producto de la categoría', verbose_name='Cantidad de Facturas')),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_horarias', to='inventario.categoria', verbose_name='Categoría')),
+            ],
+            options={
+                'verbose_name': 'Venta por Hora y Categoría',
+                'verbose_name_plural': 'Ventas por Hora y Categoría',
+                'ordering': ['-fecha', 'hora'],
+                'indexes': [models.Index(fields=['categoria', 'fecha'], name='reportes_ve_categor_469c80_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'hora', 'categoria'), name='reportes_ventahorariacategoria_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0010_clase_abc_producto'),
+        ('reportes', '0006_ventas_horarias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingProductos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periodo', models.CharField(choices=[('DIA', 'Día'), ('SEMANA', 'Semana'), ('MES', 'Mes'), ('ANIO', 'Año')], max_length=10, verbose_name='Periodo')),
+                ('inicio', models.DateField(verbose_name='Inicio del Periodo')),
+                ('unidades', models.IntegerField(default=0, verbose_name='Unidades Vendidas')),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ingresos (C$)')),
+                ('lineas', models.PositiveIntegerField(default=0, verbose_name='Veces Vendido')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='inventario.producto', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Ranking de Productos',
+                'verbose_name_plural': 'Rankings de Productos',
+                'ordering': ['periodo', '-inicio', '-unidades', 'producto'],
+                'indexes': [models.Index(fields=['periodo', 'inicio', '-unidades'], name='reportes_ra_periodo_aa2868_idx')],
+                'constraints': [models.UniqueConstraint(fields=('periodo', 'inicio', 'producto'), name='reportes_ranking_periodo_producto_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0007_ranking_productos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BocetoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True, verbose_name='Fecha')),
+                ('facturas', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Facturas')),
+                ('clientes', models.BinaryField(verbose_name='HyperLogLog de Clientes')),
+                ('productos', models.BinaryField(verbose_name='HyperLogLog de Productos')),
+                ('tickets', models.JSONField(default=dict, verbose_name='Cuantiles del Total por Ticket')),
+                ('unidades_ticket', models.JSONField(default=dict, verbose_name='Cuantiles de Unidades por Ticket')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+            ],
+            options={
+                'verbose_name': 'Boceto Diario de Ventas',
+                'verbose_name_plural': 'Bocetos Diarios de Ventas',
+                'ordering': ['-fecha'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0012_proveedor'),
+        ('reportes', '0008_bocetos_diarios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompraMensualProveedor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primer día del mes de la fecha de compra', verbose_name='Mes')),
+                ('unidades', models.IntegerField(default=0, verbose_name='Unidades Compradas')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total Comprado (C$)')),
+                ('compras', models.PositiveIntegerField(default=0, help_text='Cantidad de entradas en las que aparece el producto', verbose_name='Veces Comprado')),
+                ('costo_minimo', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Costo Unitario Mínimo (C$)')),
+                ('costo_maximo', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Costo Unitario Máximo (C$)')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compras_mensuales', to='inventario.producto', verbose_name='Producto')),
+                ('proveedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compras_mensuales', to='inventario.proveedor', verbose_name='Proveedor')),
+            ],
+            options={
+                'verbose_name': 'Compra Mensual por Proveedor',
+                'verbose_name_plural': 'Compras Mensuales por Proveedor',
+                'ordering': ['-mes'],
+                'indexes': [models.Index(fields=['proveedor', 'mes'], name='reportes_co_proveed_cb1385_idx'), models.Index(fields=['producto', 'mes'], name='reportes_co_product_e7ce9d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('mes', 'proveedor', 'producto'), name='reportes_compramensualproveedor_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reportes', '0009_compras_mensuales_proveedor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajoreporte',
+            name='version_datos',
+            field=models.PositiveBigIntegerField(default=0, help_text='Versión de las ventas de días cerrados al solicitarlo; el resultado se reutiliza solo si no cambió', verbose_name='Versión de Datos'),
+        ),
+    ]
@@ -0,0 +1,626 @@
+"""
+Modelos del módulo de reportes.
+"""
+from decimal import Decimal
+
+from django.db import models
+from inventario.models import Categoria, Producto, Proveedor
+from usuarios.models import Usuario
+from ventas.models import Cliente
+
+
+class ValoracionInventario(models.Model):
+    """
+    Foto diaria del valor del inventario por categoría.
+    Se registra cada noche con el comando registrar_valoracion_inventario.
+    """
+    fecha = models.DateField(
+        verbose_name='Fecha'
+    )
+    categoria = models.ForeignKey(
+        Categoria,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='valoraciones',
+        verbose_name='Categoría'
+    )
+    nombre_categoria = models.CharField(
+        max_length=100,
+        verbose_name='Nombre de la Categoría',
+        help_text='Se conserva aunque la categoría se elimine o cambie de nombre'
+    )
+    cantidad_productos = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad de Productos'
+    )
+    unidades = models.IntegerField(
+        default=0,
+        verbose_name='Unidades en Stock'
+    )
+    valor_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Valor Total (C$)'
+    )
+    fecha_registro = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Registro'
+    )
+
+    class Meta:
+        verbose_name = 'Valoración de Inventario'
+        verbose_name_plural = 'Valoraciones de Inventario'
+        ordering = ['-fecha', 'nombre_categoria']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha', 'categoria'],
+                name='reportes_valoracion_fecha_categoria_uniq'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} - {self.nombre_categoria}: C$ {self.valor_total}"
+
+
+class VentaDiariaProducto(models.Model):
+    """
+    Resumen de ventas por día y producto (facturas completadas).
+    Se mantiene al facturar y al anular (ver reportes.resumenes).
+    """
+    fecha = models.DateField(
+        verbose_name='Fecha'
+    )
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name='ventas_diarias',
+        verbose_name='Producto'
+    )
+    unidades = models.IntegerField(
+        default=0,
+        verbose_name='Unidades Vendidas'
+    )
+    ingresos = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Ingresos (C$)'
+    )
+    lineas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Veces Vendido',
+        help_text='Cantidad de facturas en las que aparece el producto'
+    )
+    costo = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Costo (C$)',
+        help_text='Costo de lo vendido, con el costo unitario de cada venta'
+    )
+
+    class Meta:
+        verbose_name = 'Venta Diaria por Producto'
+        verbose_name_plural = 'Ventas Diarias por Producto'
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha', 'producto'],
+                name='reportes_ventadiariaproducto_uniq'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['producto', 'fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} - {self.producto.nombre}: {self.unidades}"
+
+
+class VentaDiariaVendedor(models.Model):
+    """
+    Resumen de ventas por día y vendedor (facturas completadas).
+    """
+    fecha = models.DateField(
+        verbose_name='Fecha'
+    )
+    vendedor = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='ventas_diarias',
+        verbose_name='Vendedor'
+    )
+    facturas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad de Facturas'
+    )
+    subtotal = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Subtotal (C$)'
+    )
+    descuento = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Descuentos (C$)'
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Total (C$)'
+    )
+    costo = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Costo (C$)',
+        help_text='Costo de lo vendido, con el costo unitario de cada venta'
+    )
+
+    class Meta:
+        verbose_name = 'Venta Diaria por Vendedor'
+        verbose_name_plural = 'Ventas Diarias por Vendedor'
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha', 'vendedor'],
+                name='reportes_ventadiariavendedor_uniq'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} - {self.vendedor}: C$ {self.total}"
+
+
+class VentaDiariaCliente(models.Model):
+    """
+    Resumen de ventas por día y cliente registrado (facturas completadas).
+    Las ventas sin cliente solo se reflejan en el resumen por vendedor.
+    """
+    fecha = models.DateField(
+        verbose_name='Fecha'
+    )
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name='ventas_diarias',
+        verbose_name='Cliente'
+    )
+    facturas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad de Facturas'
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Total (C$)'
+    )
+
+    class Meta:
+        verbose_name = 'Venta Diaria por Cliente'
+        verbose_name_plural = 'Ventas Diarias por Cliente'
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha', 'cliente'],
+                name='reportes_ventadiariacliente_uniq'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['cliente', 'fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} - {self.cliente}: C$ {self.total}"
+
+
+
+class VentaHoraria(models.Model):
+    """
+    Resumen de ventas por día y hora local (facturas completadas). Con el día de
+    la semana guardado, el mapa de calor día × hora agrupa columnas simples.
+    """
+    fecha = models.DateField(
+        verbose_name='Fecha'
+    )
+    dia_semana = models.PositiveSmallIntegerField(
+        verbose_name='Día de la Semana',
+        help_text='1 = lunes ... 7 = domingo'
+    )
+    hora = models.PositiveSmallIntegerField(
+        verbose_name='Hora'
+    )
+    facturas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad de Facturas'
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Total (C$)'
+    )
+
+    class Meta:
+        verbose_name = 'Venta por Hora'
+        verbose_name_plural = 'Ventas por Hora'
+        ordering = ['-fecha', 'hora']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha', 'hora'],
+                name='reportes_ventahoraria_uniq'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} {self.hora:02d}:00: C$ {self.total}"
+
+
+class VentaHorariaCategoria(models.Model):
+    """
+    Resumen de ventas por día, hora local y categoría (facturas completadas).
+    """
+    fecha = models.DateField(
+        verbose_name='Fecha'
+    )
+    dia_semana = models.PositiveSmallIntegerField(
+        verbose_name='Día de la Semana',
+        help_text='1 = lunes ... 7 = domingo'
+    )
+    hora = models.PositiveSmallIntegerField(
+        verbose_name='Hora'
+    )
+    categoria = models.ForeignKey(
+        Categoria,
+        on_delete=models.CASCADE,
+        related_name='ventas_horarias',
+        verbose_name='Categoría'
+    )
+    unidades = models.IntegerField(
+        default=0,
+        verbose_name='Unidades Vendidas'
+    )
+    ingresos = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Ingresos (C$)'
+    )
+    facturas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad de Facturas',
+        help_text='Facturas con al menos un producto de la categoría'
+    )
+
+    class Meta:
+        verbose_name = 'Venta por Hora y Categoría'
+        verbose_name_plural = 'Ventas por Hora y Categoría'
+        ordering = ['-fecha', 'hora']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha', 'hora', 'categoria'],
+                name='reportes_ventahorariacategoria_uniq'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['categoria', 'fecha']),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} {self.hora:02d}:00 - {self.categoria}: C$ {self.ingresos}"
+
+
+class RankingProductos(models.Model):
+    """
+    Productos más vendidos (por unidades) de cada día, semana, mes y año. Cada
+    periodo guarda a lo sumo los primeros reportes.rankings.TAMANO_RANKING
+    productos y se mantiene al facturar y al anular (ver reportes.rankings).
+    """
+    PERIODO_CHOICES = [
+        ('DIA', 'Día'),
+        ('SEMANA', 'Semana'),
+        ('MES', 'Mes'),
+        ('ANIO', 'Año'),
+    ]
+
+    periodo = models.CharField(
+        max_length=10,
+        choices=PERIODO_CHOICES,
+        verbose_name='Periodo'
+    )
+    inicio = models.DateField(
+        verbose_name='Inicio del Periodo'
+    )
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Producto'
+    )
+    unidades = models.IntegerField(
+        default=0,
+        verbose_name='Unidades Vendidas'
+    )
+    ingresos = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Ingresos (C$)'
+    )
+    lineas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Veces Vendido'
+    )
+
+    class Meta:
+        verbose_name = 'Ranking de Productos'
+        verbose_name_plural = 'Rankings de Productos'
+        ordering = ['periodo', '-inicio', '-unidades', 'producto']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['periodo', 'inicio', 'producto'],
+                name='reportes_ranking_periodo_producto_uniq'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['periodo', 'inicio', '-unidades']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_periodo_display()} {self.inicio:%d/%m/%Y} - {self.producto.nombre}: {self.unidades}"
+
+
+class BocetoDiario(models.Model):
+    """
+    Bocetos probabilísticos de las ventas de un día (ver reportes.bocetos):
+    HyperLogLog de los clientes y de los productos vendidos, y cuantiles del
+    total y de las unidades por ticket. Los de varios días se combinan para
+    responder cualquier rango sin COUNT(DISTINCT ...) sobre las facturas.
+    """
+    fecha = models.DateField(
+        unique=True,
+        verbose_name='Fecha'
+    )
+    facturas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad de Facturas'
+    )
+    clientes = models.BinaryField(
+        verbose_name='HyperLogLog de Clientes'
+    )
+    productos = models.BinaryField(
+        verbose_name='HyperLogLog de Productos'
+    )
+    tickets = models.JSONField(
+        default=dict,
+        verbose_name='Cuantiles del Total por Ticket'
+    )
+    unidades_ticket = models.JSONField(
+        default=dict,
+        verbose_name='Cuantiles de Unidades por Ticket'
+    )
+    fecha_actualizacion = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última Actualización'
+    )
+
+    class Meta:
+        verbose_name = 'Boceto Diario de Ventas'
+        verbose_name_plural = 'Bocetos Diarios de Ventas'
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y}: {self.facturas} facturas"
+
+
+class CompraMensualProveedor(models.Model):
+    """
+    Resumen de compras registradas por mes, proveedor y producto: gasto,
+    unidades y costo unitario (promedio, mínimo y máximo).
+    Se mantiene al registrar, confirmar o eliminar compras (ver reportes.compras).
+    """
+    mes = models.DateField(
+        verbose_name='Mes',
+        help_text='Primer día del mes de la fecha de compra'
+    )
+    proveedor = models.ForeignKey(
+        Proveedor,
+        on_delete=models.CASCADE,
+        related_name='compras_mensuales',
+        verbose_name='Proveedor'
+    )
+    producto = models.ForeignKey(
+        Producto,
+        on_delete=models.CASCADE,
+        related_name='compras_mensuales',
+        verbose_name='Producto'
+    )
+    unidades = models.IntegerField(
+        default=0,
+        verbose_name='Unidades Compradas'
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Total Comprado (C$)'
+    )
+    compras = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Veces Comprado',
+        help_text='Cantidad de entradas en las que aparece el producto'
+    )
+    costo_minimo = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name='Costo Unitario Mínimo (C$)'
+    )
+    costo_maximo = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name='Costo Unitario Máximo (C$)'
+    )
+
+    class Meta:
+        verbose_name = 'Compra Mensual por Proveedor'
+        verbose_name_plural = 'Compras Mensuales por Proveedor'
+        ordering = ['-mes']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['mes', 'proveedor', 'producto'],
+                name='reportes_compramensualproveedor_uniq'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['proveedor', 'mes']),
+            models.Index(fields=['producto', 'mes']),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:%m/%Y} - {self.proveedor} - {self.producto.nombre}: C$ {self.total}"
+
+    @property
+    def costo_promedio(self):
+        """Costo unitario promedio ponderado del mes."""
+        return (self.total / self.unidades).quantize(Decimal('0.01')) if self.unidades else Decimal('0.00')
+
+
+class TrabajoReporte(models.Model):
+    """
+    Reporte pesado ejecutado en segundo plano por el proceso
+    procesar_trabajos_reportes, fuera de los workers web. El resultado queda
+    guardado para volver a abrirlo sin recalcular.
+    """
+    TIPO_CHOICES = [
+        ('VENTAS_RANGO', 'Ventas por Rango'),
+        ('PRODUCTOS_MAS_VENDIDOS', 'Productos Más Vendidos'),
+    ]
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_PROCESO', 'En Proceso'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+        ('CANCELADO', 'Cancelado'),
+    ]
+
+    tipo = models.CharField(
+        max_length=30,
+        choices=TIPO_CHOICES,
+        verbose_name='Tipo de Reporte'
+    )
+    parametros = models.JSONField(
+        default=dict,
+        verbose_name='Parámetros'
+    )
+    version_datos = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Versión de Datos',
+        help_text='Versión de las ventas de días cerrados al solicitarlo; el resultado se reutiliza solo si no cambió'
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='PENDIENTE',
+        verbose_name='Estado'
+    )
+    progreso = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Progreso (%)'
+    )
+    cancelacion_solicitada = models.BooleanField(
+        default=False,
+        verbose_name='Cancelación Solicitada'
+    )
+    resultado = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name='Resultado'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Error'
+    )
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='trabajos_reportes',
+        verbose_name='Solicitado por'
+    )
+    fecha_creacion = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de Creación'
+    )
+    fecha_inicio = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Inicio de Ejecución'
+    )
+    fecha_fin = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fin de Ejecución'
+    )
+
+    class Meta:
+        verbose_name = 'Trabajo de Reporte'
+        verbose_name_plural = 'Trabajos de Reportes'
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'fecha_creacion']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.pk} ({self.get_estado_display()})"
+
+    def esta_activo(self):
+        """Indica si el trabajo todavía no terminó."""
+        return self.estado in ('PENDIENTE', 'EN_PROCESO')
+
+
+class VersionDatos(models.Model):
+    """
+    Contador de versión de un grupo de datos que leen los reportes. Se
+    incrementa con cada escritura (ventas, compras, ajustes) y forma parte de la
+    clave de los resultados en caché (ver reportes.cache).
+    """
+    VENTAS = 'VENTAS'
+    VENTAS_HISTORICAS = 'VENTAS_HISTORICAS'
+    INVENTARIO = 'INVENTARIO'
+    CLAVE_CHOICES = [
+        (VENTAS, 'Ventas'),
+        (VENTAS_HISTORICAS, 'Ventas de días cerrados'),
+        (INVENTARIO, 'Inventario'),
+    ]
+
+    clave = models.CharField(
+        max_length=20,
+        primary_key=True,
+        choices=CLAVE_CHOICES,
+        verbose_name='Datos'
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Versión'
+    )
+    fecha_actualizacion = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última Modificación'
+    )
+
+    class Meta:
+        verbose_name = 'Versión de Datos'
+        verbose_name_plural = 'Versiones de Datos'
+        ordering = ['clave']
+
+    def __str__(self):
+        return f"{self.get_clave_display()}: v{self.version}"
@@ -0,0 +1,179 @@
+"""
+Rankings de productos más vendidos por día, semana, mes y año (RankingProductos).
+
+Cada periodo guarda solo sus primeros TAMANO_RANKING productos por unidades.
+Al facturar o anular, los resúmenes diarios ya actualizados dan el total exacto
+del periodo para los productos de la factura (una consulta para los cuatro
+periodos) y se combinan con el ranking guardado:
+
+- Si un producto sube, entra o se reordena dentro del ranking; los demás
+  productos no cambiaron, así que ninguno de afuera puede superarlo.
+- Si un producto del ranking baja y el ranking está lleno, algún producto de
+  afuera podría pasarlo: ese periodo se reconstruye desde los resúmenes.
+
+Un ranking que no está lleno contiene todos los productos vendidos en el periodo.
+"""
+from datetime import date, timedelta
+
+from django.db.models import F, Q, Sum
+
+from .models import RankingProductos, VentaDiariaProducto
+
+TAMANO_RANKING = 50
+
+PERIODOS = ['DIA', 'SEMANA', 'MES', 'ANIO']
+
+
+def limites_periodo(periodo, fecha):
+    """Primer y último día del periodo que contiene a `fecha`."""
+    if periodo == 'DIA':
+        return fecha, fecha
+    if periodo == 'SEMANA':
+        inicio = fecha - timedelta(days=fecha.weekday())
+        return inicio, inicio + timedelta(days=6)
+    if periodo == 'MES':
+        inicio = fecha.replace(day=1)
+        siguiente = (inicio + timedelta(days=32)).replace(day=1)
+        return inicio, siguiente - timedelta(days=1)
+    return date(fecha.year, 1, 1), date(fecha.year, 12, 31)
+
+
+def periodo_exacto(fecha_inicio, fecha_fin):
+    """Retorna el periodo si el rango coincide con un día, semana, mes o año completo; si no, None."""
+    for periodo in PERIODOS:
+        if limites_periodo(periodo, fecha_inicio) == (fecha_inicio, fecha_fin):
+            return periodo
+    return None
+
+
+def _ordenar(tablero):
+    """Productos del tablero de mayor a menor cantidad (empates por id), recortados al tamaño."""
+    return sorted(tablero.items(), key=lambda item: (-item[1][0], item[0]))[:TAMANO_RANKING]
+
+
+def _guardar(periodo, inicio, anterior, nuevo):
+    """Escribe solo las diferencias entre el ranking guardado y el nuevo."""
+    nuevo = dict(nuevo)
+    eliminados = set(anterior) - set(nuevo)
+    if eliminados:
+        RankingProductos.objects.filter(periodo=periodo, inicio=inicio, producto_id__in=eliminados).delete()
+    cambios = [
+        RankingProductos(
+            periodo=periodo, inicio=inicio, producto_id=producto_id,
+            unidades=unidades, ingresos=ingresos, lineas=lineas
+        )
+        for producto_id, (unidades, ingresos, lineas) in nuevo.items()
+        if anterior.get(producto_id) != (unidades, ingresos, lineas)
+    ]
+    RankingProductos.objects.bulk_create(
+        cambios,
+        update_conflicts=True,
+        unique_fields=['periodo', 'inicio', 'producto'],
+        update_fields=['unidades', 'ingresos', 'lineas']
+    )
+
+
+def reconstruir_ranking(periodo, fecha):
+    """Recalcula desde los resúmenes diarios el ranking del periodo que contiene a `fecha`."""
+    inicio, fin = limites_periodo(periodo, fecha)
+    anterior = {
+        producto_id: (unidades, ingresos, lineas)
+        for producto_id, unidades, ingresos, lineas in RankingProductos.objects.filter(
+            periodo=periodo, inicio=inicio
+        ).values_list('producto_id', 'unidades', 'ingresos', 'lineas')
+    }
+    nuevo = [
+        (producto_id, (unidades, ingresos, lineas))
+        for producto_id, unidades, ingresos, lineas in VentaDiariaProducto.objects.filter(
+            fecha__gte=inicio, fecha__lte=fin
+        ).values('producto_id').annotate(
+            total_unidades=Sum('unidades'), total_ingresos=Sum('ingresos'), total_lineas=Sum('lineas')
+        ).filter(total_unidades__gt=0).order_by('-total_unidades', 'producto_id').values_list(
+            'producto_id', 'total_unidades', 'total_ingresos', 'total_lineas'
+        )[:TAMANO_RANKING]
+    ]
+    _guardar(periodo, inicio, anterior, nuevo)
+
+
+def actualizar_rankings(fecha, producto_ids):
+    """
+    Actualiza los rankings de los cuatro periodos que contienen a `fecha` para
+    los productos indicados. Debe llamarse después de actualizar los resúmenes
+    diarios de ese día.
+    """
+    producto_ids = list(producto_ids)
+    if not producto_ids:
+        return
+    rangos = {periodo: limites_periodo(periodo, fecha) for periodo in PERIODOS}
+
+    agregados = {}
+    for periodo, (inicio, fin) in rangos.items():
+        en_periodo = Q(fecha__gte=inicio, fecha__lte=fin)
+        agregados[f'unidades_{periodo}'] = Sum('unidades', filter=en_periodo)
+        agregados[f'ingresos_{periodo}'] = Sum('ingresos', filter=en_periodo)
+        agregados[f'lineas_{periodo}'] = Sum('lineas', filter=en_periodo)
+    # La semana ISO puede cruzar el año: se leen los días de todos los periodos
+    desde = min(inicio for inicio, _ in rangos.values())
+    hasta = max(fin for _, fin in rangos.values())
+    totales = {
+        fila['producto_id']: fila
+        for fila in VentaDiariaProducto.objects.filter(
+            producto_id__in=producto_ids, fecha__gte=desde, fecha__lte=hasta
+        ).values('producto_id').annotate(**agregados).order_by()
+    }
+
+    guardados = {periodo: {} for periodo in PERIODOS}
+    filtro = Q()
+    for periodo, (inicio, _) in rangos.items():
+        filtro |= Q(periodo=periodo, inicio=inicio)
+    for periodo, producto_id, unidades, ingresos, lineas in RankingProductos.objects.filter(filtro).values_list(
+        'periodo', 'producto_id', 'unidades', 'ingresos', 'lineas'
+    ):
+        guardados[periodo][producto_id] = (unidades, ingresos, lineas)
+
+    for periodo, (inicio, _) in rangos.items():
+        anterior = guardados[periodo]
+        tablero = dict(anterior)
+        bajo = False
+        for producto_id in producto_ids:
+            fila = totales.get(producto_id, {})
+            unidades = fila.get(f'unidades_{periodo}') or 0
+            if producto_id in anterior and unidades < anterior[producto_id][0]:
+                bajo = True
+            if unidades > 0:
+                tablero[producto_id] = (unidades, fila[f'ingresos_{periodo}'] or 0, fila[f'lineas_{periodo}'] or 0)
+            else:
+                tablero.pop(producto_id, None)
+
+        if bajo and len(anterior) >= TAMANO_RANKING:
+            reconstruir_ranking(periodo, fecha)
+        else:
+            _guardar(periodo, inicio, anterior, _ordenar(tablero))
+
+
+def reconstruir_rankings(fecha_inicio, fecha_fin):
+    """Reconstruye todos los rankings de los periodos que se cruzan con el rango."""
+    for periodo in PERIODOS:
+        fecha, _ = limites_periodo(periodo, fecha_inicio)
+        while fecha <= fecha_fin:
+            reconstruir_ranking(periodo, fecha)
+            fecha = limites_periodo(periodo, fecha)[1] + timedelta(days=1)
+
+
+def ranking(periodo, fecha, limite=20):
+    """
+    Los `limite` productos más vendidos del periodo que contiene a `fecha`, con
+    las mismas claves que el reporte de productos más vendidos.
+    """
+    inicio, _ = limites_periodo(periodo, fecha)
+    return list(
+        RankingProductos.objects.filter(periodo=periodo, inicio=inicio).values(
+            'producto__id',
+            'producto__nombre_producto__nombre',
+            'producto__codigo',
+            'producto__categoria__nombre',
+            cantidad_vendida=F('unidades'),
+            total_ventas=F('ingresos'),
+            veces_vendido=F('lineas'),
+        ).order_by('-unidades', 'producto_id')[:limite]
+    )
@@ -0,0 +1,205 @@
+"""
+Resúmenes diarios de ventas (día × producto, día × vendedor, día × cliente,
+día × hora y día × hora × categoría).
+
+Los reportes leen estas tablas en lugar de agregar Factura/DetalleFactura en cada
+petición: un año de reporte recorre 365 × K filas. Los resúmenes se mantienen
+desde los signals de ventas (al facturar, al anular y al eliminar detalles),
+recalculando solo el día y las claves de la factura afectada. El comando
+reconstruir_resumenes_ventas los regenera para cualquier rango de fechas
+(p. ej. después de cargas masivas o correcciones de fecha/vendedor en el admin).
+"""
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import ExtractIsoWeekDay
+from django.utils import timezone
+
+from ventas.models import Factura, DetalleFactura
+from .cache import incrementar_versiones
+from .bocetos import reconstruir_bocetos
+from .rankings import actualizar_rankings, reconstruir_rankings
+from .models import (
+    VentaDiariaProducto, VentaDiariaVendedor, VentaDiariaCliente, VentaHoraria, VentaHorariaCategoria,
+    BocetoDiario, VersionDatos,
+)
+
+
+def _facturas_completadas(fecha_inicio, fecha_fin):
+    """Facturas completadas con fecha local en el rango [fecha_inicio, fecha_fin]."""
+    return Factura.objects.filter(
+        estado='COMPLETADA',
+        fecha_local__gte=fecha_inicio,
+        fecha_local__lte=fecha_fin
+    )
+
+
+def ventas_por_producto(fecha_inicio, fecha_fin, producto_ids=None):
+    """Agrega DetalleFactura por día y producto."""
+    detalles = DetalleFactura.objects.filter(
+        factura__in=_facturas_completadas(fecha_inicio, fecha_fin)
+    )
+    if producto_ids is not None:
+        detalles = detalles.filter(producto_id__in=producto_ids)
+    return detalles.values(
+        'producto_id', fecha=F('factura__fecha_local')
+    ).annotate(
+        unidades=Sum('cantidad'),
+        ingresos=Sum('subtotal'),
+        lineas=Count('id'),
+        costo=Sum(F('cantidad') * F('costo_unitario'))
+    ).order_by()
+
+
+def ventas_por_vendedor(fecha_inicio, fecha_fin, vendedor_ids=None):
+    """Agrega Factura por día y vendedor."""
+    facturas = _facturas_completadas(fecha_inicio, fecha_fin)
+    if vendedor_ids is not None:
+        facturas = facturas.filter(vendedor_id__in=vendedor_ids)
+    return facturas.values(
+        'vendedor_id', fecha=F('fecha_local')
+    ).annotate(
+        facturas=Count('id'),
+        subtotal=Sum('subtotal'),
+        descuento=Sum('descuento'),
+        total=Sum('total'),
+        costo=Sum('costo_total')
+    ).order_by()
+
+
+def ventas_por_cliente(fecha_inicio, fecha_fin, cliente_ids=None):
+    """Agrega Factura por día y cliente registrado."""
+    facturas = _facturas_completadas(fecha_inicio, fecha_fin).filter(cliente__isnull=False)
+    if cliente_ids is not None:
+        facturas = facturas.filter(cliente_id__in=cliente_ids)
+    return facturas.values(
+        'cliente_id', fecha=F('fecha_local')
+    ).annotate(
+        facturas=Count('id'),
+        total=Sum('total')
+    ).order_by()
+
+
+def ventas_por_hora(fecha_inicio, fecha_fin, horas=None):
+    """Agrega Factura por día y hora local."""
+    facturas = _facturas_completadas(fecha_inicio, fecha_fin)
+    if horas is not None:
+        facturas = facturas.filter(hora_local__in=horas)
+    return facturas.values(
+        fecha=F('fecha_local'), hora=F('hora_local')
+    ).annotate(
+        dia_semana=ExtractIsoWeekDay('fecha_local'),
+        facturas=Count('id'),
+        total=Sum('total')
+    ).order_by()
+
+
+def ventas_por_hora_categoria(fecha_inicio, fecha_fin, horas=None):
+    """Agrega DetalleFactura por día, hora local y categoría."""
+    detalles = DetalleFactura.objects.filter(
+        factura__in=_facturas_completadas(fecha_inicio, fecha_fin)
+    )
+    if horas is not None:
+        detalles = detalles.filter(factura__hora_local__in=horas)
+    return detalles.values(
+        fecha=F('factura__fecha_local'), hora=F('factura__hora_local'), categoria_id=F('producto__categoria_id')
+    ).annotate(
+        dia_semana=ExtractIsoWeekDay('factura__fecha_local'),
+        unidades=Sum('cantidad'),
+        ingresos=Sum('subtotal'),
+        facturas=Count('factura_id', distinct=True)
+    ).order_by()
+
+
+# Modelo de resumen, campo clave y función de agregación
+RESUMENES = [
+    (VentaDiariaProducto, 'producto_id', ventas_por_producto),
+    (VentaDiariaVendedor, 'vendedor_id', ventas_por_vendedor),
+    (VentaDiariaCliente, 'cliente_id', ventas_por_cliente),
+    (VentaHoraria, 'hora', ventas_por_hora),
+    (VentaHorariaCategoria, 'hora', ventas_por_hora_categoria),
+]
+
+
+def _reemplazar(modelo, campo, agregacion, fecha_inicio, fecha_fin, ids=None):
+    """Borra las filas del resumen en el rango (y claves) y las vuelve a insertar."""
+    existentes = modelo.objects.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+    if ids is not None:
+        existentes = existentes.filter(**{f'{campo}__in': ids})
+    existentes.delete()
+    filas = [modelo(**fila) for fila in agregacion(fecha_inicio, fecha_fin, ids)]
+    modelo.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
+
+
+def reconstruir_resumenes(fecha_inicio=None, fecha_fin=None):
+    """
+    Regenera los resúmenes y los bocetos diarios para el rango de fechas
+    indicado (por defecto, desde la primera venta hasta hoy), junto con los
+    rankings de los periodos que lo tocan. Retorna un diccionario con la
+    cantidad de filas escritas por modelo.
+    """
+    fecha_fin = fecha_fin or timezone.localdate()
+    if fecha_inicio is None:
+        fecha_inicio = Factura.objects.aggregate(primera=Min('fecha_local'))['primera'] or fecha_fin
+
+    filas = {}
+    with transaction.atomic():
+        for modelo, campo, agregacion in RESUMENES:
+            filas[modelo._meta.verbose_name_plural] = _reemplazar(
+                modelo, campo, agregacion, fecha_inicio, fecha_fin
+            )
+        reconstruir_rankings(fecha_inicio, fecha_fin)
+        filas[BocetoDiario._meta.verbose_name_plural] = reconstruir_bocetos(fecha_inicio, fecha_fin)
+        incrementar_versiones([VersionDatos.VENTAS, VersionDatos.VENTAS_HISTORICAS])
+    return filas
+
+
+def actualizar_resumen_factura(factura, productos_extra=()):
+    """
+    Recalcula las filas del día de la factura para su vendedor, su cliente, su
+    hora y sus productos (más `productos_extra`, p. ej. el de un detalle
+    eliminado), los rankings de esos productos y los bocetos del día, e
+    incrementa la versión de ventas en la misma transacción.
+    """
+    fecha = factura.fecha_local
+    producto_ids = set(productos_extra)
+    producto_ids.update(
+        DetalleFactura.objects.filter(factura_id=factura.id).values_list('producto_id', flat=True)
+    )
+    claves = {
+        'producto_id': producto_ids,
+        'vendedor_id': {factura.vendedor_id},
+        'cliente_id': {factura.cliente_id} - {None},
+        'hora': {factura.hora_local},
+    }
+
+    with transaction.atomic():
+        for modelo, campo, agregacion in RESUMENES:
+            if claves[campo]:
+                _reemplazar(modelo, campo, agregacion, fecha, fecha, list(claves[campo]))
+        actualizar_rankings(fecha, producto_ids)
+        reconstruir_bocetos(fecha, fecha)
+        # Los reportes en caché que leen este día dejan de ser válidos
+        versiones = [VersionDatos.VENTAS]
+        if fecha < timezone.localdate():
+            versiones.append(VersionDatos.VENTAS_HISTORICAS)
+        incrementar_versiones(versiones)
+
+
+def programar_actualizacion(factura, productos_extra=()):
+    """
+    Programa la actualización de los resúmenes de la factura para cuando termine
+    la transacción en curso. Los guardados repetidos de la misma factura dentro
+    de la transacción (uno por detalle al facturar) se agrupan en una sola.
+    """
+    pendientes = getattr(factura, '_productos_resumen', None)
+    if pendientes is not None:
+        pendientes.update(productos_extra)
+        return
+
+    factura._productos_resumen = set(productos_extra)
+
+    def actualizar():
+        actualizar_resumen_factura(factura, factura.__dict__.pop('_productos_resumen', ()))
+
+    transaction.on_commit(actualizar)
@@ -0,0 +1,151 @@
+"""
+Rotación del inventario y productos sin movimiento (stock muerto).
+
+- Rotación = costo de ventas ÷ inventario promedio, y días de inventario =
+  días del periodo ÷ rotación. El costo de ventas sale del resumen diario por
+  producto (VentaDiariaProducto). El inventario promedio es el de las unidades
+  al inicio y al final del periodo, calculadas como stock_actual menos los
+  movimientos posteriores (vista MovimientoInventario, la misma del kardex) y
+  valoradas con el costo actual del producto (la regla de expresion_costo).
+- Productos sin movimiento: activos, con existencias y sin ventas en los
+  últimos N días. La fecha de la última venta se lee de la columna mantenida
+  EstadisticaProducto.ultima_venta (LEFT JOIN por clave primaria, uno a uno),
+  sin MAX() sobre DetalleFactura por producto.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from inventario.models import MovimientoInventario, Producto
+from inventario.precios import expresion_costo, expresion_valor_inventario
+from .models import VentaDiariaProducto
+
+DIAS_SIN_VENTA = 90
+
+_CERO = Decimal('0.00')
+
+
+def _inicio_del_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def _rotacion(costo_ventas, inventario_promedio, dias):
+    """(rotación, días de inventario); None cuando no se pueden calcular."""
+    rotacion = (costo_ventas / inventario_promedio).quantize(Decimal('0.01')) if inventario_promedio else None
+    dias_inventario = (
+        (dias * inventario_promedio / costo_ventas).quantize(Decimal('0.1')) if costo_ventas else None
+    )
+    return rotacion, dias_inventario
+
+
+def rotacion_por_producto(fecha_inicio, fecha_fin):
+    """
+    Genera una fila por producto activo con ventas o existencias en el periodo:
+    unidades vendidas, costo de ventas, unidades al inicio y al final,
+    inventario promedio (C$), rotación y días de inventario.
+    """
+    dias = (fecha_fin - fecha_inicio).days + 1
+    siguiente_dia = _inicio_del_dia(fecha_fin + timedelta(days=1))
+
+    movimientos = {
+        fila['producto_id']: (fila['desde_inicio'] or 0, fila['despues_fin'] or 0)
+        for fila in MovimientoInventario.objects.filter(
+            fecha__gte=_inicio_del_dia(fecha_inicio)
+        ).values('producto_id').annotate(
+            desde_inicio=Sum('cantidad'),
+            despues_fin=Sum('cantidad', filter=Q(fecha__gte=siguiente_dia)),
+        ).order_by()
+    }
+    ventas = {
+        fila['producto_id']: (fila['unidades'] or 0, fila['costo'] or _CERO)
+        for fila in VentaDiariaProducto.objects.filter(
+            fecha__gte=fecha_inicio, fecha__lte=fecha_fin
+        ).values('producto_id').annotate(
+            unidades=Sum('unidades'), costo=Sum('costo')
+        ).order_by()
+    }
+
+    productos = Producto.objects.filter(activo=True).values_list(
+        'id', 'codigo', 'nombre_producto__nombre', 'categoria__nombre', 'stock_actual'
+    ).annotate(costo=expresion_costo()).order_by('id')
+    for producto_id, codigo, nombre, categoria, stock_actual, costo in productos.iterator(chunk_size=2000):
+        desde_inicio, despues_fin = movimientos.get(producto_id, (0, 0))
+        unidades_inicio = max(stock_actual - desde_inicio, 0)
+        unidades_fin = max(stock_actual - despues_fin, 0)
+        unidades_vendidas, costo_ventas = ventas.get(producto_id, (0, _CERO))
+        inventario_promedio = (
+            Decimal(unidades_inicio + unidades_fin) / 2 * (costo or _CERO)
+        ).quantize(Decimal('0.01'))
+        if not inventario_promedio and not costo_ventas:
+            continue
+        rotacion, dias_inventario = _rotacion(costo_ventas, inventario_promedio, dias)
+        yield {
+            'producto_id': producto_id,
+            'codigo': codigo,
+            'nombre': nombre,
+            'categoria': categoria,
+            'unidades_vendidas': unidades_vendidas,
+            'costo_ventas': costo_ventas,
+            'unidades_inicio': unidades_inicio,
+            'unidades_fin': unidades_fin,
+            'inventario_promedio': inventario_promedio,
+            'rotacion': rotacion,
+            'dias_inventario': dias_inventario,
+        }
+
+
+def resumen_rotacion(fecha_inicio, fecha_fin, lentos=50):
+    """
+    Rotación total y por categoría, y los `lentos` productos con ventas que más
+    días de inventario tienen.
+    """
+    dias = (fecha_fin - fecha_inicio).days + 1
+    filas = list(rotacion_por_producto(fecha_inicio, fecha_fin))
+
+    categorias = {}
+    for fila in filas:
+        categoria = categorias.setdefault(
+            fila['categoria'], {'categoria': fila['categoria'], 'costo_ventas': _CERO, 'inventario_promedio': _CERO}
+        )
+        categoria['costo_ventas'] += fila['costo_ventas']
+        categoria['inventario_promedio'] += fila['inventario_promedio']
+    por_categoria = sorted(categorias.values(), key=lambda categoria: -categoria['inventario_promedio'])
+    for categoria in por_categoria:
+        categoria['rotacion'], categoria['dias_inventario'] = _rotacion(
+            categoria['costo_ventas'], categoria['inventario_promedio'], dias
+        )
+
+    costo_ventas = sum((fila['costo_ventas'] for fila in filas), _CERO)
+    inventario_promedio = sum((fila['inventario_promedio'] for fila in filas), _CERO)
+    rotacion, dias_inventario = _rotacion(costo_ventas, inventario_promedio, dias)
+    con_ventas = [fila for fila in filas if fila['costo_ventas'] and fila['inventario_promedio']]
+    con_ventas.sort(key=lambda fila: (-fila['dias_inventario'], fila['producto_id']))
+
+    return {
+        'dias': dias,
+        'costo_ventas': costo_ventas,
+        'inventario_promedio': inventario_promedio,
+        'rotacion': rotacion,
+        'dias_inventario': dias_inventario,
+        'por_categoria': por_categoria,
+        'lentos': con_ventas[:lentos],
+    }
+
+
+def productos_sin_movimiento(dias=DIAS_SIN_VENTA):
+    """
+    Productos activos con existencias que no se venden desde hace `dias` días o
+    nunca se vendieron (sin contar los creados dentro de ese plazo), del mayor
+    valor inmovilizado al menor. Anota ultima_venta y valor.
+    """
+    limite = timezone.now() - timedelta(days=dias)
+    return Producto.objects.filter(
+        activo=True, stock_actual__gt=0, fecha_creacion__lt=limite
+    ).filter(
+        Q(estadisticas__ultima_venta__lt=limite) | Q(estadisticas__ultima_venta__isnull=True)
+    ).annotate(
+        ultima_venta=F('estadisticas__ultima_venta'),
+        valor=expresion_valor_inventario()
+    ).order_by('-valor', 'id')
@@ -0,0 +1,155 @@
+"""
+Serie de ventas para el gráfico del reporte de ventas por rango.
+
+El navegador no recibe un punto por día: la serie se agrupa en el servidor,
+desde el resumen diario por vendedor (VentaDiariaVendedor), con la resolución
+más fina cuyo número de periodos cabe en el presupuesto de puntos (día, luego
+semana desde el lunes, luego mes). Si aun así sobran puntos (rangos de décadas
+o una resolución pedida explícitamente), la serie se reduce con LTTB
+(Largest-Triangle-Three-Buckets): se conservan el primer y el último punto y,
+de cada tramo intermedio, el que forma el triángulo de mayor área con el punto
+elegido antes y el promedio del tramo siguiente, lo que mantiene los picos y
+valles que un promedio borraría.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import VentaDiariaVendedor
+
+RESOLUCIONES = [
+    ('dia', 'Día'),
+    ('semana', 'Semana'),
+    ('mes', 'Mes'),
+]
+
+MAX_PUNTOS = 500
+MIN_PUNTOS = 3
+
+
+def inicio_periodo(fecha, resolucion):
+    """Primer día del periodo (día, semana desde el lunes o mes) que contiene `fecha`."""
+    if resolucion == 'semana':
+        return fecha - timedelta(days=fecha.weekday())
+    if resolucion == 'mes':
+        return fecha.replace(day=1)
+    return fecha
+
+
+def _periodo_siguiente(periodo, resolucion):
+    if resolucion == 'semana':
+        return periodo + timedelta(weeks=1)
+    if resolucion == 'mes':
+        return (periodo.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return periodo + timedelta(days=1)
+
+
+def periodos(fecha_inicio, fecha_fin, resolucion):
+    """Inicios de todos los periodos que tocan el rango, en orden."""
+    resultado = []
+    periodo = inicio_periodo(fecha_inicio, resolucion)
+    while periodo <= fecha_fin:
+        resultado.append(periodo)
+        periodo = _periodo_siguiente(periodo, resolucion)
+    return resultado
+
+
+def cantidad_periodos(fecha_inicio, fecha_fin, resolucion):
+    """Cantidad de periodos del rango sin generarlos."""
+    if resolucion == 'semana':
+        return (inicio_periodo(fecha_fin, 'semana') - inicio_periodo(fecha_inicio, 'semana')).days // 7 + 1
+    if resolucion == 'mes':
+        return (fecha_fin.year - fecha_inicio.year) * 12 + fecha_fin.month - fecha_inicio.month + 1
+    return (fecha_fin - fecha_inicio).days + 1
+
+
+def elegir_resolucion(fecha_inicio, fecha_fin, max_puntos=MAX_PUNTOS):
+    """La resolución más fina cuyos periodos caben en `max_puntos` (mes si ninguna cabe)."""
+    for resolucion, _ in RESOLUCIONES:
+        if cantidad_periodos(fecha_inicio, fecha_fin, resolucion) <= max_puntos:
+            return resolucion
+    return RESOLUCIONES[-1][0]
+
+
+def lttb(x, y, umbral):
+    """
+    Índices (ordenados) de los `umbral` puntos de la serie (x, y) que conserva
+    LTTB. Devuelve todos los índices si la serie ya cabe en el umbral.
+    """
+    n = len(x)
+    if umbral >= n or umbral < MIN_PUNTOS:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Tramos intermedios [limites[i], limites[i + 1]); el primer y el último
+    # punto quedan fuera y se conservan siempre
+    limites = (np.arange(umbral - 1) * ((n - 2) / (umbral - 2))).astype(np.int64) + 1
+    limites[-1] = n - 1
+
+    indices = np.empty(umbral, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    anterior = 0
+    for i in range(umbral - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        siguiente_fin = limites[i + 2] if i + 2 < len(limites) else n
+        promedio_x = x[fin:siguiente_fin].mean()
+        promedio_y = y[fin:siguiente_fin].mean()
+
+        areas = np.abs(
+            (x[anterior] - promedio_x) * (y[inicio:fin] - y[anterior])
+            - (x[anterior] - x[inicio:fin]) * (promedio_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    return indices
+
+
+def serie_ventas(fecha_inicio, fecha_fin, vendedor_id=None, resolucion=None,
+                 max_puntos=MAX_PUNTOS, reducir=True):
+    """
+    Ventas (C$) y facturas por periodo del rango, con los periodos sin ventas en
+    cero. Sin `resolucion` se elige según el largo del rango; con `reducir`, la
+    serie se reduce con LTTB a lo sumo a `max_puntos` puntos. Los totales son
+    los de todo el rango, no los de los puntos enviados.
+    """
+    resolucion = resolucion or elegir_resolucion(fecha_inicio, fecha_fin, max_puntos)
+
+    resumenes = VentaDiariaVendedor.objects.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+    if vendedor_id:
+        resumenes = resumenes.filter(vendedor_id=vendedor_id)
+    agrupar = {'dia': F('fecha'), 'semana': TruncWeek('fecha'), 'mes': TruncMonth('fecha')}[resolucion]
+    valores = {
+        periodo: (total, facturas)
+        for periodo, total, facturas in resumenes.values(
+            periodo=agrupar
+        ).annotate(
+            total=Sum('total'), facturas=Sum('facturas')
+        ).values_list('periodo', 'total', 'facturas').order_by()
+    }
+
+    fechas = periodos(fecha_inicio, fecha_fin, resolucion)
+    totales = np.array([float(valores.get(periodo, (0, 0))[0] or 0) for periodo in fechas])
+    facturas = np.array([valores.get(periodo, (0, 0))[1] or 0 for periodo in fechas], dtype=np.int64)
+
+    indices = np.arange(len(fechas))
+    if reducir:
+        indices = lttb([periodo.toordinal() for periodo in fechas], totales, max_puntos)
+
+    return {
+        'fecha_inicio': fecha_inicio.isoformat(),
+        'fecha_fin': fecha_fin.isoformat(),
+        'resolucion': resolucion,
+        'periodos': len(fechas),
+        'reducida': len(indices) < len(fechas),
+        'fechas': [fechas[i].isoformat() for i in indices],
+        'totales': [round(float(totales[i]), 2) for i in indices],
+        'facturas': [int(facturas[i]) for i in indices],
+        'total': round(float(totales.sum()), 2),
+        'total_facturas': int(facturas.sum()),
+        'maximo': round(float(totales.max()), 2) if len(totales) else 0.0,
+    }
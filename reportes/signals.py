@@ -0,0 +1,83 @@
+"""
+Signals para el módulo de reportes.
+Mantiene los resúmenes diarios de ventas al facturar, anular o eliminar ventas,
+el resumen mensual de compras por proveedor y la versión de los datos de
+inventario que usa la caché de reportes.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from inventario.models import Categoria, Producto, EntradaCompra, DetalleEntradaCompra, AjusteInventario
+from ventas.models import Factura, DetalleFactura
+from .cache import programar_incremento
+from .compras import programar_actualizacion as programar_actualizacion_compras
+from .models import VersionDatos
+from .resumenes import programar_actualizacion
+
+
+@receiver(post_save, sender=Factura)
+def actualizar_resumenes_al_guardar_factura(sender, instance, created, **kwargs):
+    """
+    Signal que actualiza los resúmenes diarios cuando se guarda una factura.
+    Cada detalle nuevo recalcula los totales de la factura (y la guarda), por lo
+    que este signal cubre tanto la facturación como la anulación.
+    """
+    programar_actualizacion(instance)
+
+
+@receiver(post_delete, sender=Factura)
+def actualizar_resumenes_al_eliminar_factura(sender, instance, **kwargs):
+    """
+    Signal que actualiza los resúmenes diarios cuando se elimina una factura.
+    """
+    programar_actualizacion(instance)
+
+
+@receiver(post_delete, sender=DetalleFactura)
+def actualizar_resumenes_al_eliminar_detalle(sender, instance, **kwargs):
+    """
+    Signal que actualiza el resumen del producto de un detalle eliminado.
+    """
+    programar_actualizacion(instance.factura, [instance.producto_id])
+
+
+@receiver(post_save, sender=EntradaCompra)
+def actualizar_compras_al_guardar_entrada(sender, instance, **kwargs):
+    """
+    Signal que actualiza el resumen mensual de compras cuando se registra una
+    entrada o se confirma un borrador (los borradores no cuentan como compras).
+    """
+    if not instance.es_borrador():
+        programar_actualizacion_compras(instance)
+
+
+@receiver(post_save, sender=DetalleEntradaCompra)
+def actualizar_compras_al_guardar_detalle(sender, instance, **kwargs):
+    """
+    Signal que actualiza el resumen mensual del producto de un detalle de compra.
+    """
+    if not instance.entrada_compra.es_borrador():
+        programar_actualizacion_compras(instance.entrada_compra, [instance.producto_id])
+
+
+@receiver(post_delete, sender=DetalleEntradaCompra)
+def actualizar_compras_al_eliminar_detalle(sender, instance, **kwargs):
+    """
+    Signal que actualiza el resumen mensual del producto de un detalle eliminado
+    (también al eliminar la entrada completa).
+    """
+    programar_actualizacion_compras(instance.entrada_compra, [instance.producto_id])
+
+
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+@receiver(post_save, sender=DetalleEntradaCompra)
+@receiver(post_save, sender=AjusteInventario)
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def invalidar_reportes_inventario(sender, **kwargs):
+    """
+    Signal que invalida los reportes de inventario en caché cuando cambia un
+    producto (stock, costo, estado, categoría) o una categoría, o se registra
+    una compra o un ajuste.
+    """
+    programar_incremento(VersionDatos.INVENTARIO)
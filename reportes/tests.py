@@ -0,0 +1,50 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from inventario.models import Categoria, NombreProducto, Producto
+from .models import RankingProductos, VentaDiariaProducto
+from .rankings import actualizar_rankings, reconstruir_rankings
+
+
+class RankingSemanaEntreAniosTests(TestCase):
+    """La semana del 29/12/2025 al 04/01/2026 suma días de los dos años."""
+
+    def setUp(self):
+        categoria = Categoria.objects.create(nombre='Granos')
+        nombre = NombreProducto.objects.create(nombre='Arroz', categoria=categoria)
+        self.producto = Producto.objects.create(
+            codigo='A1', nombre_producto=nombre, categoria=categoria,
+            precio_venta=10, precio_compra=7, stock_actual=100, stock_minimo=0
+        )
+        for fecha, unidades in [(date(2025, 12, 29), 3), (date(2026, 1, 2), 2)]:
+            VentaDiariaProducto.objects.create(
+                fecha=fecha, producto=self.producto, unidades=unidades,
+                ingresos=Decimal(unidades * 10), lineas=1
+            )
+
+    def unidades_semana(self):
+        return RankingProductos.objects.get(
+            periodo='SEMANA', inicio=date(2025, 12, 29), producto=self.producto
+        ).unidades
+
+    def test_venta_en_el_anio_nuevo(self):
+        actualizar_rankings(date(2026, 1, 2), [self.producto.id])
+        self.assertEqual(self.unidades_semana(), 5)
+
+    def test_venta_en_el_anio_anterior(self):
+        actualizar_rankings(date(2025, 12, 29), [self.producto.id])
+        self.assertEqual(self.unidades_semana(), 5)
+
+    def test_igual_a_la_reconstruccion(self):
+        actualizar_rankings(date(2026, 1, 2), [self.producto.id])
+        incremental = set(RankingProductos.objects.values_list('periodo', 'inicio', 'unidades'))
+        RankingProductos.objects.all().delete()
+        reconstruir_rankings(date(2025, 12, 29), date(2026, 1, 4))
+        reconstruido = set(RankingProductos.objects.filter(
+            periodo__in=['SEMANA', 'MES', 'ANIO'], inicio__in=[date(2025, 12, 29), date(2026, 1, 1)]
+        ).values_list('periodo', 'inicio', 'unidades'))
+        self.assertEqual(
+            {fila for fila in incremental if fila[0] != 'DIA'}, reconstruido
+        )
@@ -0,0 +1,266 @@
+"""
+Reportes en segundo plano.
+
+Los reportes largos se registran como TrabajoReporte y los ejecuta el proceso
+`python manage.py procesar_trabajos_reportes`, separado de los workers web: una
+consulta anual nunca ocupa el worker que atiende la caja. Cada tipo de reporte
+procesa el rango por periodos, actualizando el progreso y revisando entre
+periodos si se pidió la cancelación. El resultado se guarda como JSON con la
+forma {'resumen': [...], 'tablas': [...]} para mostrarlo con una sola plantilla.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from .cache import obtener_versiones
+from .models import TrabajoReporte, VentaDiariaProducto, VentaDiariaVendedor, VersionDatos
+
+# Días que procesa cada paso antes de actualizar el progreso
+DIAS_POR_PERIODO = 31
+
+# Un trabajo en proceso desde hace más de esto se da por abandonado (el proceso
+# que lo ejecutaba se detuvo) y deja de bloquear las solicitudes iguales
+TIEMPO_MAXIMO_EJECUCION = timedelta(minutes=30)
+
+TIPOS = {}
+
+
+class TrabajoCancelado(Exception):
+    """Se lanza cuando el usuario cancela un trabajo en ejecución."""
+
+
+def tipo_trabajo(clave):
+    """Registra la función que calcula un tipo de TrabajoReporte."""
+    def registrar(funcion):
+        TIPOS[clave] = funcion
+        return funcion
+    return registrar
+
+
+class Progreso:
+    """Actualiza el progreso del trabajo y detecta la cancelación."""
+
+    def __init__(self, trabajo):
+        self.trabajo = trabajo
+
+    def avanzar(self, porcentaje):
+        cancelado = TrabajoReporte.objects.filter(
+            pk=self.trabajo.pk, cancelacion_solicitada=True
+        ).exists()
+        if cancelado:
+            raise TrabajoCancelado()
+        self.trabajo.progreso = min(int(porcentaje), 99)
+        TrabajoReporte.objects.filter(pk=self.trabajo.pk).update(progreso=self.trabajo.progreso)
+
+
+def periodos(fecha_inicio, fecha_fin, dias=DIAS_POR_PERIODO):
+    """Divide el rango [fecha_inicio, fecha_fin] en periodos consecutivos de `dias` días."""
+    resultado = []
+    inicio = fecha_inicio
+    while inicio <= fecha_fin:
+        fin = min(inicio + timedelta(days=dias - 1), fecha_fin)
+        resultado.append((inicio, fin))
+        inicio = fin + timedelta(days=1)
+    return resultado
+
+
+def _moneda(valor):
+    """Decimal serializable en JSON (texto con dos decimales)."""
+    return str(Decimal(valor or 0).quantize(Decimal('0.01')))
+
+
+@tipo_trabajo('VENTAS_RANGO')
+def ventas_rango(parametros, progreso):
+    """Totales, ventas por día y ranking de vendedores del rango."""
+    fecha_inicio = date.fromisoformat(parametros['fecha_inicio'])
+    fecha_fin = date.fromisoformat(parametros['fecha_fin'])
+
+    resumenes = VentaDiariaVendedor.objects.all()
+    if parametros.get('vendedor_id'):
+        resumenes = resumenes.filter(vendedor_id=parametros['vendedor_id'])
+
+    por_dia = []
+    vendedores = {}
+    lista_periodos = periodos(fecha_inicio, fecha_fin)
+    for numero, (inicio, fin) in enumerate(lista_periodos, start=1):
+        filas = resumenes.filter(fecha__gte=inicio, fecha__lte=fin)
+        por_dia.extend(
+            filas.values('fecha').annotate(
+                total=Sum('total'), facturas=Sum('facturas')
+            ).order_by('fecha')
+        )
+        for fila in filas.values(
+            'vendedor__username', 'vendedor__first_name', 'vendedor__last_name'
+        ).annotate(total=Sum('total'), facturas=Sum('facturas')).order_by():
+            nombre = (
+                f"{fila['vendedor__first_name']} {fila['vendedor__last_name']}".strip()
+                or fila['vendedor__username']
+            )
+            acumulado = vendedores.setdefault(nombre, [Decimal('0'), 0])
+            acumulado[0] += fila['total'] or 0
+            acumulado[1] += fila['facturas'] or 0
+        progreso.avanzar(numero * 100 / len(lista_periodos))
+
+    total = sum((Decimal(fila['total'] or 0) for fila in por_dia), Decimal('0'))
+    facturas = sum(fila['facturas'] or 0 for fila in por_dia)
+    ranking = sorted(vendedores.items(), key=lambda item: item[1][0], reverse=True)
+
+    return {
+        'resumen': [
+            ['Total de Ventas', f'C$ {_moneda(total)}'],
+            ['Cantidad de Facturas', facturas],
+            ['Promedio por Factura', f'C$ {_moneda(total / facturas if facturas else 0)}'],
+        ],
+        'tablas': [
+            {
+                'titulo': 'Vendedores',
+                'encabezados': ['Vendedor', 'Facturas', 'Total (C$)'],
+                'filas': [[nombre, datos[1], _moneda(datos[0])] for nombre, datos in ranking],
+            },
+            {
+                'titulo': 'Ventas por Día',
+                'encabezados': ['Fecha', 'Facturas', 'Total (C$)'],
+                'filas': [
+                    [fila['fecha'].strftime('%d/%m/%Y'), fila['facturas'], _moneda(fila['total'])]
+                    for fila in por_dia
+                ],
+            },
+        ],
+    }
+
+
+@tipo_trabajo('PRODUCTOS_MAS_VENDIDOS')
+def productos_mas_vendidos(parametros, progreso):
+    """Ranking completo de productos por unidades vendidas en el rango."""
+    fecha_inicio = date.fromisoformat(parametros['fecha_inicio'])
+    fecha_fin = date.fromisoformat(parametros['fecha_fin'])
+    limite = parametros.get('limite', 100)
+
+    productos = {}
+    lista_periodos = periodos(fecha_inicio, fecha_fin)
+    for numero, (inicio, fin) in enumerate(lista_periodos, start=1):
+        for producto_id, unidades, ingresos, lineas in VentaDiariaProducto.objects.filter(
+            fecha__gte=inicio, fecha__lte=fin
+        ).values('producto_id').annotate(
+            total_unidades=Sum('unidades'), total_ingresos=Sum('ingresos'), total_lineas=Sum('lineas')
+        ).values_list('producto_id', 'total_unidades', 'total_ingresos', 'total_lineas').order_by():
+            acumulado = productos.setdefault(producto_id, [0, Decimal('0'), 0])
+            acumulado[0] += unidades
+            acumulado[1] += ingresos
+            acumulado[2] += lineas
+        progreso.avanzar(numero * 100 / len(lista_periodos))
+
+    ranking = sorted(productos.items(), key=lambda item: (-item[1][0], item[0]))[:limite]
+
+    from inventario.models import Producto
+    nombres = {
+        producto.id: producto
+        for producto in Producto.objects.select_related(
+            'nombre_producto', 'categoria'
+        ).filter(id__in=[producto_id for producto_id, _ in ranking])
+    }
+
+    return {
+        'resumen': [
+            ['Productos Vendidos', len(productos)],
+            ['Unidades Vendidas', sum(datos[0] for datos in productos.values())],
+        ],
+        'tablas': [
+            {
+                'titulo': f'Top {limite} por Unidades',
+                'encabezados': ['Código', 'Producto', 'Categoría', 'Cantidad', 'Veces Vendido', 'Total (C$)'],
+                'filas': [
+                    [
+                        nombres[producto_id].codigo,
+                        nombres[producto_id].nombre,
+                        nombres[producto_id].categoria.nombre,
+                        datos[0],
+                        datos[2],
+                        _moneda(datos[1]),
+                    ]
+                    for producto_id, datos in ranking
+                ],
+            },
+        ],
+    }
+
+
+def liberar_abandonados():
+    """
+    Marca como fallidos los trabajos en proceso desde hace más de
+    TIEMPO_MAXIMO_EJECUCION. Retorna cuántos se liberaron.
+    """
+    return TrabajoReporte.objects.filter(
+        estado='EN_PROCESO', fecha_inicio__lt=timezone.now() - TIEMPO_MAXIMO_EJECUCION
+    ).update(
+        estado='FALLIDO',
+        error='Se superó el tiempo máximo de ejecución (el proceso que lo ejecutaba se detuvo).',
+        fecha_fin=timezone.now()
+    )
+
+
+def tomar_siguiente():
+    """
+    Reserva el trabajo pendiente más antiguo para este proceso y lo retorna
+    (None si no hay). La reserva es un UPDATE condicional, seguro con varios
+    procesos trabajando a la vez.
+    """
+    liberar_abandonados()
+    while True:
+        trabajo = TrabajoReporte.objects.filter(estado='PENDIENTE').order_by('fecha_creacion', 'id').first()
+        if trabajo is None:
+            return None
+        reservado = TrabajoReporte.objects.filter(pk=trabajo.pk, estado='PENDIENTE').update(
+            estado='EN_PROCESO', fecha_inicio=timezone.now()
+        )
+        if reservado:
+            trabajo.refresh_from_db()
+            return trabajo
+
+
+def ejecutar_trabajo(trabajo):
+    """Ejecuta un trabajo reservado y guarda su resultado, error o cancelación."""
+    try:
+        trabajo.resultado = TIPOS[trabajo.tipo](trabajo.parametros, Progreso(trabajo))
+        trabajo.estado = 'COMPLETADO'
+        trabajo.progreso = 100
+    except TrabajoCancelado:
+        trabajo.estado = 'CANCELADO'
+    except Exception as e:
+        trabajo.estado = 'FALLIDO'
+        trabajo.error = str(e)
+    trabajo.fecha_fin = timezone.now()
+    trabajo.save(update_fields=['resultado', 'estado', 'progreso', 'error', 'fecha_fin'])
+    return trabajo
+
+
+def solicitar_trabajo(tipo, parametros, usuario):
+    """
+    Registra un trabajo nuevo. Se reutiliza uno igual aún en curso (no
+    abandonado) o uno igual completado sobre fechas cerradas (anteriores a hoy)
+    si las ventas de días cerrados no cambiaron desde que se solicitó.
+    """
+    liberar_abandonados()
+    version, = obtener_versiones([VersionDatos.VENTAS_HISTORICAS])
+    existentes = TrabajoReporte.objects.filter(tipo=tipo, parametros=parametros, version_datos=version)
+    en_curso = existentes.filter(estado__in=['PENDIENTE', 'EN_PROCESO']).first()
+    if en_curso:
+        return en_curso
+    if parametros.get('fecha_fin', '') < timezone.localdate().isoformat():
+        completado = existentes.filter(estado='COMPLETADO').order_by('-fecha_fin').first()
+        if completado:
+            return completado
+    return TrabajoReporte.objects.create(
+        tipo=tipo, parametros=parametros, version_datos=version, usuario=usuario
+    )
+
+
+def cancelar_trabajo(trabajo):
+    """Cancela un trabajo pendiente o pide la cancelación de uno en ejecución."""
+    if TrabajoReporte.objects.filter(pk=trabajo.pk, estado='PENDIENTE').update(
+        estado='CANCELADO', fecha_fin=timezone.now()
+    ):
+        return
+    TrabajoReporte.objects.filter(pk=trabajo.pk, estado='EN_PROCESO').update(cancelacion_solicitada=True)
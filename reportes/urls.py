@@ -8,11 +8,29 @@ urlpatterns = [
     # Reportes de Ventas
     path('ventas-dia/', views.ventas_dia, name='ventas_dia'),
     path('ventas-rango/', views.ventas_rango, name='ventas_rango'),
+    path('ventas-rango/datos/', views.ventas_rango_datos, name='ventas_rango_datos'),
+    path('margenes/', views.margenes, name='margenes'),
+    path('comparacion/', views.comparacion_periodos, name='comparacion_periodos'),
+    path('mapa-calor/', views.mapa_calor, name='mapa_calor'),
+    path('mapa-calor/datos/', views.mapa_calor_datos, name='mapa_calor_datos'),
     # Reportes de Productos
     path('productos-por-agotarse/', views.productos_por_agotarse, name='productos_por_agotarse'),
     path('productos-mas-vendidos/', views.productos_mas_vendidos, name='productos_mas_vendidos'),
     path('valor-inventario/', views.valor_inventario, name='valor_inventario'),
+    path('clasificacion-abc/', views.clasificacion_abc, name='clasificacion_abc'),
+    path('kardex/', views.kardex, name='kardex'),
+    path('rotacion/', views.rotacion_inventario, name='rotacion_inventario'),
+    path('compras-proveedores/', views.compras_proveedores, name='compras_proveedores'),
     # Reportes de Clientes
     path('clientes-frecuentes/', views.clientes_frecuentes, name='clientes_frecuentes'),
+    path('segmentos-clientes/', views.segmentos_clientes, name='segmentos_clientes'),
+    path('canasta/', views.analisis_canasta, name='analisis_canasta'),
+    # Reportes en segundo plano
+    path('trabajos/', views.trabajos, name='trabajos'),
+    path('trabajos/nuevo/', views.crear_trabajo, name='crear_trabajo'),
+    path('trabajos/<int:trabajo_id>/', views.detalle_trabajo, name='detalle_trabajo'),
+    path('trabajos/<int:trabajo_id>/estado/', views.estado_trabajo, name='estado_trabajo'),
+    path('trabajos/<int:trabajo_id>/cancelar/', views.cancelar_trabajo, name='cancelar_trabajo'),
+    path('cache/', views.cache_reportes, name='cache_reportes'),
 ]
 
@@ -0,0 +1,88 @@
+"""
+Valoración del inventario.
+
+El valor se calcula con un solo aggregate en la base de datos usando la misma
+regla de costo que Producto.calcular_valor_inventario (costo_promedio si es mayor
+que cero, si no precio_compra). Cada noche se guarda una foto por categoría en
+ValoracionInventario para consultar la tendencia sin recorrer los productos.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from inventario.models import Producto
+from inventario.precios import expresion_valor_inventario
+from .cache import programar_incremento
+from .models import ValoracionInventario, VersionDatos
+
+
+def valor_total_inventario(productos=None):
+    """Valor total y cantidad de los productos del queryset (por defecto, los activos)."""
+    if productos is None:
+        productos = Producto.objects.filter(activo=True)
+    resultado = productos.aggregate(
+        valor_total=Sum(expresion_valor_inventario()),
+        cantidad=Count('id')
+    )
+    return resultado['valor_total'] or Decimal('0.00'), resultado['cantidad']
+
+
+def valor_por_categoria(productos=None):
+    """Valor del inventario agrupado por categoría, de mayor a menor."""
+    if productos is None:
+        productos = Producto.objects.filter(activo=True)
+    return productos.values(
+        'categoria_id', 'categoria__nombre'
+    ).annotate(
+        cantidad_productos=Count('id'),
+        unidades=Sum('stock_actual'),
+        valor_total=Sum(expresion_valor_inventario())
+    ).order_by('-valor_total')
+
+
+def registrar_valoracion(fecha=None):
+    """
+    Guarda la valoración por categoría de los productos activos para la fecha
+    indicada (por defecto, hoy). Si ya existía una foto de ese día, se reemplaza.
+    Retorna la lista de registros creados.
+    """
+    fecha = fecha or timezone.localdate()
+    registros = [
+        ValoracionInventario(
+            fecha=fecha,
+            categoria_id=fila['categoria_id'],
+            nombre_categoria=fila['categoria__nombre'],
+            cantidad_productos=fila['cantidad_productos'],
+            unidades=fila['unidades'] or 0,
+            valor_total=fila['valor_total'] or Decimal('0.00')
+        )
+        for fila in valor_por_categoria()
+    ]
+    with transaction.atomic():
+        ValoracionInventario.objects.filter(fecha=fecha).delete()
+        programar_incremento(VersionDatos.INVENTARIO)
+        return ValoracionInventario.objects.bulk_create(registros)
+
+
+def tendencia_mensual(meses=12):
+    """
+    Valor total del inventario al cierre de cada mes (última foto registrada
+    del mes), para los últimos `meses` meses con datos. Orden cronológico.
+    """
+    cierres = ValoracionInventario.objects.annotate(
+        mes=TruncMonth('fecha')
+    ).values('mes').annotate(
+        ultima_fecha=Max('fecha')
+    ).order_by('-mes').values_list('ultima_fecha', flat=True)[:meses]
+
+    return list(
+        ValoracionInventario.objects.filter(
+            fecha__in=list(cierres)
+        ).values('fecha').annotate(
+            cantidad_productos=Sum('cantidad_productos'),
+            valor_total=Sum('valor_total')
+        ).order_by('fecha')
+    )
@@ -1,7 +1,9 @@
 """
 Vistas para el módulo de reportes.
 """
-from django.shortcuts import render
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.db.models import Sum, Count, Q, F, Avg, Max, Min
 from django.db.models.functions import TruncDay, TruncMonth
@@ -9,10 +11,57 @@ from django.utils import timezone
 from datetime import date, timedelta
 from decimal import Decimal
 
-from ventas.models import Factura, DetalleFactura, Cliente
+from core.utils import paginar
+from ventas.models import Factura, Cliente, EstadisticaCliente
 from inventario.models import Producto, Categoria
 from usuarios.models import Usuario
-from .forms import RangoFechasForm, ReporteVentasForm
+from inventario.clasificacion import calcular_clasificacion, resumen_por_clase
+from inventario.kardex import kardex_completo, pagina_kardex
+from inventario.precios import expresion_costo, expresion_valor_inventario
+from .exportacion import formato_exportacion, respuesta_exportacion
+from .forms import (
+    RangoFechasForm, ReporteVentasForm, ComparacionPeriodosForm, KardexForm, RotacionInventarioForm,
+    ComprasProveedoresForm,
+)
+from .canasta import analisis_canasta as calcular_analisis_canasta
+from .comparacion import ANIO_ANTERIOR, PERIODO_ANTERIOR, comparar_periodos
+from .compras import costos_por_proveedor, gasto_por_mes, gasto_por_proveedor, inicio_de_mes, meses_atras
+from .mapa_calor import METRICAS as METRICAS_MAPA_CALOR, calcular_mapa_calor
+from .rankings import limites_periodo, periodo_exacto, ranking as ranking_periodo
+from .rotacion import DIAS_SIN_VENTA, productos_sin_movimiento, resumen_rotacion, rotacion_por_producto
+from .series import MAX_PUNTOS, MIN_PUNTOS, RESOLUCIONES, serie_ventas
+from .cache import resultado_en_cache, metricas, obtener_versiones
+from .models import (
+    VentaDiariaProducto, VentaDiariaVendedor, VentaDiariaCliente, CompraMensualProveedor, TrabajoReporte, VersionDatos,
+)
+from .trabajos import solicitar_trabajo, cancelar_trabajo as cancelar
+from .valoracion import valor_total_inventario, valor_por_categoria, tendencia_mensual
+
+
+# Reportes cuyos cálculos se guardan en caché (nombre usado en las métricas)
+REPORTES_EN_CACHE = [
+    'index', 'ventas_dia', 'ventas_rango', 'productos_por_agotarse',
+    'productos_mas_vendidos', 'valor_inventario', 'clientes_frecuentes', 'clasificacion_abc',
+    'margenes', 'comparacion_periodos', 'mapa_calor', 'analisis_canasta', 'rotacion_inventario',
+    'compras_proveedores',
+]
+
+ENCABEZADOS_FACTURAS = [
+    'Número', 'Fecha', 'Cliente', 'Vendedor', 'Subtotal (C$)', 'Descuento (C$)', 'Total (C$)'
+]
+
+
+def _exportar_facturas(formato, nombre_archivo, facturas):
+    """Exporta las facturas del queryset leyéndolas por bloques."""
+    filas = (
+        (numero, fecha_venta, cliente or cliente_nombre or 'Cliente General', vendedor, subtotal, descuento, total)
+        for numero, fecha_venta, cliente, cliente_nombre, vendedor, subtotal, descuento, total
+        in facturas.values_list(
+            'numero_factura', 'fecha_venta', 'cliente__nombre', 'cliente_nombre',
+            'vendedor__username', 'subtotal', 'descuento', 'total'
+        ).iterator(chunk_size=2000)
+    )
+    return respuesta_exportacion(formato, nombre_archivo, ENCABEZADOS_FACTURAS, filas)
 
 
 @login_required
@@ -20,46 +69,44 @@ def index(request):
     """
     Índice de reportes con resumen general.
     """
-    hoy = date.today()
-    mes_actual = hoy.replace(day=1)
+    hoy = timezone.localdate()
     
-    # Estadísticas del día
-    ventas_hoy = Factura.objects.filter(
-        fecha_venta__date=hoy,
-        estado='COMPLETADA'
-    )
-    total_ventas_hoy = ventas_hoy.aggregate(total=Sum('total'))['total'] or 0
-    cantidad_facturas_hoy = ventas_hoy.count()
+    def calcular():
+        mes_actual = hoy.replace(day=1)
+        
+        # Estadísticas del día (desde el resumen diario por vendedor)
+        ventas_hoy = VentaDiariaVendedor.objects.filter(
+            fecha=hoy
+        ).aggregate(total=Sum('total'), facturas=Sum('facturas'))
+        
+        # Estadísticas del mes
+        ventas_mes = VentaDiariaVendedor.objects.filter(
+            fecha__gte=mes_actual,
+            fecha__lte=hoy
+        ).aggregate(total=Sum('total'), facturas=Sum('facturas'))
+        
+        # Productos por agotarse
+        productos_por_agotarse = Producto.objects.filter(
+            activo=True,
+            por_agotarse=True
+        ).count()
+        
+        # Valor total del inventario
+        valor_inventario, _ = valor_total_inventario()
+        
+        return {
+            'total_ventas_hoy': ventas_hoy['total'] or 0,
+            'cantidad_facturas_hoy': ventas_hoy['facturas'] or 0,
+            'total_ventas_mes': ventas_mes['total'] or 0,
+            'cantidad_facturas_mes': ventas_mes['facturas'] or 0,
+            'productos_por_agotarse': productos_por_agotarse,
+            'valor_inventario': valor_inventario,
+        }
     
-    # Estadísticas del mes
-    ventas_mes = Factura.objects.filter(
-        fecha_venta__date__gte=mes_actual,
-        estado='COMPLETADA'
+    context = resultado_en_cache(
+        'index', {'hoy': hoy}, calcular,
+        datos=(VersionDatos.VENTAS, VersionDatos.INVENTARIO)
     )
-    total_ventas_mes = ventas_mes.aggregate(total=Sum('total'))['total'] or 0
-    cantidad_facturas_mes = ventas_mes.count()
-    
-    # Productos por agotarse
-    productos_por_agotarse = Producto.objects.filter(
-        activo=True,
-        stock_actual__lte=F('stock_minimo')
-    ).count()
-    
-    # Valor total del inventario
-    valor_inventario = Producto.objects.filter(
-        activo=True
-    ).aggregate(
-        total=Sum(F('stock_actual') * F('precio_compra'))
-    )['total'] or 0
-    
-    context = {
-        'total_ventas_hoy': total_ventas_hoy,
-        'cantidad_facturas_hoy': cantidad_facturas_hoy,
-        'total_ventas_mes': total_ventas_mes,
-        'cantidad_facturas_mes': cantidad_facturas_mes,
-        'productos_por_agotarse': productos_por_agotarse,
-        'valor_inventario': valor_inventario,
-    }
     
     return render(request, 'reportes/index.html', context)
 
@@ -69,41 +116,59 @@ def ventas_dia(request):
     """
     Reporte de ventas del día.
     """
-    fecha_seleccionada = request.GET.get('fecha', str(date.today()))
+    fecha_seleccionada = request.GET.get('fecha', str(timezone.localdate()))
     try:
         fecha = date.fromisoformat(fecha_seleccionada)
     except (ValueError, TypeError):
-        fecha = date.today()
+        fecha = timezone.localdate()
     
     facturas = Factura.objects.filter(
-        fecha_venta__date=fecha,
+        fecha_local=fecha,
         estado='COMPLETADA'
-    ).order_by('-fecha_venta')
+    )
     
-    total_ventas = facturas.aggregate(total=Sum('total'))['total'] or 0
-    cantidad_facturas = facturas.count()
-    promedio_venta = total_ventas / cantidad_facturas if cantidad_facturas > 0 else 0
+    formato = formato_exportacion(request)
+    if formato:
+        return _exportar_facturas(
+            formato, f'ventas_{fecha:%Y%m%d}', facturas.order_by('fecha_venta')
+        )
     
-    # Ventas por hora (simplificado para compatibilidad)
-    ventas_por_hora = []
-    horas_dict = {}
-    for factura in facturas:
-        hora = factura.fecha_venta.hour
-        if hora not in horas_dict:
-            horas_dict[hora] = {'total': 0, 'cantidad': 0}
-        horas_dict[hora]['total'] += float(factura.total)
-        horas_dict[hora]['cantidad'] += 1
+    def calcular():
+        resumen = VentaDiariaVendedor.objects.filter(
+            fecha=fecha
+        ).aggregate(total=Sum('total'), facturas=Sum('facturas'))
+        total_ventas = resumen['total'] or 0
+        cantidad_facturas = resumen['facturas'] or 0
+        
+        # Ventas por hora (agrupadas en la base de datos por la hora local guardada)
+        ventas_por_hora = facturas.values(
+            hora=F('hora_local')
+        ).annotate(
+            total=Sum('total'),
+            cantidad=Count('id')
+        ).order_by('hora')
+        
+        return {
+            'total_ventas': total_ventas,
+            'cantidad_facturas': cantidad_facturas,
+            'promedio_venta': total_ventas / cantidad_facturas if cantidad_facturas > 0 else 0,
+            'ventas_por_hora': list(ventas_por_hora),
+        }
     
-    ventas_por_hora = [{'hora': h, 'total': v['total'], 'cantidad': v['cantidad']} 
-                       for h, v in sorted(horas_dict.items())]
+    resumen = resultado_en_cache('ventas_dia', {'fecha': fecha}, calcular, fecha_fin=fecha)
+    
+    # Lista de facturas paginada
+    pagina, parametros = paginar(
+        request,
+        facturas.select_related('cliente', 'vendedor').order_by('-fecha_venta')
+    )
     
     context = {
         'fecha': fecha,
-        'facturas': facturas,
-        'total_ventas': total_ventas,
-        'cantidad_facturas': cantidad_facturas,
-        'promedio_venta': promedio_venta,
-        'ventas_por_hora': ventas_por_hora,
+        'facturas': pagina,
+        'pagina': pagina,
+        'parametros': parametros,
+        **resumen,
     }
     
     return render(request, 'reportes/ventas_dia.html', context)
@@ -122,84 +187,142 @@ def ventas_rango(request):
         vendedor_id = form.cleaned_data.get('vendedor')
         
         facturas = Factura.objects.filter(
-            fecha_venta__date__gte=fecha_inicio,
-            fecha_venta__date__lte=fecha_fin,
+            fecha_local__gte=fecha_inicio,
+            fecha_local__lte=fecha_fin,
             estado='COMPLETADA'
         )
+        resumenes = VentaDiariaVendedor.objects.filter(
+            fecha__gte=fecha_inicio,
+            fecha__lte=fecha_fin
+        )
         
         if vendedor_id:
             facturas = facturas.filter(vendedor_id=vendedor_id)
+            resumenes = resumenes.filter(vendedor_id=vendedor_id)
         
         facturas = facturas.order_by('-fecha_venta')
         
-        # Estadísticas
-        total_ventas = facturas.aggregate(total=Sum('total'))['total'] or 0
-        cantidad_facturas = facturas.count()
-        promedio_venta = total_ventas / cantidad_facturas if cantidad_facturas > 0 else 0
-        total_descuentos = facturas.aggregate(total=Sum('descuento'))['total'] or 0
-        
-        # Ventas por día (simplificado para compatibilidad)
-        ventas_por_dia = []
-        dias_dict = {}
-        for factura in facturas:
-            dia = factura.fecha_venta.date()
-            if dia not in dias_dict:
-                dias_dict[dia] = {'total': 0, 'cantidad': 0}
-            dias_dict[dia]['total'] += float(factura.total)
-            dias_dict[dia]['cantidad'] += 1
+        formato = formato_exportacion(request)
+        if formato:
+            return _exportar_facturas(
+                formato, f'ventas_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}', facturas.order_by('fecha_venta')
+            )
         
-        ventas_por_dia = [{'dia': d, 'total': v['total'], 'cantidad': v['cantidad']} 
-                          for d, v in sorted(dias_dict.items())]
-        
-        # Top vendedores
-        top_vendedores = facturas.values(
-            'vendedor__first_name',
-            'vendedor__last_name',
-            'vendedor__username'
-        ).annotate(
-            total=Sum('total'),
-            cantidad=Count('id')
-        ).order_by('-total')[:10]
+        def calcular():
+            # Estadísticas (desde el resumen diario por vendedor)
+            totales = resumenes.aggregate(
+                total=Sum('total'),
+                facturas=Sum('facturas'),
+                descuentos=Sum('descuento')
+            )
+            total_ventas = totales['total'] or 0
+            cantidad_facturas = totales['facturas'] or 0
+            
+            # Top vendedores
+            top_vendedores = resumenes.values(
+                'vendedor__first_name',
+                'vendedor__last_name',
+                'vendedor__username'
+            ).annotate(
+                total=Sum('total'),
+                cantidad=Sum('facturas')
+            ).order_by('-total')[:10]
+            
+            return {
+                'total_ventas': total_ventas,
+                'cantidad_facturas': cantidad_facturas,
+                'promedio_venta': total_ventas / cantidad_facturas if cantidad_facturas > 0 else 0,
+                'total_descuentos': totales['descuentos'] or 0,
+                'top_vendedores': list(top_vendedores),
+            }
         
         context = {
             'form': form,
             'fecha_inicio': fecha_inicio,
             'fecha_fin': fecha_fin,
             'facturas': facturas[:100],  # Limitar a 100 para no sobrecargar
-            'total_ventas': total_ventas,
-            'cantidad_facturas': cantidad_facturas,
-            'promedio_venta': promedio_venta,
-            'total_descuentos': total_descuentos,
-            'ventas_por_dia': ventas_por_dia,
-            'top_vendedores': top_vendedores,
+            **resultado_en_cache(
+                'ventas_rango',
+                {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin, 'vendedor': vendedor_id},
+                calcular, fecha_fin=fecha_fin
+            ),
         }
     else:
         # Valores por defecto
-        hoy = date.today()
+        hoy = timezone.localdate()
         fecha_inicio = hoy - timedelta(days=30)
         fecha_fin = hoy
         
         facturas = Factura.objects.filter(
-            fecha_venta__date__gte=fecha_inicio,
-            fecha_venta__date__lte=fecha_fin,
+            fecha_local__gte=fecha_inicio,
+            fecha_local__lte=fecha_fin,
             estado='COMPLETADA'
         ).order_by('-fecha_venta')
         
-        total_ventas = facturas.aggregate(total=Sum('total'))['total'] or 0
-        cantidad_facturas = facturas.count()
+        formato = formato_exportacion(request)
+        if formato:
+            return _exportar_facturas(
+                formato, f'ventas_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}', facturas.order_by('fecha_venta')
+            )
+        
+        totales = resultado_en_cache(
+            'ventas_rango',
+            {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin, 'resumen': True},
+            lambda: VentaDiariaVendedor.objects.filter(
+                fecha__gte=fecha_inicio,
+                fecha__lte=fecha_fin
+            ).aggregate(total=Sum('total'), facturas=Sum('facturas'))
+        )
         
         context = {
             'form': form,
             'fecha_inicio': fecha_inicio,
             'fecha_fin': fecha_fin,
             'facturas': facturas[:100],
-            'total_ventas': total_ventas,
-            'cantidad_facturas': cantidad_facturas,
+            'total_ventas': totales['total'] or 0,
+            'cantidad_facturas': totales['facturas'] or 0,
         }
     
     return render(request, 'reportes/ventas_rango.html', context)
 
 
+@login_required
+def ventas_rango_datos(request):
+    """
+    Serie de ventas del rango en JSON para el gráfico (mismos filtros que la
+    página): agrupada por día, semana o mes según el largo del rango (o la
+    `resolucion` pedida) y reducida con LTTB a lo sumo a `puntos` puntos
+    (`lttb=0` la envía completa).
+    """
+    form = ReporteVentasForm(request.GET or None)
+    if form.is_valid():
+        fecha_inicio = form.cleaned_data['fecha_inicio']
+        fecha_fin = form.cleaned_data['fecha_fin']
+        vendedor_id = form.cleaned_data.get('vendedor') or None
+    else:
+        fecha_fin = timezone.localdate()
+        fecha_inicio = fecha_fin - timedelta(days=30)
+        vendedor_id = None
+    
+    resolucion = request.GET.get('resolucion')
+    if resolucion not in dict(RESOLUCIONES):
+        resolucion = None
+    puntos = request.GET.get('puntos', '')
+    puntos = min(max(int(puntos), MIN_PUNTOS), MAX_PUNTOS) if puntos.isdigit() else MAX_PUNTOS
+    reducir = request.GET.get('lttb') != '0'
+    
+    resultado = resultado_en_cache(
+        'ventas_rango',
+        {
+            'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin, 'vendedor': vendedor_id,
+            'serie': resolucion, 'puntos': puntos, 'lttb': reducir,
+        },
+        lambda: serie_ventas(fecha_inicio, fecha_fin, vendedor_id, resolucion, puntos, reducir),
+        fecha_fin=fecha_fin
+    )
+    return JsonResponse(resultado)
+
+
 @login_required
 def productos_por_agotarse(request):
     """
@@ -207,18 +330,37 @@ def productos_por_agotarse(request):
     """
     productos = Producto.objects.filter(
         activo=True,
-        stock_actual__lte=F('stock_minimo')
+        por_agotarse=True
+    ).select_related(
+        'nombre_producto', 'categoria'
+    ).annotate(
+        valor=expresion_valor_inventario()
     ).order_by('stock_actual')
     
-    # Estadísticas
-    total_productos = productos.count()
-    valor_total = sum(p.calcular_valor_inventario() for p in productos)
+    formato = formato_exportacion(request)
+    if formato:
+        filas = productos.values_list(
+            'codigo', 'nombre_producto__nombre', 'categoria__nombre',
+            'stock_actual', 'stock_minimo', 'valor'
+        ).iterator(chunk_size=2000)
+        return respuesta_exportacion(
+            formato, 'productos_por_agotarse',
+            ['Código', 'Producto', 'Categoría', 'Stock Actual', 'Stock Mínimo', 'Valor (C$)'],
+            filas
+        )
     
-    context = {
-        'productos': productos,
-        'total_productos': total_productos,
-        'valor_total': valor_total,
-    }
+    def calcular():
+        # Estadísticas
+        valor_total, total_productos = valor_total_inventario(productos)
+        return {
+            'productos': list(productos),
+            'total_productos': total_productos,
+            'valor_total': valor_total,
+        }
+    
+    context = resultado_en_cache(
+        'productos_por_agotarse', {}, calcular, datos=(VersionDatos.INVENTARIO,)
+    )
     
     return render(request, 'reportes/productos_por_agotarse.html', context)
 
@@ -234,31 +376,65 @@ def productos_mas_vendidos(request):
         fecha_inicio = form.cleaned_data['fecha_inicio']
         fecha_fin = form.cleaned_data['fecha_fin']
     else:
-        hoy = date.today()
+        hoy = timezone.localdate()
         fecha_inicio = hoy - timedelta(days=30)
         fecha_fin = hoy
     
     # Productos más vendidos en el rango de fechas
-    productos_vendidos = DetalleFactura.objects.filter(
-        factura__fecha_venta__date__gte=fecha_inicio,
-        factura__fecha_venta__date__lte=fecha_fin,
-        factura__estado='COMPLETADA'
+    ranking = VentaDiariaProducto.objects.filter(
+        fecha__gte=fecha_inicio,
+        fecha__lte=fecha_fin
     ).values(
         'producto__id',
-        'producto__nombre',
+        'producto__nombre_producto__nombre',
         'producto__codigo',
         'producto__categoria__nombre'
     ).annotate(
-        cantidad_vendida=Sum('cantidad'),
-        total_ventas=Sum('subtotal'),
-        veces_vendido=Count('id')
-    ).order_by('-cantidad_vendida')[:20]
+        cantidad_vendida=Sum('unidades'),
+        total_ventas=Sum('ingresos'),
+        veces_vendido=Sum('lineas')
+    ).order_by('-cantidad_vendida', 'producto__id')
+    
+    formato = formato_exportacion(request)
+    if formato:
+        filas = ranking.values_list(
+            'producto__codigo', 'producto__nombre_producto__nombre', 'producto__categoria__nombre',
+            'cantidad_vendida', 'veces_vendido', 'total_ventas'
+        ).iterator(chunk_size=2000)
+        return respuesta_exportacion(
+            formato, f'productos_mas_vendidos_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}',
+            ['Código', 'Producto', 'Categoría', 'Cantidad Vendida', 'Veces Vendido', 'Total Ventas (C$)'],
+            filas
+        )
+    
+    # Un día, semana, mes o año completo se lee del ranking mantenido al facturar;
+    # cualquier otro rango se agrupa desde los resúmenes diarios
+    periodo = periodo_exacto(fecha_inicio, fecha_fin)
+    if periodo:
+        productos_vendidos = ranking_periodo(periodo, fecha_inicio)
+    else:
+        productos_vendidos = resultado_en_cache(
+            'productos_mas_vendidos',
+            {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin},
+            lambda: list(ranking[:20]),
+            fecha_fin=fecha_fin
+        )
+    
+    hoy = timezone.localdate()
+    atajos = [
+        (nombre, *limites_periodo(clave, hoy))
+        for clave, nombre in [('DIA', 'Hoy'), ('SEMANA', 'Esta semana'), ('MES', 'Este mes'), ('ANIO', 'Este año')]
+    ]
     
     context = {
         'form': form,
         'fecha_inicio': fecha_inicio,
         'fecha_fin': fecha_fin,
         'productos_vendidos': productos_vendidos,
+        'atajos': [
+            (nombre, f'fecha_inicio={inicio:%Y-%m-%d}&fecha_fin={fin:%Y-%m-%d}')
+            for nombre, inicio, fin in atajos
+        ],
     }
     
     return render(request, 'reportes/productos_mas_vendidos.html', context)
@@ -269,32 +445,45 @@ def valor_inventario(request):
     """
     Reporte de valor de inventario.
     """
-    # Por categoría
-    valor_por_categoria = Producto.objects.filter(
-        activo=True
-    ).values(
-        'categoria__nombre'
-    ).annotate(
-        cantidad_productos=Count('id'),
-        valor_total=Sum(F('stock_actual') * F('precio_compra'))
-    ).order_by('-valor_total')
-    
-    # Total general
     productos = Producto.objects.filter(activo=True)
-    valor_total = sum(p.calcular_valor_inventario() for p in productos)
-    cantidad_total = productos.count()
-    
-    # Productos de mayor valor
-    productos_valor = productos.annotate(
-        valor=F('stock_actual') * F('precio_compra')
-    ).order_by('-valor')[:20]
+
+    formato = formato_exportacion(request)
+    if formato:
+        filas = productos.annotate(
+            costo=expresion_costo(),
+            valor=expresion_valor_inventario()
+        ).order_by('-valor', 'id').values_list(
+            'codigo', 'nombre_producto__nombre', 'categoria__nombre', 'stock_actual', 'costo', 'valor'
+        ).iterator(chunk_size=2000)
+        return respuesta_exportacion(
+            formato, f'valor_inventario_{timezone.localdate():%Y%m%d}',
+            ['Código', 'Producto', 'Categoría', 'Stock', 'Costo Unitario (C$)', 'Valor Total (C$)'],
+            filas
+        )
+
+    def calcular():
+        # Por categoría y total general (misma regla de costo en ambos)
+        valor_categorias = valor_por_categoria(productos)
+        valor_total, cantidad_total = valor_total_inventario(productos)
+        
+        # Productos de mayor valor
+        productos_valor = productos.select_related(
+            'nombre_producto'
+        ).annotate(
+            costo=expresion_costo(),
+            valor=expresion_valor_inventario()
+        ).order_by('-valor')[:20]
+        
+        return {
+            'valor_por_categoria': list(valor_categorias),
+            'valor_total': valor_total,
+            'cantidad_total': cantidad_total,
+            'productos_valor': list(productos_valor),
+            # Tendencia a partir de las valoraciones nocturnas
+            'tendencia': list(tendencia_mensual()),
+        }
     
-    context = {
-        'valor_por_categoria': valor_por_categoria,
-        'valor_total': valor_total,
-        'cantidad_total': cantidad_total,
-        'productos_valor': productos_valor,
-    }
+    context = resultado_en_cache('valor_inventario', {}, calcular, datos=(VersionDatos.INVENTARIO,))
     
     return render(request, 'reportes/valor_inventario.html', context)
 
@@ -310,25 +499,60 @@ def clientes_frecuentes(request):
         fecha_inicio = form.cleaned_data['fecha_inicio']
         fecha_fin = form.cleaned_data['fecha_fin']
     else:
-        hoy = date.today()
+        hoy = timezone.localdate()
         fecha_inicio = hoy - timedelta(days=30)
         fecha_fin = hoy
     
     # Clientes más frecuentes
-    clientes_frecuentes = Factura.objects.filter(
-        fecha_venta__date__gte=fecha_inicio,
-        fecha_venta__date__lte=fecha_fin,
-        estado='COMPLETADA',
-        cliente__isnull=False
+    ranking = VentaDiariaCliente.objects.filter(
+        fecha__gte=fecha_inicio,
+        fecha__lte=fecha_fin
     ).values(
         'cliente__id',
         'cliente__nombre',
         'cliente__tipo_cliente'
     ).annotate(
         total_compras=Sum('total'),
-        cantidad_facturas=Count('id'),
-        promedio_compra=Avg('total')
-    ).order_by('-total_compras')[:20]
+        cantidad_facturas=Sum('facturas')
+    ).order_by('-total_compras', 'cliente__id')
+    
+    formato = formato_exportacion(request)
+    if formato:
+        tipos = dict(Cliente.TIPO_CLIENTE_CHOICES)
+        filas = (
+            (nombre, tipos.get(tipo, tipo), facturas, total, (total / facturas).quantize(Decimal('0.01')))
+            for nombre, tipo, facturas, total in ranking.values_list(
+                'cliente__nombre', 'cliente__tipo_cliente', 'cantidad_facturas', 'total_compras'
+            ).iterator(chunk_size=2000)
+        )
+        return respuesta_exportacion(
+            formato, f'clientes_frecuentes_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}',
+            ['Cliente', 'Tipo', 'Cantidad Facturas', 'Total Compras (C$)', 'Promedio por Compra (C$)'],
+            filas
+        )
+    
+    def calcular():
+        clientes = list(ranking[:20])
+        for cliente in clientes:
+            cliente['promedio_compra'] = cliente['total_compras'] / cliente['cantidad_facturas']
+        return clientes
+    
+    clientes_frecuentes = resultado_en_cache(
+        'clientes_frecuentes',
+        {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin},
+        calcular,
+        fecha_fin=fecha_fin
+    )
+    
+    # El segmento cambia con la segmentación nocturna, por eso no va en la caché
+    segmentos = dict(EstadisticaCliente.SEGMENTO_CHOICES)
+    segmento_por_cliente = dict(
+        EstadisticaCliente.objects.filter(
+            cliente_id__in=[cliente['cliente__id'] for cliente in clientes_frecuentes]
+        ).values_list('cliente_id', 'segmento')
+    )
+    for cliente in clientes_frecuentes:
+        cliente['segmento'] = segmentos[segmento_por_cliente.get(cliente['cliente__id'], 'SIN_CLASIFICAR')]
     
     context = {
         'form': form,
@@ -339,3 +563,777 @@ def clientes_frecuentes(request):
     
     return render(request, 'reportes/clientes_frecuentes.html', context)
 
+
+@login_required
+def segmentos_clientes(request):
+    """
+    Segmentación RFM de los clientes: resumen por segmento y lista de clientes
+    filtrada por segmento o grupo (para campañas), desde EstadisticaCliente.
+    """
+    segmentos = dict(EstadisticaCliente.SEGMENTO_CHOICES)
+    segmento = request.GET.get('segmento', '')
+    if segmento not in segmentos:
+        segmento = ''
+    grupo = request.GET.get('grupo', '')
+    grupo = int(grupo) if grupo.isdigit() else None
+
+    estadisticas = EstadisticaCliente.objects.all()
+    if segmento:
+        estadisticas = estadisticas.filter(segmento=segmento)
+    if grupo:
+        estadisticas = estadisticas.filter(grupo=grupo)
+    estadisticas = estadisticas.order_by('-total_compras', 'cliente_id')
+
+    formato = formato_exportacion(request)
+    if formato:
+        filas = (
+            (
+                nombre, telefono, email, segmentos.get(seg, seg), f'{r}{f}{m}' if r else '',
+                numero_grupo, ultima, facturas, total
+            )
+            for nombre, telefono, email, seg, r, f, m, numero_grupo, ultima, facturas, total in estadisticas.values_list(
+                'cliente__nombre', 'cliente__telefono', 'cliente__email', 'segmento',
+                'puntaje_recencia', 'puntaje_frecuencia', 'puntaje_monto', 'grupo',
+                'ultima_compra', 'cantidad_facturas', 'total_compras'
+            ).iterator(chunk_size=2000)
+        )
+        return respuesta_exportacion(
+            formato, f"clientes_{(segmento or 'todos').lower()}",
+            ['Cliente', 'Teléfono', 'Correo', 'Segmento', 'RFM', 'Grupo', 'Última Compra',
+             'Facturas', 'Total Compras (C$)'],
+            filas
+        )
+
+    resumen = [
+        {**fila, 'nombre': segmentos[fila['segmento']]}
+        for fila in EstadisticaCliente.objects.values('segmento').annotate(
+            clientes=Count('cliente'), total=Sum('total_compras')
+        ).order_by('-total')
+    ]
+    grupos = EstadisticaCliente.objects.filter(grupo__isnull=False).values('grupo').annotate(
+        clientes=Count('cliente'),
+        total=Sum('total_compras'),
+        promedio_facturas=Avg('cantidad_facturas')
+    ).order_by('grupo')
+
+    pagina, parametros = paginar(request, estadisticas.select_related('cliente'))
+
+    context = {
+        'segmento': segmento,
+        'grupo': grupo,
+        'segmentos': EstadisticaCliente.SEGMENTO_CHOICES,
+        'resumen': resumen,
+        'grupos': grupos,
+        'ultima_segmentacion': EstadisticaCliente.objects.aggregate(
+            fecha=Max('fecha_calculo')
+        )['fecha'],
+        'clientes': pagina,
+        'pagina': pagina,
+        'parametros': parametros,
+    }
+
+    return render(request, 'reportes/segmentos_clientes.html', context)
+
+
+def _filas_clasificacion(resultado, criterio):
+    """
+    Filas de la clasificación ordenadas de mayor a menor según el criterio:
+    (producto_id, clase por ingresos, clase por unidades, ingresos, unidades, % acumulado).
+    """
+    orden = (-resultado[criterio]).argsort(kind='stable')
+    for i in orden:
+        yield (
+            int(resultado['producto_id'][i]),
+            str(resultado['clase_ingresos'][i]),
+            str(resultado['clase_unidades'][i]),
+            Decimal(resultado['ingresos'][i]).quantize(Decimal('0.01')),
+            int(resultado['unidades'][i]),
+            round(float(resultado[f'acumulado_{criterio}'][i]) * 100, 2),
+        )
+
+
+@login_required
+def clasificacion_abc(request):
+    """
+    Reporte de clasificación ABC (Pareto) por ingresos o por unidades vendidas.
+    """
+    try:
+        dias_historial = max(int(request.GET.get('dias_historial', 90)), 1)
+    except (ValueError, TypeError):
+        dias_historial = 90
+    criterio = request.GET.get('criterio', 'ingresos')
+    if criterio not in ('ingresos', 'unidades'):
+        criterio = 'ingresos'
+    
+    formato = formato_exportacion(request)
+    if formato:
+        resultado = calcular_clasificacion(dias_historial=dias_historial)
+        productos = {
+            producto_id: (codigo, nombre, categoria)
+            for producto_id, codigo, nombre, categoria in Producto.objects.filter(
+                activo=True
+            ).values_list(
+                'id', 'codigo', 'nombre_producto__nombre', 'categoria__nombre'
+            ).iterator(chunk_size=2000)
+        }
+        filas = (
+            (*productos[producto_id], *datos)
+            for producto_id, *datos in _filas_clasificacion(resultado, criterio)
+        )
+        return respuesta_exportacion(
+            formato, f'clasificacion_abc_{criterio}_{resultado["fecha_fin"]:%Y%m%d}',
+            ['Código', 'Producto', 'Categoría', 'Clase (Ingresos)', 'Clase (Unidades)',
+             'Ingresos (C$)', 'Unidades', '% Acumulado'],
+            filas
+        )
+    
+    def calcular():
+        resultado = calcular_clasificacion(dias_historial=dias_historial)
+        principales = list(_filas_clasificacion(resultado, criterio))[:50]
+        productos = Producto.objects.select_related(
+            'nombre_producto', 'categoria'
+        ).in_bulk([fila[0] for fila in principales])
+        return {
+            'fecha_inicio': resultado['fecha_inicio'],
+            'fecha_fin': resultado['fecha_fin'],
+            'resumen_ingresos': resumen_por_clase(resultado, 'ingresos'),
+            'resumen_unidades': resumen_por_clase(resultado, 'unidades'),
+            'productos': [
+                {
+                    'producto': productos[producto_id],
+                    'clase_ingresos': clase_ingresos,
+                    'clase_unidades': clase_unidades,
+                    'ingresos': ingresos,
+                    'unidades': unidades,
+                    'acumulado': acumulado,
+                }
+                for producto_id, clase_ingresos, clase_unidades, ingresos, unidades, acumulado in principales
+            ],
+        }
+    
+    context = {
+        'dias_historial': dias_historial,
+        'criterio': criterio,
+        **resultado_en_cache(
+            'clasificacion_abc',
+            {'dias_historial': dias_historial, 'criterio': criterio, 'hoy': timezone.localdate()},
+            calcular,
+            datos=(VersionDatos.VENTAS, VersionDatos.INVENTARIO)
+        ),
+    }
+    
+    return render(request, 'reportes/clasificacion_abc.html', context)
+
+
+@login_required
+def kardex(request):
+    """
+    Kardex de un producto: cada movimiento de stock con el saldo y el costo
+    promedio acumulados, paginado por cursor (parámetro 'despues').
+    """
+    form = KardexForm(request.GET or None)
+    producto = None
+    if form.is_valid():
+        producto = Producto.objects.select_related('nombre_producto').filter(
+            codigo=form.cleaned_data['codigo']
+        ).first()
+        if producto is None:
+            form.add_error('codigo', 'No existe un producto con ese código.')
+    
+    context = {
+        'form': form,
+        'producto': producto,
+    }
+    if producto is None:
+        return render(request, 'reportes/kardex.html', context)
+    
+    fecha_inicio = form.cleaned_data['fecha_inicio']
+    fecha_fin = form.cleaned_data['fecha_fin']
+    
+    formato = formato_exportacion(request)
+    if formato:
+        filas = (
+            (
+                movimiento.fecha, movimiento.get_tipo_display(), movimiento.referencia,
+                max(movimiento.cantidad, 0), max(-movimiento.cantidad, 0), movimiento.saldo,
+                movimiento.costo_unitario, movimiento.costo_promedio, movimiento.valor_saldo,
+            )
+            for movimiento in kardex_completo(producto, fecha_inicio, fecha_fin)
+        )
+        return respuesta_exportacion(
+            formato, f'kardex_{producto.codigo}',
+            ['Fecha', 'Tipo', 'Referencia', 'Entrada', 'Salida', 'Saldo',
+             'Costo Unitario (C$)', 'Costo Promedio (C$)', 'Valor del Saldo (C$)'],
+            filas
+        )
+    
+    movimientos, saldo_inicial, siguiente = pagina_kardex(
+        producto, fecha_inicio, fecha_fin, request.GET.get('despues')
+    )
+    
+    parametros = request.GET.copy()
+    parametros.pop('despues', None)
+    
+    context.update({
+        'movimientos': movimientos,
+        'saldo_inicial': saldo_inicial,
+        'primera_pagina': saldo_inicial is not None,
+        'siguiente': siguiente,
+        'parametros': parametros.urlencode(),
+    })
+    
+    return render(request, 'reportes/kardex.html', context)
+
+
+@login_required
+def rotacion_inventario(request):
+    """
+    Rotación del inventario (costo de ventas ÷ inventario promedio y días de
+    inventario) del periodo, y lista de productos sin ventas en los últimos N días.
+    Con lista=sin_movimiento se exporta la lista de productos sin movimiento.
+    """
+    form = RotacionInventarioForm(request.GET or None)
+    if form.is_valid():
+        fecha_inicio = form.cleaned_data['fecha_inicio']
+        fecha_fin = form.cleaned_data['fecha_fin']
+        dias_sin_venta = form.cleaned_data['dias_sin_venta']
+    else:
+        fecha_fin = timezone.localdate()
+        fecha_inicio = fecha_fin - timedelta(days=89)
+        dias_sin_venta = DIAS_SIN_VENTA
+    
+    sin_movimiento = productos_sin_movimiento(dias_sin_venta)
+    
+    formato = formato_exportacion(request)
+    if formato and request.GET.get('lista') == 'sin_movimiento':
+        filas = sin_movimiento.values_list(
+            'codigo', 'nombre_producto__nombre', 'categoria__nombre',
+            'stock_actual', 'valor', 'ultima_venta'
+        ).iterator(chunk_size=2000)
+        return respuesta_exportacion(
+            formato, f'productos_sin_movimiento_{dias_sin_venta}_dias',
+            ['Código', 'Producto', 'Categoría', 'Stock Actual', 'Valor (C$)', 'Última Venta'],
+            filas
+        )
+    if formato:
+        filas = (
+            (
+                fila['codigo'], fila['nombre'], fila['categoria'], fila['unidades_vendidas'],
+                fila['costo_ventas'], fila['unidades_inicio'], fila['unidades_fin'],
+                fila['inventario_promedio'], fila['rotacion'], fila['dias_inventario'],
+            )
+            for fila in rotacion_por_producto(fecha_inicio, fecha_fin)
+        )
+        return respuesta_exportacion(
+            formato, f'rotacion_inventario_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}',
+            ['Código', 'Producto', 'Categoría', 'Unidades Vendidas', 'Costo de Ventas (C$)',
+             'Unidades al Inicio', 'Unidades al Final', 'Inventario Promedio (C$)',
+             'Rotación', 'Días de Inventario'],
+            filas
+        )
+    
+    pagina, parametros = paginar(request, sin_movimiento.select_related('nombre_producto', 'categoria'))
+    
+    context = {
+        'form': form,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'dias_sin_venta': dias_sin_venta,
+        **resultado_en_cache(
+            'rotacion_inventario',
+            {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin},
+            lambda: resumen_rotacion(fecha_inicio, fecha_fin),
+            datos=(VersionDatos.VENTAS, VersionDatos.INVENTARIO),
+            fecha_fin=fecha_fin
+        ),
+        'resumen_sin_movimiento': sin_movimiento.aggregate(
+            cantidad=Count('id'), valor_total=Sum('valor')
+        ),
+        'sin_movimiento': pagina,
+        'pagina': pagina,
+        'parametros': parametros,
+    }
+    
+    return render(request, 'reportes/rotacion_inventario.html', context)
+
+
+@login_required
+def compras_proveedores(request):
+    """
+    Compras por proveedor: gasto por proveedor y por mes y, con el código de un
+    producto, su costo unitario con cada proveedor mes a mes. Lee el resumen
+    mensual de compras (meses completos del rango).
+    """
+    form = ComprasProveedoresForm(request.GET or None)
+    producto = None
+    if form.is_valid():
+        fecha_inicio = form.cleaned_data['fecha_inicio']
+        fecha_fin = form.cleaned_data['fecha_fin']
+        if form.cleaned_data['codigo']:
+            producto = Producto.objects.select_related('nombre_producto').filter(
+                codigo=form.cleaned_data['codigo']
+            ).first()
+            if producto is None:
+                form.add_error('codigo', 'No existe un producto con ese código.')
+    else:
+        fecha_fin = timezone.localdate()
+        fecha_inicio = meses_atras(fecha_fin, 11)
+    mes_inicio = inicio_de_mes(fecha_inicio)
+    mes_fin = inicio_de_mes(fecha_fin)
+    
+    formato = formato_exportacion(request)
+    if formato:
+        compras = CompraMensualProveedor.objects.filter(mes__gte=mes_inicio, mes__lte=mes_fin)
+        if producto:
+            compras = compras.filter(producto=producto)
+        filas = (
+            (
+                f'{mes:%Y-%m}', proveedor, codigo, nombre, unidades, total,
+                (total / unidades).quantize(Decimal('0.01')) if unidades else None, minimo, maximo
+            )
+            for mes, proveedor, codigo, nombre, unidades, total, minimo, maximo in compras.values_list(
+                'mes', 'proveedor__nombre', 'producto__codigo', 'producto__nombre_producto__nombre',
+                'unidades', 'total', 'costo_minimo', 'costo_maximo'
+            ).order_by('mes', 'proveedor__nombre', 'producto__codigo').iterator(chunk_size=2000)
+        )
+        return respuesta_exportacion(
+            formato, f'compras_proveedores_{mes_inicio:%Y%m}_{mes_fin:%Y%m}',
+            ['Mes', 'Proveedor', 'Código', 'Producto', 'Unidades', 'Total (C$)',
+             'Costo Promedio (C$)', 'Costo Mínimo (C$)', 'Costo Máximo (C$)'],
+            filas
+        )
+    
+    def calcular():
+        por_proveedor = list(gasto_por_proveedor(mes_inicio, mes_fin))
+        return {
+            'total_compras': sum((fila['total'] for fila in por_proveedor), Decimal('0.00')),
+            'por_proveedor': por_proveedor,
+            'por_mes': list(gasto_por_mes(mes_inicio, mes_fin)),
+            'costos': costos_por_proveedor(producto.id, mes_inicio, mes_fin) if producto else [],
+        }
+    
+    context = {
+        'form': form,
+        'producto': producto,
+        'mes_inicio': mes_inicio,
+        'mes_fin': mes_fin,
+        **resultado_en_cache(
+            'compras_proveedores',
+            {'mes_inicio': mes_inicio, 'mes_fin': mes_fin, 'producto': producto.id if producto else None},
+            calcular,
+            datos=(VersionDatos.INVENTARIO,)
+        ),
+    }
+    
+    return render(request, 'reportes/compras_proveedores.html', context)
+
+
+def _margen(ingresos, costo):
+    """Ganancia y margen (% sobre los ingresos)."""
+    ingresos = ingresos or Decimal('0')
+    ganancia = ingresos - (costo or 0)
+    margen = (ganancia * 100 / ingresos).quantize(Decimal('0.01')) if ingresos else Decimal('0')
+    return ganancia, margen
+
+
+def _agregar_margen(filas, campo_ingresos):
+    """Agrega 'ganancia' y 'margen' a cada fila agregada."""
+    filas = list(filas)
+    for fila in filas:
+        fila['ganancia'], fila['margen'] = _margen(fila[campo_ingresos], fila['costo_total'])
+    return filas
+
+
+@login_required
+def margenes(request):
+    """
+    Reporte de ganancia bruta por día, vendedor, categoría y producto.
+    Usa el costo guardado en cada venta, sumado en los resúmenes diarios.
+    """
+    form = RangoFechasForm(request.GET or None)
+    
+    if form.is_valid():
+        fecha_inicio = form.cleaned_data['fecha_inicio']
+        fecha_fin = form.cleaned_data['fecha_fin']
+    else:
+        hoy = timezone.localdate()
+        fecha_inicio = hoy - timedelta(days=30)
+        fecha_fin = hoy
+    
+    por_vendedor_dia = VentaDiariaVendedor.objects.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+    por_producto_dia = VentaDiariaProducto.objects.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+    
+    ranking = por_producto_dia.values(
+        'producto__id',
+        'producto__codigo',
+        'producto__nombre_producto__nombre',
+        'producto__categoria__nombre'
+    ).annotate(
+        ingresos_total=Sum('ingresos'),
+        costo_total=Sum('costo'),
+        unidades_total=Sum('unidades'),
+        ganancia_total=Sum('ingresos') - Sum('costo')
+    ).order_by('-ganancia_total', 'producto__id')
+    
+    formato = formato_exportacion(request)
+    if formato:
+        filas = (
+            (codigo, nombre, categoria, unidades, ingresos, costo, *_margen(ingresos, costo))
+            for codigo, nombre, categoria, unidades, ingresos, costo in ranking.values_list(
+                'producto__codigo', 'producto__nombre_producto__nombre', 'producto__categoria__nombre',
+                'unidades_total', 'ingresos_total', 'costo_total'
+            ).iterator(chunk_size=2000)
+        )
+        return respuesta_exportacion(
+            formato, f'margenes_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}',
+            ['Código', 'Producto', 'Categoría', 'Unidades', 'Ingresos (C$)', 'Costo (C$)',
+             'Ganancia (C$)', 'Margen (%)'],
+            filas
+        )
+    
+    def calcular():
+        totales = por_vendedor_dia.aggregate(total_ventas=Sum('total'), costo_total=Sum('costo'))
+        ganancia, margen = _margen(totales['total_ventas'], totales['costo_total'])
+        
+        por_dia = por_vendedor_dia.values(dia=F('fecha')).annotate(
+            total_ventas=Sum('total'), costo_total=Sum('costo')
+        ).order_by('dia')
+        
+        por_vendedor = por_vendedor_dia.values(
+            'vendedor__first_name', 'vendedor__last_name', 'vendedor__username'
+        ).annotate(
+            total_ventas=Sum('total'), costo_total=Sum('costo'), ganancia_total=Sum('total') - Sum('costo')
+        ).order_by('-ganancia_total')
+        
+        por_categoria = por_producto_dia.values(
+            categoria=F('producto__categoria__nombre')
+        ).annotate(
+            ingresos_total=Sum('ingresos'), costo_total=Sum('costo'), ganancia_total=Sum('ingresos') - Sum('costo')
+        ).order_by('-ganancia_total')
+        
+        return {
+            'total_ventas': totales['total_ventas'] or 0,
+            'total_costo': totales['costo_total'] or 0,
+            'ganancia': ganancia,
+            'margen': margen,
+            'por_dia': _agregar_margen(por_dia, 'total_ventas'),
+            'por_vendedor': _agregar_margen(por_vendedor, 'total_ventas'),
+            'por_categoria': _agregar_margen(por_categoria, 'ingresos_total'),
+            'por_producto': _agregar_margen(ranking[:20], 'ingresos_total'),
+        }
+    
+    context = {
+        'form': form,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        **resultado_en_cache(
+            'margenes', {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin}, calcular, fecha_fin=fecha_fin
+        ),
+    }
+    
+    return render(request, 'reportes/margenes.html', context)
+
+
+@login_required
+def comparacion_periodos(request):
+    """
+    Reporte comparativo de dos periodos (p. ej. esta semana contra la anterior o
+    este mes contra el mismo mes del año anterior), por categoría y por vendedor.
+    """
+    form = ComparacionPeriodosForm(request.GET or None)
+    hoy = timezone.localdate()
+    
+    if form.is_valid():
+        fecha_inicio = form.cleaned_data['fecha_inicio']
+        fecha_fin = form.cleaned_data['fecha_fin']
+        comparar_con = form.cleaned_data['comparar_con']
+    else:
+        fecha_inicio = hoy - timedelta(days=hoy.weekday())
+        fecha_fin = hoy
+        comparar_con = PERIODO_ANTERIOR
+    
+    resultado = resultado_en_cache(
+        'comparacion_periodos',
+        {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin, 'comparar_con': comparar_con},
+        lambda: comparar_periodos(fecha_inicio, fecha_fin, comparar_con),
+        # Agrupa por la categoría actual de cada producto
+        datos=(VersionDatos.VENTAS, VersionDatos.INVENTARIO),
+        fecha_fin=fecha_fin
+    )
+    
+    formato = formato_exportacion(request)
+    if formato:
+        metricas_por_dimension = [
+            ('Categoría', resultado['categorias'],
+             [('ventas', 'Ventas (C$)'), ('unidades', 'Unidades'), ('lineas', 'Líneas Vendidas')]),
+            ('Vendedor', resultado['vendedores'],
+             [('ventas', 'Ventas (C$)'), ('tickets', 'Tickets'), ('ticket_promedio', 'Ticket Promedio (C$)')]),
+        ]
+        filas = (
+            (dimension, fila['nombre'], etiqueta, fila[metrica]['actual'], fila[metrica]['anterior'],
+             fila[metrica]['diferencia'], fila[metrica]['variacion'])
+            for dimension, filas_dimension, metricas_dimension in metricas_por_dimension
+            for fila in filas_dimension
+            for metrica, etiqueta in metricas_dimension
+        )
+        return respuesta_exportacion(
+            formato, f'comparacion_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}',
+            ['Dimensión', 'Nombre', 'Métrica',
+             f'{fecha_inicio:%d/%m/%Y} - {fecha_fin:%d/%m/%Y}',
+             f"{resultado['inicio_anterior']:%d/%m/%Y} - {resultado['fin_anterior']:%d/%m/%Y}",
+             'Diferencia', 'Variación (%)'],
+            filas
+        )
+    
+    inicio_semana = hoy - timedelta(days=hoy.weekday())
+    inicio_mes = hoy.replace(day=1)
+    fin_mes_anterior = inicio_mes - timedelta(days=1)
+    atajos = [
+        ('Esta semana vs. la anterior', inicio_semana, hoy, PERIODO_ANTERIOR),
+        ('Este mes vs. el anterior', inicio_mes, hoy, PERIODO_ANTERIOR),
+        ('Este mes vs. el mismo mes del año anterior', inicio_mes, hoy, ANIO_ANTERIOR),
+        ('Mes pasado vs. el mismo mes del año anterior', fin_mes_anterior.replace(day=1), fin_mes_anterior, ANIO_ANTERIOR),
+    ]
+    
+    context = {
+        'form': form,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'atajos': [
+            (nombre, f'fecha_inicio={inicio:%Y-%m-%d}&fecha_fin={fin:%Y-%m-%d}&comparar_con={comparacion}')
+            for nombre, inicio, fin, comparacion in atajos
+        ],
+        **resultado,
+    }
+    
+    return render(request, 'reportes/comparacion_periodos.html', context)
+
+
+def _mapa_calor_en_cache(request):
+    """Lee los filtros del mapa de calor y retorna (form, categorías, resultado desde la caché)."""
+    form = RangoFechasForm(request.GET or None)
+    if form.is_valid():
+        fecha_inicio = form.cleaned_data['fecha_inicio']
+        fecha_fin = form.cleaned_data['fecha_fin']
+    else:
+        fecha_fin = timezone.localdate()
+        fecha_inicio = fecha_fin - timedelta(weeks=12) + timedelta(days=1)
+    
+    metrica = request.GET.get('metrica')
+    if metrica not in dict(METRICAS_MAPA_CALOR):
+        metrica = 'ventas'
+    categorias = Categoria.objects.order_by('nombre')
+    categoria = request.GET.get('categoria', '')
+    categoria_id = int(categoria) if categoria.isdigit() else None
+    
+    resultado = resultado_en_cache(
+        'mapa_calor',
+        {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin, 'metrica': metrica, 'categoria_id': categoria_id},
+        lambda: calcular_mapa_calor(fecha_inicio, fecha_fin, metrica, categoria_id),
+        fecha_fin=fecha_fin
+    )
+    return form, categorias, resultado
+
+
+@login_required
+def mapa_calor(request):
+    """
+    Mapa de calor de ventas por día de la semana y hora (promedio por día),
+    para planificar los turnos de caja. Se calcula desde los resúmenes por hora.
+    """
+    form, categorias, resultado = _mapa_calor_en_cache(request)
+    
+    formato = formato_exportacion(request)
+    if formato:
+        return respuesta_exportacion(
+            formato, f"mapa_calor_{resultado['metrica']}_{resultado['fecha_inicio']}_{resultado['fecha_fin']}",
+            ['Día', *[f'{hora:02d}:00' for hora in resultado['horas']]],
+            ([dia, *valores] for dia, valores in zip(resultado['dias'], resultado['promedio_por_dia']))
+        )
+    
+    maximo = resultado['maximo'] or 1
+    filas = [
+        (dia, [(valor, round(valor / maximo, 2)) for valor in valores])
+        for dia, valores in zip(resultado['dias'], resultado['promedio_por_dia'])
+    ]
+    
+    context = {
+        'form': form,
+        'categorias': categorias,
+        'metricas': METRICAS_MAPA_CALOR,
+        'metrica': resultado['metrica'],
+        'categoria_id': resultado['categoria_id'],
+        'horas': resultado['horas'],
+        'filas': filas,
+        'resultado': resultado,
+    }
+    
+    return render(request, 'reportes/mapa_calor.html', context)
+
+
+@login_required
+def mapa_calor_datos(request):
+    """
+    Mapa de calor en JSON (mismos filtros que la página): matriz 7 × horas con
+    el promedio por día de la métrica.
+    """
+    _, _, resultado = _mapa_calor_en_cache(request)
+    return JsonResponse(resultado)
+
+
+@login_required
+def analisis_canasta(request):
+    """
+    Clientes distintos, productos distintos y tamaño de ticket (mediana, p90,
+    p99) por mes, estimados combinando los bocetos diarios, con su margen de error.
+    """
+    form = RangoFechasForm(request.GET or None)
+    if form.is_valid():
+        fecha_inicio = form.cleaned_data['fecha_inicio']
+        fecha_fin = form.cleaned_data['fecha_fin']
+    else:
+        fecha_fin = timezone.localdate()
+        fecha_inicio = fecha_fin.replace(month=1, day=1)
+    
+    resultado = resultado_en_cache(
+        'analisis_canasta',
+        {'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin},
+        lambda: calcular_analisis_canasta(fecha_inicio, fecha_fin),
+        fecha_fin=fecha_fin
+    )
+    
+    formato = formato_exportacion(request)
+    if formato:
+        filas = (
+            (
+                f"{mes['mes']:%Y-%m}", mes['facturas'],
+                mes['clientes']['estimado'], mes['clientes']['margen'],
+                mes['productos']['estimado'], mes['productos']['margen'],
+                mes['ticket']['p50'], mes['ticket']['p90'], mes['ticket']['p99'],
+                mes['unidades']['p50'], mes['unidades']['p90'],
+            )
+            for mes in resultado['meses']
+        )
+        return respuesta_exportacion(
+            formato, f'analisis_canasta_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}',
+            [
+                'Mes', 'Facturas', 'Clientes Distintos (aprox.)', 'Margen Clientes (±)',
+                'Productos Distintos (aprox.)', 'Margen Productos (±)', 'Ticket Mediana (C$)',
+                'Ticket p90 (C$)', 'Ticket p99 (C$)', 'Unidades por Ticket Mediana', 'Unidades por Ticket p90',
+            ],
+            filas
+        )
+    
+    context = {
+        'form': form,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        **resultado,
+    }
+    
+    return render(request, 'reportes/analisis_canasta.html', context)
+
+
+@login_required
+def trabajos(request):
+    """
+    Lista de reportes solicitados en segundo plano.
+    """
+    trabajos_reportes = TrabajoReporte.objects.select_related('usuario').defer('resultado')
+    pagina, parametros = paginar(request, trabajos_reportes, 20)
+    
+    context = {
+        'trabajos': pagina,
+        'pagina': pagina,
+        'parametros': parametros,
+    }
+    
+    return render(request, 'reportes/trabajos.html', context)
+
+
+@login_required
+def crear_trabajo(request):
+    """
+    Solicita un reporte en segundo plano con las fechas del formulario del reporte.
+    """
+    if request.method != 'POST':
+        return redirect('reportes:trabajos')
+    
+    tipo = request.POST.get('tipo')
+    form = ReporteVentasForm(request.POST)
+    if tipo not in dict(TrabajoReporte.TIPO_CHOICES) or not form.is_valid():
+        messages.error(request, 'Los parámetros del reporte no son válidos.')
+        return redirect('reportes:trabajos')
+    
+    parametros = {
+        'fecha_inicio': form.cleaned_data['fecha_inicio'].isoformat(),
+        'fecha_fin': form.cleaned_data['fecha_fin'].isoformat(),
+    }
+    if tipo == 'VENTAS_RANGO' and form.cleaned_data.get('vendedor'):
+        parametros['vendedor_id'] = int(form.cleaned_data['vendedor'])
+    
+    trabajo = solicitar_trabajo(tipo, parametros, request.user)
+    return redirect('reportes:detalle_trabajo', trabajo_id=trabajo.id)
+
+
+@login_required
+def detalle_trabajo(request, trabajo_id):
+    """
+    Progreso de un trabajo y, al terminar, su resultado guardado.
+    """
+    trabajo = get_object_or_404(TrabajoReporte.objects.select_related('usuario'), id=trabajo_id)
+    
+    context = {
+        'trabajo': trabajo,
+    }
+    
+    return render(request, 'reportes/trabajo_detalle.html', context)
+
+
+@login_required
+def estado_trabajo(request, trabajo_id):
+    """
+    Estado y progreso del trabajo en JSON (consultado periódicamente por la página de detalle).
+    """
+    trabajo = get_object_or_404(
+        TrabajoReporte.objects.only('estado', 'progreso', 'cancelacion_solicitada'), id=trabajo_id
+    )
+    return JsonResponse({
+        'estado': trabajo.estado,
+        'estado_display': trabajo.get_estado_display(),
+        'progreso': trabajo.progreso,
+        'activo': trabajo.esta_activo(),
+        'cancelacion_solicitada': trabajo.cancelacion_solicitada,
+    })
+
+
+@login_required
+def cancelar_trabajo(request, trabajo_id):
+    """
+    Cancela un trabajo pendiente o en ejecución.
+    """
+    trabajo = get_object_or_404(TrabajoReporte, id=trabajo_id)
+    if request.method == 'POST':
+        if trabajo.esta_activo():
+            cancelar(trabajo)
+            messages.success(request, 'Se solicitó la cancelación del reporte.')
+        else:
+            messages.warning(request, 'El reporte ya terminó.')
+    return redirect('reportes:detalle_trabajo', trabajo_id=trabajo.id)
+
+
+@login_required
+def cache_reportes(request):
+    """
+    Aciertos y fallos de la caché de reportes y versiones actuales de los datos.
+    """
+    claves = [clave for clave, _ in VersionDatos.CLAVE_CHOICES]
+    
+    context = {
+        'metricas': metricas(REPORTES_EN_CACHE),
+        'versiones': zip(
+            [nombre for _, nombre in VersionDatos.CLAVE_CHOICES], obtener_versiones(claves)
+        ),
+    }
+    
+    return render(request, 'reportes/cache.html', context)
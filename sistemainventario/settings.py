@@ -141,6 +141,9 @@ STATICFILES_DIRS = [
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Exportación columnar de hechos de venta para análisis (exportar_hechos_ventas)
+HECHOS_VENTAS_DIR = config('HECHOS_VENTAS_DIR', default=str(BASE_DIR / 'datos' / 'hechos_ventas'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
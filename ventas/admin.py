@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Cliente, Factura, DetalleFactura
+from .models import Cliente, Factura, DetalleFactura, EstadisticaCliente
 
 
 @admin.register(Cliente)
@@ -13,8 +13,8 @@ class ClienteAdmin(admin.ModelAdmin):
 class DetalleFacturaInline(admin.TabularInline):
     model = DetalleFactura
     extra = 1
-    fields = ['producto', 'cantidad', 'precio_unitario', 'subtotal']
-    readonly_fields = ['subtotal']
+    fields = ['producto', 'cantidad', 'precio_unitario', 'subtotal', 'costo_unitario']
+    readonly_fields = ['subtotal', 'costo_unitario']
     autocomplete_fields = ['producto']
 
 
@@ -23,7 +23,7 @@ class FacturaAdmin(admin.ModelAdmin):
     list_display = ['numero_factura', 'cliente_display', 'vendedor', 'fecha_venta', 'total', 'estado']
     list_filter = ['estado', 'fecha_venta', 'vendedor']
     search_fields = ['numero_factura', 'cliente__nombre', 'cliente_nombre']
-    readonly_fields = ['fecha_creacion', 'fecha_actualizacion', 'subtotal', 'total']
+    readonly_fields = ['fecha_creacion', 'fecha_actualizacion', 'subtotal', 'total', 'costo_total']
     inlines = [DetalleFacturaInline]
     autocomplete_fields = ['cliente']
     
@@ -39,8 +39,17 @@ class FacturaAdmin(admin.ModelAdmin):
 
 @admin.register(DetalleFactura)
 class DetalleFacturaAdmin(admin.ModelAdmin):
-    list_display = ['factura', 'producto', 'cantidad', 'precio_unitario', 'subtotal']
+    list_display = ['factura', 'producto', 'cantidad', 'precio_unitario', 'subtotal', 'costo_unitario']
     list_filter = ['factura__fecha_venta']
     search_fields = ['factura__numero_factura', 'producto__nombre', 'producto__codigo']
-    readonly_fields = ['subtotal']
+    readonly_fields = ['subtotal', 'costo_unitario']
 
+
+
+@admin.register(EstadisticaCliente)
+class EstadisticaClienteAdmin(admin.ModelAdmin):
+    list_display = ['cliente', 'segmento', 'puntaje_rfm', 'grupo', 'cantidad_facturas', 'total_compras', 'ultima_compra']
+    list_filter = ['segmento', 'grupo']
+    search_fields = ['cliente__nombre']
+    list_select_related = ['cliente']
+    readonly_fields = [campo.name for campo in EstadisticaCliente._meta.fields]
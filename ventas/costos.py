@@ -0,0 +1,119 @@
+"""
+Costo de lo vendido.
+
+Cada DetalleFactura guarda el costo unitario del producto al momento de la
+venta (ver DetalleFactura.save) y la factura su costo total, de modo que la
+ganancia se obtiene sumando columnas, sin recalcular costos históricos.
+
+Para las ventas registradas antes de existir estas columnas, el costo se
+reconstruye como el costo promedio ponderado de las compras registradas hasta
+la fecha de la venta (la misma fórmula de Producto.actualizar_costo_promedio).
+Si el producto no tenía compras a esa fecha se usa su costo actual.
+"""
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from inventario.models import Producto, DetalleEntradaCompra
+from .models import Factura, DetalleFactura
+
+CENTAVO = Decimal('0.01')
+
+
+def historial_costos(producto_ids):
+    """
+    Costo promedio ponderado acumulado de cada producto después de cada fecha
+    de compra: {producto_id: ([fechas], [costos])}, en orden cronológico.
+    """
+    compras = DetalleEntradaCompra.objects.filter(
+        producto_id__in=producto_ids
+    ).exclude(
+        entrada_compra__estado='BORRADOR'
+    ).values_list(
+        'producto_id', 'entrada_compra__fecha_compra', 'cantidad', 'precio_unitario'
+    ).order_by('producto_id', 'entrada_compra__fecha_compra', 'id')
+
+    historial = {}
+    acumulado = {}
+    for producto_id, fecha, cantidad, precio in compras.iterator(chunk_size=5000):
+        cantidad_total, valor_total = acumulado.get(producto_id, (0, Decimal('0')))
+        cantidad_total += cantidad
+        valor_total += cantidad * precio
+        acumulado[producto_id] = (cantidad_total, valor_total)
+        if cantidad_total <= 0:
+            continue
+
+        fechas, costos = historial.setdefault(producto_id, ([], []))
+        costo = (valor_total / cantidad_total).quantize(CENTAVO)
+        if fechas and fechas[-1] == fecha:
+            costos[-1] = costo
+        else:
+            fechas.append(fecha)
+            costos.append(costo)
+    return historial
+
+
+def _costo_a_la_fecha(historial, costo_actual, producto_id, fecha):
+    fechas, costos = historial.get(producto_id, ((), ()))
+    posicion = bisect_right(fechas, fecha)
+    return costos[posicion - 1] if posicion else costo_actual[producto_id]
+
+
+def registrar_costos_faltantes(lote=2000):
+    """
+    Completa costo_unitario en los detalles que no lo tienen y recalcula el
+    costo total de sus facturas. Retorna (detalles actualizados, fecha mínima,
+    fecha máxima) de las ventas afectadas.
+    """
+    pendientes = DetalleFactura.objects.filter(costo_unitario=0)
+    producto_ids = list(pendientes.values_list('producto_id', flat=True).distinct().order_by())
+    if not producto_ids:
+        return 0, None, None
+
+    rango = pendientes.aggregate(desde=Min('factura__fecha_local'), hasta=Max('factura__fecha_local'))
+    historial = historial_costos(producto_ids)
+    costo_actual = {
+        producto.id: producto.costo_actual()
+        for producto in Producto.objects.filter(id__in=producto_ids).only(
+            'id', 'costo_promedio', 'precio_compra'
+        )
+    }
+
+    detalles = []
+    for detalle_id, producto_id, fecha in pendientes.values_list(
+        'id', 'producto_id', 'factura__fecha_local'
+    ).order_by('id').iterator(chunk_size=lote):
+        costo = _costo_a_la_fecha(historial, costo_actual, producto_id, fecha)
+        if costo > 0:
+            detalles.append(DetalleFactura(id=detalle_id, costo_unitario=costo))
+
+    with transaction.atomic():
+        DetalleFactura.objects.bulk_update(detalles, ['costo_unitario'], batch_size=lote)
+        actualizar_costo_facturas(rango['desde'], rango['hasta'])
+
+    return len(detalles), rango['desde'], rango['hasta']
+
+
+def actualizar_costo_facturas(fecha_inicio=None, fecha_fin=None):
+    """Recalcula Factura.costo_total desde sus detalles con un solo UPDATE."""
+    costo = DetalleFactura.objects.filter(
+        factura=OuterRef('pk')
+    ).values('factura').annotate(
+        total=Sum(F('cantidad') * F('costo_unitario'))
+    ).values('total')
+
+    facturas = Factura.objects.all()
+    if fecha_inicio:
+        facturas = facturas.filter(fecha_local__gte=fecha_inicio)
+    if fecha_fin:
+        facturas = facturas.filter(fecha_local__lte=fecha_fin)
+
+    return facturas.update(
+        costo_total=Coalesce(
+            Subquery(costo, output_field=DecimalField(max_digits=12, decimal_places=2)),
+            Value(Decimal('0.00'))
+        )
+    )
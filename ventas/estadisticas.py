@@ -0,0 +1,107 @@
+"""
+Estadísticas precalculadas por cliente (EstadisticaCliente).
+
+Al facturar o anular, la recencia (última compra), la frecuencia (facturas) y
+el monto (total comprado) del cliente se recalculan cuando termina la
+transacción, con una consulta agrupada sobre sus propias facturas (índice por
+cliente): el costo no depende del tamaño de la tabla de ventas. Los guardados
+repetidos de la factura al agregar cada detalle se agrupan en una sola
+actualización.
+
+Los puntajes RFM, el segmento y el grupo dependen de todos los clientes, por lo
+que los asigna el comando segmentar_clientes cada noche (ver ventas.segmentacion).
+Mientras tanto, un cliente que compra por primera vez queda como 'NUEVOS' y uno
+que se queda sin facturas, como 'SIN_COMPRAS'.
+"""
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from .models import Cliente, EstadisticaCliente, Factura
+
+CAMPOS_CALCULADOS = [
+    'primera_compra', 'ultima_compra', 'cantidad_facturas', 'total_compras', 'fecha_actualizacion',
+]
+
+
+def actualizar_estadisticas_clientes(cliente_ids=None):
+    """
+    Recalcula recencia, frecuencia y monto de los clientes indicados (todos si
+    cliente_ids es None) con una consulta agrupada y un upsert. Los puntajes y el
+    segmento existentes se conservan. Retorna la cantidad de clientes actualizados.
+    """
+    clientes = Cliente.objects.all()
+    facturas = Factura.objects.filter(estado='COMPLETADA', cliente__isnull=False)
+    if cliente_ids is not None:
+        clientes = clientes.filter(id__in=cliente_ids)
+        facturas = facturas.filter(cliente_id__in=cliente_ids)
+
+    compras = {
+        fila['cliente_id']: fila
+        for fila in facturas.values('cliente_id').annotate(
+            primera_compra=Min('fecha_venta'),
+            ultima_compra=Max('fecha_venta'),
+            cantidad_facturas=Count('id'),
+            total_compras=Sum('total')
+        ).order_by()
+    }
+
+    ahora = timezone.now()
+    estadisticas = []
+    for cliente_id in clientes.values_list('id', flat=True).order_by():
+        compra = compras.get(cliente_id, {})
+        estadisticas.append(EstadisticaCliente(
+            cliente_id=cliente_id,
+            primera_compra=compra.get('primera_compra'),
+            ultima_compra=compra.get('ultima_compra'),
+            cantidad_facturas=compra.get('cantidad_facturas') or 0,
+            total_compras=compra.get('total_compras') or 0,
+            fecha_actualizacion=ahora
+        ))
+
+    with transaction.atomic():
+        EstadisticaCliente.objects.bulk_create(
+            estadisticas,
+            update_conflicts=True,
+            unique_fields=['cliente'],
+            update_fields=CAMPOS_CALCULADOS,
+            batch_size=1000
+        )
+        if cliente_ids is not None:
+            _ajustar_segmento(cliente_ids)
+    return len(estadisticas)
+
+
+def _ajustar_segmento(cliente_ids):
+    """
+    Corrige el segmento de los clientes cuyo estado cambió antes de la próxima
+    segmentación: primera compra -> NUEVOS, sin facturas -> SIN_COMPRAS.
+    """
+    estadisticas = EstadisticaCliente.objects.filter(cliente_id__in=cliente_ids)
+    estadisticas.filter(
+        cantidad_facturas__gt=0, segmento__in=['SIN_COMPRAS', 'SIN_CLASIFICAR']
+    ).update(segmento='NUEVOS')
+    estadisticas.filter(cantidad_facturas=0).exclude(segmento='SIN_COMPRAS').update(
+        segmento='SIN_COMPRAS', puntaje_recencia=0, puntaje_frecuencia=0, puntaje_monto=0, grupo=None
+    )
+
+
+def programar_actualizacion_cliente(factura):
+    """
+    Programa la actualización de las estadísticas del cliente de la factura para
+    cuando termine la transacción en curso, una sola vez por factura.
+    """
+    if factura.cliente_id is None:
+        return
+    pendientes = getattr(factura, '_clientes_estadisticas', None)
+    if pendientes is not None:
+        pendientes.add(factura.cliente_id)
+        return
+
+    factura._clientes_estadisticas = {factura.cliente_id}
+
+    def actualizar():
+        actualizar_estadisticas_clientes(sorted(factura.__dict__.pop('_clientes_estadisticas', ())))
+
+    transaction.on_commit(actualizar)
+
@@ -0,0 +1,26 @@
+"""
+Comando de gestión para completar el costo de las ventas anteriores.
+Ejecutarlo una vez después de migrar (las ventas nuevas guardan su costo solas).
+Uso: python manage.py registrar_costo_ventas
+"""
+from django.core.management.base import BaseCommand
+from reportes.resumenes import reconstruir_resumenes
+from ventas.costos import registrar_costos_faltantes
+
+
+class Command(BaseCommand):
+    help = 'Completa el costo unitario de los detalles de factura sin costo y reconstruye los resúmenes afectados'
+
+    def handle(self, *args, **options):
+        actualizados, desde, hasta = registrar_costos_faltantes()
+        if not actualizados:
+            self.stdout.write(self.style.SUCCESS('✓ Todas las ventas tienen costo registrado.'))
+            return
+
+        reconstruir_resumenes(desde, hasta)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✓ Costo registrado en {actualizados} detalles de factura '
+                f'({desde:%d/%m/%Y} - {hasta:%d/%m/%Y}); resúmenes de ventas reconstruidos.'
+            )
+        )
@@ -0,0 +1,62 @@
+"""
+Comando de gestión para segmentar los clientes por RFM (recencia, frecuencia, monto).
+Pensado para ejecutarse cada noche (cron / programador de tareas).
+Uso: python manage.py segmentar_clientes [--grupos 4] [--dry-run]
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from ventas.estadisticas import actualizar_estadisticas_clientes
+from ventas.models import EstadisticaCliente
+from ventas.segmentacion import calcular_segmentacion, guardar_segmentacion, resumen_por_segmento
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las estadísticas de los clientes y les asigna puntajes RFM, segmento y grupo k-means'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grupos', type=int, default=0,
+                            help='Cantidad de grupos k-means a calcular (por defecto no se agrupa)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo muestra el resumen, sin guardar las estadísticas ni los segmentos')
+
+    def handle(self, *args, **options):
+        if options['grupos'] < 0:
+            raise CommandError('--grupos no puede ser negativo.')
+
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            # La segmentación lee las estadísticas recién calculadas; en la
+            # simulación se calculan igual y se descartan al final
+            clientes = actualizar_estadisticas_clientes()
+            resultado = calcular_segmentacion(grupos=options['grupos'])
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        nombres = dict(EstadisticaCliente.SEGMENTO_CHOICES)
+        self.stdout.write('\nPor segmento:')
+        for fila in resumen_por_segmento(resultado):
+            self.stdout.write(
+                f"  {nombres[fila['segmento']]:<12} {fila['clientes']:>7} clientes  "
+                f"{fila['total']:>14,.2f}  ({fila['participacion']:.1f} %)"
+            )
+        if options['grupos']:
+            self.stdout.write('\nPor grupo (k-means):')
+            for fila in resumen_por_segmento(resultado, 'grupo'):
+                self.stdout.write(
+                    f"  Grupo {fila['grupo']:<6} {fila['clientes']:>7} clientes  "
+                    f"{fila['total']:>14,.2f}  ({fila['participacion']:.1f} %)"
+                )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('\nSimulación: no se guardaron estadísticas ni segmentos.'))
+            return
+
+        sentencias = guardar_segmentacion(resultado)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✓ {clientes} clientes actualizados y {len(resultado['cliente_id'])} con compras "
+                f"segmentados en {time.perf_counter() - inicio:.2f}s ({sentencias} actualizaciones)."
+            )
+        )
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:10
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def calcular_fecha_local(apps, schema_editor):
+    """
+    Migración de datos: llenar fecha_local y hora_local de las facturas existentes
+    """
+    Factura = apps.get_model('ventas', 'Factura')
+    zona = timezone.get_default_timezone()
+    facturas = list(Factura.objects.only('id', 'fecha_venta'))
+    for factura in facturas:
+        local = timezone.localtime(factura.fecha_venta, zona)
+        factura.fecha_local = local.date()
+        factura.hora_local = local.hour
+    Factura.objects.bulk_update(facturas, ['fecha_local', 'hora_local'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ventas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='factura',
+            name='fecha_local',
+            field=models.DateField(editable=False, null=True, help_text='Fecha de venta en la zona horaria del negocio. Se mantiene automáticamente al guardar', verbose_name='Fecha Local de Venta'),
+        ),
+        migrations.AddField(
+            model_name='factura',
+            name='hora_local',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, help_text='Hora (0-23) de la venta en la zona horaria del negocio', verbose_name='Hora Local de Venta'),
+        ),
+        migrations.RunPython(calcular_fecha_local, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='factura',
+            name='fecha_local',
+            field=models.DateField(editable=False, help_text='Fecha de venta en la zona horaria del negocio. Se mantiene automáticamente al guardar', verbose_name='Fecha Local de Venta'),
+        ),
+        migrations.AlterField(
+            model_name='factura',
+            name='hora_local',
+            field=models.PositiveSmallIntegerField(editable=False, help_text='Hora (0-23) de la venta en la zona horaria del negocio', verbose_name='Hora Local de Venta'),
+        ),
+        migrations.AddIndex(
+            model_name='factura',
+            index=models.Index(fields=['fecha_local', 'estado'], name='ventas_fact_fecha_l_fe0eb1_idx'),
+        ),
+    ]
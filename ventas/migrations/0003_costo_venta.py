@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:34
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ventas', '0002_factura_fecha_local'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detallefactura',
+            name='costo_unitario',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Costo del producto al momento de la venta', max_digits=10, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Costo Unitario (C$)'),
+        ),
+        migrations.AddField(
+            model_name='factura',
+            name='costo_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Suma del costo de los productos al momento de la venta', max_digits=12, verbose_name='Costo Total (C$)'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ventas', '0003_costo_venta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaCliente',
+            fields=[
+                ('cliente', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadisticas', serialize=False, to='ventas.cliente', verbose_name='Cliente')),
+                ('primera_compra', models.DateTimeField(blank=True, null=True, verbose_name='Primera Compra')),
+                ('ultima_compra', models.DateTimeField(blank=True, null=True, verbose_name='Última Compra')),
+                ('cantidad_facturas', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Facturas')),
+                ('total_compras', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total de Compras (C$)')),
+                ('puntaje_recencia', models.PositiveSmallIntegerField(default=0, help_text='1 (compró hace más tiempo) a 5 (compró más recientemente); 0 = sin calcular', verbose_name='Puntaje R')),
+                ('puntaje_frecuencia', models.PositiveSmallIntegerField(default=0, help_text='1 (menos facturas) a 5 (más facturas); 0 = sin calcular', verbose_name='Puntaje F')),
+                ('puntaje_monto', models.PositiveSmallIntegerField(default=0, help_text='1 (menor monto) a 5 (mayor monto); 0 = sin calcular', verbose_name='Puntaje M')),
+                ('segmento', models.CharField(choices=[('CAMPEONES', 'Campeones'), ('LEALES', 'Leales'), ('NUEVOS', 'Nuevos'), ('POTENCIALES', 'Potenciales'), ('EN_RIESGO', 'En Riesgo'), ('HIBERNANDO', 'Hibernando'), ('PERDIDOS', 'Perdidos'), ('SIN_COMPRAS', 'Sin Compras'), ('SIN_CLASIFICAR', 'Sin Clasificar')], default='SIN_CLASIFICAR', max_length=20, verbose_name='Segmento')),
+                ('grupo', models.PositiveSmallIntegerField(blank=True, help_text='Grupo asignado por k-means; 1 es el de mayor monto promedio', null=True, verbose_name='Grupo (k-means)')),
+                ('fecha_calculo', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Segmentación')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+            ],
+            options={
+                'verbose_name': 'Estadística de Cliente',
+                'verbose_name_plural': 'Estadísticas de Clientes',
+                'indexes': [models.Index(fields=['segmento', '-total_compras'], name='ventas_estcli_segmento_idx'), models.Index(fields=['grupo', '-total_compras'], name='ventas_estcli_grupo_idx'), models.Index(fields=['ultima_compra'], name='ventas_estcli_ultima_idx')],
+            },
+        ),
+    ]
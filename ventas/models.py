@@ -8,6 +8,15 @@ from usuarios.models import Usuario
 from inventario.models import Producto
 
 
+def fecha_y_hora_local(fecha_venta):
+    """Retorna la fecha y la hora de `fecha_venta` en la zona horaria del negocio (TIME_ZONE)."""
+    zona = timezone.get_default_timezone()
+    if timezone.is_naive(fecha_venta):
+        fecha_venta = timezone.make_aware(fecha_venta, zona)
+    local = timezone.localtime(fecha_venta, zona)
+    return local.date(), local.hour
+
+
 class Cliente(models.Model):
     """
     Modelo para los clientes del sistema.
@@ -119,6 +128,16 @@ class Factura(models.Model):
         default=timezone.now,
         verbose_name='Fecha de Venta'
     )
+    fecha_local = models.DateField(
+        editable=False,
+        verbose_name='Fecha Local de Venta',
+        help_text='Fecha de venta en la zona horaria del negocio. Se mantiene automáticamente al guardar'
+    )
+    hora_local = models.PositiveSmallIntegerField(
+        editable=False,
+        verbose_name='Hora Local de Venta',
+        help_text='Hora (0-23) de la venta en la zona horaria del negocio'
+    )
     subtotal = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -140,6 +159,14 @@ class Factura(models.Model):
         verbose_name='Total (C$)',
         default=0
     )
+    costo_total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name='Costo Total (C$)',
+        help_text='Suma del costo de los productos al momento de la venta'
+    )
     estado = models.CharField(
         max_length=20,
         choices=ESTADO_CHOICES,
@@ -167,6 +194,7 @@ class Factura(models.Model):
         indexes = [
             models.Index(fields=['numero_factura']),
             models.Index(fields=['fecha_venta']),
+            models.Index(fields=['fecha_local', 'estado']),
             models.Index(fields=['estado']),
             models.Index(fields=['vendedor']),
         ]
@@ -175,12 +203,29 @@ class Factura(models.Model):
         cliente_str = self.cliente.nombre if self.cliente else (self.cliente_nombre or 'Cliente General')
         return f"Factura #{self.numero_factura} - {cliente_str} ({self.fecha_venta.date()})"
     
+    def save(self, *args, **kwargs):
+        """
+        Mantiene la fecha y hora local de la venta, para que los reportes filtren
+        por un rango indexado sin convertir la zona horaria de fecha_venta.
+        """
+        self.fecha_local, self.hora_local = fecha_y_hora_local(self.fecha_venta)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'fecha_venta' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'fecha_local', 'hora_local'}
+        super().save(*args, **kwargs)
+    
     def calcular_totales(self):
         """Calcula los totales de la factura basándose en los detalles."""
         detalles = self.detalles.all()
         self.subtotal = sum(detalle.subtotal for detalle in detalles)
         self.total = self.subtotal - self.descuento
-        self.save(update_fields=['subtotal', 'total'])
+        self.costo_total = sum(detalle.costo_total for detalle in detalles)
+        self.save(update_fields=['subtotal', 'total', 'costo_total'])
+    
+    @property
+    def ganancia(self):
+        """Ganancia bruta de la factura (total menos costo)."""
+        return self.total - self.costo_total
 
 
 class DetalleFactura(models.Model):
@@ -216,6 +261,14 @@ class DetalleFactura(models.Model):
         validators=[MinValueValidator(0)],
         verbose_name='Subtotal (C$)'
     )
+    costo_unitario = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(0)],
+        default=0,
+        verbose_name='Costo Unitario (C$)',
+        help_text='Costo del producto al momento de la venta'
+    )
     
     class Meta:
         verbose_name = 'Detalle de Factura'
@@ -226,15 +279,138 @@ class DetalleFactura(models.Model):
         return f"{self.producto.nombre} - {self.cantidad} unidades - Factura #{self.factura.numero_factura}"
     
     def save(self, *args, **kwargs):
-        """Calcula el subtotal automáticamente."""
+        """
+        Calcula el subtotal automáticamente y, en un detalle nuevo, guarda el
+        costo vigente del producto para calcular la ganancia de la venta.
+        """
         self.subtotal = self.cantidad * self.precio_unitario
+        if self._state.adding and not self.costo_unitario:
+            self.costo_unitario = self.producto.costo_actual()
         super().save(*args, **kwargs)
         # Actualizar totales de la factura
         self.factura.calcular_totales()
     
+    @property
+    def costo_total(self):
+        """Costo de la línea al momento de la venta."""
+        return self.cantidad * self.costo_unitario
+    
+    @property
+    def ganancia(self):
+        """Ganancia bruta de la línea (sin el descuento de la factura)."""
+        return self.subtotal - self.costo_total
+    
     def delete(self, *args, **kwargs):
         """Al eliminar un detalle, actualiza los totales de la factura."""
         factura = self.factura
         super().delete(*args, **kwargs)
         factura.calcular_totales()
 
+
+
+class EstadisticaCliente(models.Model):
+    """
+    Recencia, frecuencia y monto (RFM) precalculados de cada cliente.
+    Los valores se mantienen al facturar y anular (ver ventas.estadisticas); los
+    puntajes, el segmento y el grupo los asigna cada noche el comando
+    segmentar_clientes (ver ventas.segmentacion).
+    """
+    SEGMENTO_CHOICES = [
+        ('CAMPEONES', 'Campeones'),
+        ('LEALES', 'Leales'),
+        ('NUEVOS', 'Nuevos'),
+        ('POTENCIALES', 'Potenciales'),
+        ('EN_RIESGO', 'En Riesgo'),
+        ('HIBERNANDO', 'Hibernando'),
+        ('PERDIDOS', 'Perdidos'),
+        ('SIN_COMPRAS', 'Sin Compras'),
+        ('SIN_CLASIFICAR', 'Sin Clasificar'),
+    ]
+    
+    cliente = models.OneToOneField(
+        Cliente,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='estadisticas',
+        verbose_name='Cliente'
+    )
+    primera_compra = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Primera Compra'
+    )
+    ultima_compra = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Última Compra'
+    )
+    cantidad_facturas = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad de Facturas'
+    )
+    total_compras = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Total de Compras (C$)'
+    )
+    puntaje_recencia = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Puntaje R',
+        help_text='1 (compró hace más tiempo) a 5 (compró más recientemente); 0 = sin calcular'
+    )
+    puntaje_frecuencia = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Puntaje F',
+        help_text='1 (menos facturas) a 5 (más facturas); 0 = sin calcular'
+    )
+    puntaje_monto = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Puntaje M',
+        help_text='1 (menor monto) a 5 (mayor monto); 0 = sin calcular'
+    )
+    segmento = models.CharField(
+        max_length=20,
+        choices=SEGMENTO_CHOICES,
+        default='SIN_CLASIFICAR',
+        verbose_name='Segmento'
+    )
+    grupo = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Grupo (k-means)',
+        help_text='Grupo asignado por k-means; 1 es el de mayor monto promedio'
+    )
+    fecha_calculo = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de Segmentación'
+    )
+    fecha_actualizacion = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de Actualización'
+    )
+    
+    class Meta:
+        verbose_name = 'Estadística de Cliente'
+        verbose_name_plural = 'Estadísticas de Clientes'
+        indexes = [
+            models.Index(fields=['segmento', '-total_compras'], name='ventas_estcli_segmento_idx'),
+            models.Index(fields=['grupo', '-total_compras'], name='ventas_estcli_grupo_idx'),
+            models.Index(fields=['ultima_compra'], name='ventas_estcli_ultima_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Estadísticas de {self.cliente.nombre}"
+    
+    @property
+    def puntaje_rfm(self):
+        """Puntajes R, F y M juntos (p. ej. '545'), o '-' si aún no se calcularon."""
+        if not self.puntaje_recencia:
+            return '-'
+        return f"{self.puntaje_recencia}{self.puntaje_frecuencia}{self.puntaje_monto}"
+    
+    @property
+    def promedio_compra(self):
+        """Monto promedio por factura."""
+        return self.total_compras / self.cantidad_facturas if self.cantidad_facturas else 0
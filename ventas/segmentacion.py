@@ -0,0 +1,214 @@
+"""
+Segmentación RFM (recencia, frecuencia, monto) de los clientes.
+
+Los valores de cada cliente ya están precalculados en EstadisticaCliente, así
+que la segmentación lee una sola tabla y trabaja con arreglos de NumPy:
+
+- Cada dimensión se puntúa de 1 a 5 por quintiles. Los empates reciben el mismo
+  puntaje (el de su percentil medio), p. ej. todos los clientes con una sola
+  factura quedan en el mismo quintil de frecuencia.
+- El segmento se asigna con reglas sobre los puntajes (np.select).
+- Opcionalmente, los clientes se agrupan con k-means sobre log(R, F, M)
+  estandarizados; los grupos se numeran de mayor a menor monto promedio.
+
+Los resultados se escriben con un UPDATE por combinación distinta de puntajes,
+segmento y grupo (a lo sumo unos cientos), no uno por cliente.
+"""
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EstadisticaCliente
+
+# Ids por sentencia UPDATE (límite de parámetros de SQLite)
+IDS_POR_ACTUALIZACION = 900
+
+# Segmentos que asignan los puntajes, en orden alfabético para codificarlos como enteros
+SEGMENTOS = np.array(sorted(['CAMPEONES', 'LEALES', 'NUEVOS', 'POTENCIALES', 'EN_RIESGO', 'HIBERNANDO', 'PERDIDOS']))
+
+
+def cargar_rfm(fecha_referencia=None):
+    """
+    Recencia (días desde la última compra), frecuencia y monto de los clientes con
+    compras, como arreglo estructurado de NumPy.
+    """
+    fecha_referencia = fecha_referencia or timezone.now()
+    filas = EstadisticaCliente.objects.filter(cantidad_facturas__gt=0).values_list(
+        'cliente_id', 'ultima_compra', 'cantidad_facturas', 'total_compras'
+    ).order_by()
+
+    return np.fromiter(
+        (
+            (
+                cliente_id,
+                max((fecha_referencia - ultima_compra).total_seconds() / 86400, 0),
+                facturas,
+                float(total),
+            )
+            for cliente_id, ultima_compra, facturas, total in filas.iterator(chunk_size=10000)
+        ),
+        dtype=[('cliente', np.int64), ('recencia', np.float64), ('frecuencia', np.float64), ('monto', np.float64)]
+    )
+
+
+def puntaje_quintil(valores):
+    """
+    Puntaje de 1 a 5 según el quintil de cada valor (5 = los mayores). Los
+    valores iguales comparten el puntaje de su percentil medio.
+    """
+    if len(valores) == 0:
+        return np.zeros(0, dtype=np.int64)
+    _, inverso, conteos = np.unique(valores, return_inverse=True, return_counts=True)
+    anteriores = np.cumsum(conteos) - conteos
+    percentil = (anteriores + conteos / 2) / len(valores)
+    return np.clip(np.ceil(percentil[inverso] * 5), 1, 5).astype(np.int64)
+
+
+def asignar_segmentos(recencia, frecuencia, monto, facturas):
+    """Segmento de cada cliente a partir de sus puntajes R, F y M (y su cantidad de facturas)."""
+    frecuencia_monto = (frecuencia + monto) / 2
+    condiciones = [
+        (recencia >= 4) & (frecuencia >= 4) & (monto >= 4),
+        (recencia >= 4) & (facturas == 1),
+        (recencia >= 3) & (frecuencia >= 4),
+        recencia >= 3,
+        frecuencia_monto >= 3,
+        recencia == 1,
+    ]
+    opciones = ['CAMPEONES', 'NUEVOS', 'LEALES', 'POTENCIALES', 'EN_RIESGO', 'PERDIDOS']
+    return np.select(condiciones, opciones, default='HIBERNANDO')
+
+
+def kmeans(datos, k, iteraciones=100, semilla=0):
+    """
+    Agrupa las filas de `datos` en k grupos (k-means con inicialización
+    k-means++ y semilla fija, para que el resultado sea reproducible).
+    Retorna la etiqueta (0..k-1) de cada fila.
+    """
+    k = min(k, len(datos))
+    if k < 1:
+        return np.zeros(len(datos), dtype=np.int64)
+
+    generador = np.random.default_rng(semilla)
+    centros = [datos[generador.integers(len(datos))]]
+    for _ in range(1, k):
+        distancias = ((datos[:, None, :] - np.array(centros)[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        total = distancias.sum()
+        if total == 0:
+            centros.append(datos[generador.integers(len(datos))])
+        else:
+            centros.append(datos[generador.choice(len(datos), p=distancias / total)])
+    centros = np.array(centros)
+
+    etiquetas = np.full(len(datos), -1, dtype=np.int64)
+    for _ in range(iteraciones):
+        distancias = ((datos[:, None, :] - centros[None, :, :]) ** 2).sum(axis=2)
+        nuevas = distancias.argmin(axis=1)
+        if np.array_equal(nuevas, etiquetas):
+            break
+        etiquetas = nuevas
+        for grupo in range(k):
+            miembros = datos[etiquetas == grupo]
+            if len(miembros):
+                centros[grupo] = miembros.mean(axis=0)
+    return etiquetas
+
+
+def agrupar_clientes(rfm, k):
+    """
+    Grupos k-means (1..k) sobre log(1 + R, F, M) estandarizados, numerados de
+    mayor a menor monto promedio.
+    """
+    datos = np.log1p(np.column_stack([rfm['recencia'], rfm['frecuencia'], rfm['monto']]))
+    desviacion = datos.std(axis=0)
+    datos = (datos - datos.mean(axis=0)) / np.where(desviacion > 0, desviacion, 1)
+
+    etiquetas = kmeans(datos, k)
+    montos = np.array([
+        rfm['monto'][etiquetas == grupo].mean() if (etiquetas == grupo).any() else -1
+        for grupo in range(etiquetas.max() + 1 if len(etiquetas) else 0)
+    ])
+    orden = np.empty(len(montos), dtype=np.int64)
+    orden[(-montos).argsort(kind='stable')] = np.arange(1, len(montos) + 1)
+    return orden[etiquetas]
+
+
+def calcular_segmentacion(grupos=None, fecha_referencia=None):
+    """
+    Calcula puntajes, segmento y (si `grupos` se indica) grupo k-means de los
+    clientes con compras. Retorna un diccionario de arreglos por cliente.
+    """
+    rfm = cargar_rfm(fecha_referencia)
+    recencia = puntaje_quintil(-rfm['recencia'])
+    frecuencia = puntaje_quintil(rfm['frecuencia'])
+    monto = puntaje_quintil(rfm['monto'])
+
+    return {
+        'cliente_id': rfm['cliente'],
+        'recencia': recencia,
+        'frecuencia': frecuencia,
+        'monto': monto,
+        'segmento': asignar_segmentos(recencia, frecuencia, monto, rfm['frecuencia']),
+        'grupo': agrupar_clientes(rfm, grupos) if grupos and len(rfm) else np.zeros(len(rfm), dtype=np.int64),
+        'total': rfm['monto'],
+    }
+
+
+def guardar_segmentacion(resultado):
+    """
+    Guarda la segmentación con un UPDATE por combinación de valores. Los
+    clientes sin compras quedan como SIN_COMPRAS. Retorna la cantidad de
+    sentencias UPDATE ejecutadas.
+    """
+    ahora = timezone.now()
+    combinaciones = np.column_stack([
+        resultado['recencia'], resultado['frecuencia'], resultado['monto'],
+        np.searchsorted(SEGMENTOS, resultado['segmento']),
+        resultado['grupo'],
+    ]) if len(resultado['cliente_id']) else np.zeros((0, 5), dtype=np.int64)
+    unicas, inverso = np.unique(combinaciones, axis=0, return_inverse=True)
+    inverso = inverso.reshape(-1)
+    ids_por_combinacion = np.split(
+        resultado['cliente_id'][np.argsort(inverso, kind='stable')],
+        np.cumsum(np.bincount(inverso, minlength=len(unicas)))[:-1]
+    )
+
+    sentencias = 0
+    with transaction.atomic():
+        EstadisticaCliente.objects.filter(cantidad_facturas=0).update(
+            segmento='SIN_COMPRAS', puntaje_recencia=0, puntaje_frecuencia=0, puntaje_monto=0,
+            grupo=None, fecha_calculo=ahora
+        )
+        sentencias += 1
+        for (recencia, frecuencia, monto, segmento, grupo), ids in zip(unicas, ids_por_combinacion):
+            ids = ids.tolist()
+            for inicio in range(0, len(ids), IDS_POR_ACTUALIZACION):
+                EstadisticaCliente.objects.filter(
+                    cliente_id__in=ids[inicio:inicio + IDS_POR_ACTUALIZACION]
+                ).update(
+                    puntaje_recencia=int(recencia),
+                    puntaje_frecuencia=int(frecuencia),
+                    puntaje_monto=int(monto),
+                    segmento=str(SEGMENTOS[segmento]),
+                    grupo=int(grupo) or None,
+                    fecha_calculo=ahora
+                )
+                sentencias += 1
+    return sentencias
+
+
+def resumen_por_segmento(resultado, campo='segmento'):
+    """Clientes, total comprado y participación por segmento (o por grupo)."""
+    valores = resultado[campo]
+    total = resultado['total'].sum()
+    filas = []
+    for valor in np.unique(valores):
+        mascara = valores == valor
+        suma = resultado['total'][mascara].sum()
+        filas.append({
+            campo: valor.item() if hasattr(valor, 'item') else valor,
+            'clientes': int(mascara.sum()),
+            'total': float(suma),
+            'participacion': float(suma / total * 100) if total else 0.0,
+        })
+    return sorted(filas, key=lambda fila: -fila['total'])
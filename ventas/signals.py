@@ -7,6 +7,8 @@ from django.dispatch import receiver
 from django.db import transaction
 from .models import DetalleFactura, Factura
 from inventario.models import AjusteInventario
+from inventario.estadisticas import registrar_venta, actualizar_estadisticas
+from .estadisticas import programar_actualizacion_cliente
 
 
 @receiver(post_save, sender=DetalleFactura)
@@ -43,6 +45,15 @@ def descontar_stock_al_facturar(sender, instance, created, **kwargs):
             )
 
 
+@receiver(post_save, sender=DetalleFactura)
+def actualizar_estadisticas_al_facturar(sender, instance, created, **kwargs):
+    """
+    Signal que suma la venta a las estadísticas precalculadas del producto.
+    """
+    if created and instance.factura.estado == 'COMPLETADA':
+        registrar_venta(instance)
+
+
 @receiver(post_delete, sender=DetalleFactura)
 def restaurar_stock_al_eliminar_detalle(sender, instance, **kwargs):
     """
@@ -112,3 +123,30 @@ def manejar_anulacion_factura(sender, instance, created, **kwargs):
                     usuario_registro=instance.vendedor
                 )
 
+
+@receiver(post_delete, sender=DetalleFactura)
+def actualizar_estadisticas_al_eliminar_detalle(sender, instance, **kwargs):
+    """
+    Signal que recalcula las estadísticas del producto cuando se elimina un detalle.
+    """
+    if instance.factura.estado == 'COMPLETADA':
+        actualizar_estadisticas([instance.producto_id])
+
+
+@receiver(post_save, sender=Factura)
+def actualizar_estadisticas_al_anular(sender, instance, created, **kwargs):
+    """
+    Signal que recalcula las estadísticas de los productos de una factura anulada.
+    """
+    if not created and instance.estado == 'ANULADA':
+        actualizar_estadisticas(list(instance.detalles.values_list('producto_id', flat=True)))
+
+
+@receiver(post_save, sender=Factura)
+@receiver(post_delete, sender=Factura)
+def actualizar_estadisticas_cliente(sender, instance, **kwargs):
+    """
+    Signal que actualiza la recencia, frecuencia y monto del cliente al
+    facturar, anular o eliminar una factura.
+    """
+    programar_actualizacion_cliente(instance)